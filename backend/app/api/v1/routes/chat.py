@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Form
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
+from fastapi.responses import StreamingResponse
 from app.dependencies.services import conversation_service
 from app.services.user_service import get_current_user
 
@@ -7,17 +11,85 @@ router = APIRouter(
     tags=["Chat"]
 )
 
+# Intervalle de vérification de la connexion du client
+DISCONNECT_POLL_SECONDS = 0.5
+
+async def _cancel_on_disconnect(request: Request, coro):
+    """
+    Exécute coro et l'annule si le client se déconnecte avant la fin
+    (l'appel LLM en cours est alors abandonné)
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        task.cancel()
+
 @router.post("/ask")
-def ask_question(
+async def ask_question(
+    request: Request,
+    question: str = Form(...),
+    conversation_id: str | None = Form(None),
+    service=Depends(conversation_service),
+    user=Depends(get_current_user)
+):
+    try:
+        return await _cancel_on_disconnect(request, service.ask_async(
+            user_id=user["id"],
+            question=question,
+            conversation_id=conversation_id
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/ask/stream")
+def ask_question_stream(
     question: str = Form(...),
     conversation_id: str | None = Form(None),
     service=Depends(conversation_service),
     user=Depends(get_current_user)
 ):
-    return service.ask(
-        user_id=user["id"],
-        question=question,
-        conversation_id=conversation_id
+    """
+    Server-Sent Events : "meta" (id + titre de la conversation),
+    puis un "token" par morceau de réponse, puis "done"
+    """
+    try:
+        conversation_id, conversation_title, memory = service.start_turn(
+            user_id=user["id"],
+            question=question,
+            conversation_id=conversation_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    tokens = service.ask_stream(conversation_id, question, memory)
+
+    async def events():
+        yield _sse("meta", {
+            "conversation_id": conversation_id,
+            "conversation_title": conversation_title
+        })
+        try:
+            async for token in tokens:
+                yield _sse("token", {"text": token})
+            yield _sse("done", {})
+        finally:
+            # Client déconnecté ou flux terminé : enregistre la réponse
+            await tokens.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 @router.get("/conversations")
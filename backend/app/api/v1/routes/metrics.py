@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.services.rag_service import RagService
+from app.services.orientation_service import OrientationService
+from app.services.user_service import get_current_user
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+
+def _require_admin(user: dict):
+    if user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin only"
+        )
+
+
+@router.get("/rag")
+def rag_metrics(user=Depends(get_current_user)):
+    _require_admin(user)
+    return RagService.stats()
+
+
+@router.get("/orientation")
+def orientation_metrics(user=Depends(get_current_user)):
+    _require_admin(user)
+    return OrientationService.stats()
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Path, Query
+from app.schemas.orientation import (
+    EligibilityResponse,
+    ScoreHistoryResponse,
+    SimulationRequest,
+    SimulationResponse
+)
+from app.services.orientation_service import OrientationService
+
+router = APIRouter(
+    prefix="/orientation",
+    tags=["Orientation"]
+)
+
+@router.get("/eligible", response_model=EligibilityResponse)
+def eligible_programs(
+    bac_section: str = Query(..., description="شعبة الباكالوريا"),
+    score: float = Query(..., ge=0, description="مجموع النقاط"),
+    parent_university: str | None = Query(None, description="ex : جامعة صفاقس"),
+    duration: int | None = Query(None, ge=1, description="Durée en années"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+):
+    """
+    Formations accessibles avec ce score (min_score <= score),
+    des plus sélectives (plus petite marge) aux moins sélectives
+    """
+    try:
+        return OrientationService.eligible(
+            bac_section,
+            score,
+            parent_university=parent_university,
+            duration=duration,
+            page=page,
+            page_size=page_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/simulate", response_model=SimulationResponse)
+def simulate_admission(data: SimulationRequest):
+    """
+    Score de l'élève calculé avec la صيغة de chaque formation de sa
+    شعبة, comparé au min_score. `unscored` compte les formations dont
+    la formule demande une matière absente de `grades`.
+    """
+    try:
+        return OrientationService.simulate(
+            data.bac_section,
+            data.grades,
+            parent_university=data.parent_university,
+            duration=data.duration,
+            page=data.page,
+            page_size=data.page_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/history/{code}", response_model=ScoreHistoryResponse)
+def score_history(code: str = Path(..., pattern=r"^\d{5}$", description="الرمز")):
+    """
+    Évolution du score minimum d'une formation d'une année à l'autre
+    """
+    try:
+        return OrientationService.history(code)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,13 +1,21 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
+class ConversationTurn(BaseModel):
+    question: str
+    answer: str
+
+
 class Conversation(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
     user_id: str
     title: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Mémoire bornée : résumé roulant + derniers échanges
+    summary: str = ""
+    recent_turns: List[ConversationTurn] = Field(default_factory=list)
 
     class Config:
         allow_population_by_field_name = True
@@ -0,0 +1,60 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class EligibleProgram(BaseModel):
+    code: str
+    diploma: Optional[str] = None
+    speciality: Optional[str] = None
+    university: Optional[str] = None
+    parent_university: Optional[str] = None
+    bac_section: str
+    duration: Optional[str] = None
+    min_score: float
+    formula: Optional[str] = None
+    margin: float
+
+
+class EligibilityResponse(BaseModel):
+    bac_section: str
+    score: float
+    total: int
+    page: int
+    page_size: int
+    items: List[EligibleProgram]
+
+
+class SimulationRequest(BaseModel):
+    bac_section: str
+    grades: Dict[str, float] = Field(..., description="ex : {\"FG\": 140.5, \"M\": 15, \"SP\": 14}")
+    parent_university: Optional[str] = None
+    duration: Optional[int] = Field(None, ge=1)
+    page: int = Field(1, ge=1)
+    page_size: int = Field(20, ge=1, le=100)
+
+
+class SimulatedProgram(EligibleProgram):
+    score: float
+
+
+class SimulationResponse(BaseModel):
+    bac_section: str
+    total: int
+    unscored: int
+    page: int
+    page_size: int
+    items: List[SimulatedProgram]
+
+
+class ScoreHistoryPoint(BaseModel):
+    year: int
+    bac_section: Optional[str] = None
+    min_score: Optional[float] = None
+    formula: Optional[str] = None
+    university: Optional[str] = None
+
+
+class ScoreHistoryResponse(BaseModel):
+    code: str
+    years: List[int]
+    items: List[ScoreHistoryPoint]
@@ -1,7 +1,10 @@
+import asyncio
+
 from bson import ObjectId
 from datetime import datetime
 
 from app.services.rag_service import RagService
+from app.services.pipelines.rag.conversation_memory import ConversationMemory
 from app.models.message import Message
 from app.models.conversation import Conversation
 from app.utils.conversation_utils import generate_conversation_title
@@ -24,6 +27,81 @@ class ConversationService:
         ajoute les messages user + assistant,
         retourne l'id + le titre + la réponse IA
         """
+        conversation_id, conversation_title, memory = self.start_turn(
+            user_id, question, conversation_id
+        )
+
+        # 🤖 réponse IA (avec la mémoire bornée de la conversation)
+        answer = RagService.ask(question, memory)
+
+        # 💬 message assistant + mémoire
+        self.save_answer(conversation_id, answer, question, memory)
+
+        return {
+            "conversation_id": conversation_id,
+            "conversation_title": conversation_title,
+            "answer": answer
+        }
+
+    async def ask_async(
+        self,
+        user_id: str,
+        question: str,
+        conversation_id: str | None = None
+    ):
+        """
+        Même chose que ask() sans bloquer de thread pendant l'appel LLM :
+        les accès Mongo passent dans un thread, la réponse est attendue
+        """
+        conversation_id, conversation_title, memory = await asyncio.to_thread(
+            self.start_turn, user_id, question, conversation_id
+        )
+
+        answer = await RagService.ask_async(question, memory)
+
+        await asyncio.to_thread(
+            self.save_answer, conversation_id, answer, question, memory
+        )
+
+        return {
+            "conversation_id": conversation_id,
+            "conversation_title": conversation_title,
+            "answer": answer
+        }
+
+    async def ask_stream(
+        self,
+        conversation_id: str,
+        question: str,
+        memory: ConversationMemory | None = None
+    ):
+        """
+        Émet la réponse IA morceau par morceau, puis enregistre le message
+        assistant assemblé — aussi quand le flux est interrompu (client
+        déconnecté) : l'écriture est protégée de l'annulation.
+        """
+        parts = []
+        try:
+            async for token in RagService.ask_stream(question, memory):
+                parts.append(token)
+                yield token
+        finally:
+            answer = "".join(parts).strip()
+            if answer:
+                await asyncio.shield(asyncio.to_thread(
+                    self.save_answer, conversation_id, answer, question, memory
+                ))
+
+    def start_turn(
+        self,
+        user_id: str,
+        question: str,
+        conversation_id: str | None = None
+    ) -> tuple[str, str, ConversationMemory]:
+        """
+        Crée ou retrouve la conversation et enregistre le message
+        utilisateur ; retourne (id, titre, mémoire) de la conversation
+        """
 
         # 🆕 nouvelle conversation
         if not conversation_id or conversation_id == "default":
@@ -39,6 +117,7 @@ class ConversationService:
                 conversation.dict(exclude={"id"}, exclude_none=True)
             )
             conversation_id = str(result.inserted_id)
+            memory = ConversationMemory()
 
         # ♻️ conversation existante
         else:
@@ -53,6 +132,7 @@ class ConversationService:
                 raise ValueError("Conversation not found")
 
             conversation_title = conv["title"]
+            memory = ConversationMemory.from_document(conv)
 
         # 💬 message utilisateur
         self.messages.insert_one(
@@ -64,10 +144,15 @@ class ConversationService:
             ).dict(exclude={"id"}, exclude_none=True)
         )
 
-        # 🤖 réponse IA
-        answer = RagService.ask(question)
+        return conversation_id, conversation_title, memory
 
-        # 💬 message assistant
+    def save_answer(
+        self,
+        conversation_id: str,
+        answer: str,
+        question: str | None = None,
+        memory: ConversationMemory | None = None
+    ):
         self.messages.insert_one(
             Message(
                 conversation_id=conversation_id,
@@ -77,11 +162,13 @@ class ConversationService:
             ).dict(exclude={"id"}, exclude_none=True)
         )
 
-        return {
-            "conversation_id": conversation_id,
-            "conversation_title": conversation_title,
-            "answer": answer
-        }
+        # 🧠 mémoire : une écriture de taille bornée sur la conversation
+        if memory is not None and question:
+            memory = RagService.remember(memory, question, answer)
+            self.conversations.update_one(
+                {"_id": ObjectId(conversation_id)},
+                {"$set": memory.to_document()}
+            )
 
     def get_user_conversations(self, user_id: str):
         conversations = self.conversations.find(
@@ -0,0 +1,135 @@
+from .pipelines.rag.facets import normalize_bac_section, normalize_university
+from .pipelines.score.eligibility import EligibilityEngine
+from .pipelines.score.formula import formula_compiler
+from .pipelines.score.score_store import ScoreStore
+
+eligibility_engine = EligibilityEngine()
+score_store = ScoreStore(columns=["bac_section", "min_score", "formula", "university"])
+
+
+class OrientationService:
+
+    @staticmethod
+    def _section(bac_section: str) -> str:
+        section = normalize_bac_section(bac_section)
+        if section is None:
+            raise ValueError(f"Unknown bac section: {bac_section}")
+        return section
+
+    @staticmethod
+    def _university(parent_university: str | None) -> str | None:
+        if not parent_university:
+            return None
+        if not parent_university.strip().startswith("جامعة"):
+            parent_university = f"جامعة {parent_university}"
+        university = normalize_university(parent_university)
+        if university is None:
+            raise ValueError(f"Unknown university: {parent_university}")
+        return university
+
+    @staticmethod
+    def eligible(
+        bac_section: str,
+        score: float,
+        parent_university: str | None = None,
+        duration: int | None = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> dict:
+        """
+        Formations accessibles avec ce score, par marge croissante.
+        Lève ValueError si la شعبة ou l'université n'est pas reconnue.
+        """
+        section = OrientationService._section(bac_section)
+        university = OrientationService._university(parent_university)
+
+        total, items = eligibility_engine.eligible(
+            section,
+            score,
+            parent_university=university,
+            duration=duration,
+            offset=(page - 1) * page_size,
+            limit=page_size
+        )
+
+        return {
+            "bac_section": section,
+            "score": score,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "items": items
+        }
+
+    @staticmethod
+    def simulate(
+        bac_section: str,
+        grades: dict[str, float],
+        parent_university: str | None = None,
+        duration: int | None = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> dict:
+        """
+        Formations où l'élève est admis d'après ses notes, en appliquant
+        la صيغة de chaque formation. Lève ValueError pour une matière
+        inconnue des formules.
+        """
+        section = OrientationService._section(bac_section)
+        university = OrientationService._university(parent_university)
+
+        eligibility_engine.load()
+        unknown = sorted(set(grades) - eligibility_engine.variables)
+        if unknown:
+            raise ValueError(
+                f"Unknown subjects: {', '.join(unknown)} "
+                f"(expected: {', '.join(sorted(eligibility_engine.variables))})"
+            )
+
+        total, unscored, items = eligibility_engine.simulate(
+            section,
+            grades,
+            parent_university=university,
+            duration=duration,
+            offset=(page - 1) * page_size,
+            limit=page_size
+        )
+
+        return {
+            "bac_section": section,
+            "total": total,
+            "unscored": unscored,
+            "page": page,
+            "page_size": page_size,
+            "items": items
+        }
+
+    @staticmethod
+    def history(code: str) -> dict:
+        """
+        Score minimum d'une formation pour chaque année disponible
+        (une ligne par année et par شعبة). Lève ValueError si le code
+        n'apparaît dans aucune année.
+        """
+        items = score_store.min_score_history(code)
+        if not items:
+            raise ValueError(f"Unknown program code: {code}")
+
+        return {
+            "code": code,
+            "years": sorted({item["year"] for item in items}),
+            "items": items
+        }
+
+    @staticmethod
+    def warmup():
+        eligibility_engine.load()
+        score_store.load()
+
+    @staticmethod
+    def stats() -> dict:
+        return {
+            "eligibility": eligibility_engine.stats(),
+            "formulas": formula_compiler.stats(),
+            "store": score_store.stats(),
+        }
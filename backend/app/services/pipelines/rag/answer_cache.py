@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Cache persistant des réponses, indexé par l'embedding de la question.
+    Une nouvelle question dont la similarité cosinus avec une question déjà
+    répondue dépasse le seuil reçoit la réponse stockée, sans appel LLM.
+
+    Chaque entrée porte la version de l'index : reconstruire le corpus
+    invalide toutes les réponses qui en dépendaient. Elle porte aussi la
+    portée de la question (شعب, جامعات, codes, années, spécialité... voir
+    pipeline_rag.answer_scope) : deux questions proches qui ne visent pas
+    la même formation ou la même شعبة ne partagent pas leur réponse.
+
+    Les écritures disque sont différées : une modification programme une
+    sauvegarde en arrière-plan (flush_seconds), hors du verrou et du
+    chemin de la requête ; flush() force l'écriture (arrêt du serveur).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        threshold: float,
+        ttl_seconds: float,
+        max_entries: int,
+        flush_seconds: float = 5.0
+    ):
+        self.vectors_path = path.with_suffix(".npy")
+        self.entries_path = path.with_suffix(".json")
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.flush_seconds = flush_seconds
+
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self.flushes = 0
+        self._loaded = False
+        self._entries: list[dict] = []
+        self._vectors: np.ndarray | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_llm_seconds = 0.0
+
+    # -----------------------------
+    # Persistance
+    # -----------------------------
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not (self.vectors_path.exists() and self.entries_path.exists()):
+            return
+
+        try:
+            vectors = np.load(self.vectors_path)
+            with open(self.entries_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if len(entries) == len(vectors):
+            self._entries, self._vectors = entries, vectors
+            # Entrées d'avant la portée : impossible de savoir ce qu'elles visaient
+            self._keep(["scope" in e for e in entries])
+
+    def _mark_dirty(self):
+        """Programme une sauvegarde (appelé sous self._lock)"""
+        self._dirty = True
+        if self._timer is None and self.flush_seconds is not None:
+            self._timer = threading.Timer(self.flush_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Écrit le cache sur disque s'il a changé. L'instantané est pris
+        sous le verrou des requêtes, l'écriture se fait en dehors (sous
+        le seul verrou d'écriture, qui garde les instantanés dans l'ordre).
+        """
+        with self._io_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = [dict(e) for e in self._entries]
+                vectors = (
+                    self._vectors if self._vectors is not None
+                    else np.zeros((0, 0), dtype="float32")
+                )
+
+            self.vectors_path.parent.mkdir(parents=True, exist_ok=True)
+
+            tmp_vectors = self.vectors_path.with_name(self.vectors_path.name + ".tmp")
+            tmp_entries = self.entries_path.with_name(self.entries_path.name + ".tmp")
+
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, vectors)
+            with open(tmp_entries, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_entries, self.entries_path)
+            self.flushes += 1
+
+    # -----------------------------
+    # Éviction
+    # -----------------------------
+    def _keep(self, mask: list[bool]):
+        self._entries = [e for e, keep in zip(self._entries, mask) if keep]
+        if self._vectors is not None:
+            self._vectors = self._vectors[np.array(mask, dtype=bool)]
+
+    def _evict(self, version: str) -> bool:
+        now = time.time()
+        mask = [
+            e["version"] == version
+            and now - e["created_at"] < self.ttl_seconds
+            for e in self._entries
+        ]
+        changed = not all(mask)
+        if changed:
+            self._keep(mask)
+
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            # On retire les entrées les moins récemment utilisées
+            order = sorted(
+                range(len(self._entries)),
+                key=lambda i: self._entries[i]["last_used"]
+            )
+            dropped = set(order[:overflow])
+            self._keep([i not in dropped for i in range(len(self._entries))])
+            changed = True
+
+        return changed
+
+    # -----------------------------
+    # API
+    # -----------------------------
+    def lookup(self, vector: np.ndarray, version: str, scope: str = "") -> str | None:
+        vector = vector.reshape(-1)
+
+        with self._lock:
+            self._load()
+            if self._evict(version):
+                self._mark_dirty()
+
+            candidates = [i for i, e in enumerate(self._entries) if e["scope"] == scope]
+            if not candidates:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors[candidates] @ vector
+            i = int(np.argmax(similarities))
+            best = candidates[i]
+
+            if similarities[i] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best]
+            entry["last_used"] = time.time()
+            self.hits += 1
+            self.saved_llm_seconds += entry["llm_seconds"]
+            return entry["answer"]
+
+    def store(
+        self,
+        question: str,
+        vector: np.ndarray,
+        answer: str,
+        llm_seconds: float,
+        version: str,
+        scope: str = ""
+    ):
+        vector = vector.reshape(1, -1).astype("float32")
+        now = time.time()
+
+        with self._lock:
+            self._load()
+
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[1]:
+                self._entries, self._vectors = [], vector[:0]
+
+            self._entries.append({
+                "question": question,
+                "answer": answer,
+                "version": version,
+                "scope": scope,
+                "llm_seconds": llm_seconds,
+                "created_at": now,
+                "last_used": now,
+            })
+            self._vectors = np.vstack([self._vectors, vector])
+
+            self._evict(version)
+            self._mark_dirty()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+            "saved_llm_seconds": round(self.saved_llm_seconds, 3),
+            "flushes": self.flushes,
+            "dirty": self._dirty,
+        }
@@ -0,0 +1,170 @@
+"""
+Benchmark : compression extractive des blocs (BlockCompressor) sur un jeu
+fixe de questions.
+
+Pour chaque question, sur les CONTEXT_CANDIDATES blocs récupérés :
+- tokens estimés : bruts, assemblés (budget), compressés, compressés+budget
+- parité : les lignes (champs utiles au sujet) reconstruites depuis le
+  contexte compressé doivent être exactement celles des blocs d'origine
+- couverture sous budget : part des lignes d'origine présentes dans le
+  contexte final, sans puis avec compression
+Avec --llm, les deux contextes sont aussi envoyés au fournisseur LLM
+configuré et les nombres cités dans les deux réponses sont comparés.
+
+Usage : python -m app.services.pipelines.rag.bench_compression [--llm]
+"""
+import re
+import statistics
+import sys
+
+from .block_compressor import (
+    COMMON_HEADER,
+    EMPTY_VALUES,
+    FIELDS,
+    IDENTITY,
+    TOPIC_FIELDS,
+    BlockCompressor,
+    parse_block,
+)
+from .context_packer import ContextPacker
+from .intent import detect_intent
+from .llm_answer import llm_answer
+from .rag_index import index_manager, search_scored
+from .config import (
+    CONTEXT_CANDIDATES,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_CHARS_PER_TOKEN,
+    CONTEXT_MIN_TRUNCATE_TOKENS
+)
+
+QUESTIONS = [
+    "ما هو معدل القبول في الإجازة في الإعلامية لشعبة علوم تجريبية",
+    "معدل القبول في الطب لشعبة رياضيات",
+    "ما هو السكور الأدنى للهندسة المعمارية",
+    "ما هي صيغة احتساب مجموع النقاط في الإجازة في الفرنسية",
+    "صيغة الاحتساب في المرحلة التحضيرية للدراسات الهندسية",
+    "ما هي مدة الدراسة في الصيدلة",
+    "كم سنة تدوم الإجازة في التصرف",
+    "ما هي التكوينات المتاحة لشعبة آداب في جامعة سوسة",
+    "ما هي الاختصاصات في علوم الإعلامية بجامعة المنستير",
+    "أين يمكن دراسة البيولوجيا بعد شعبة علوم تجريبية",
+    "الإجازة في القانون",
+    "التكوينات في الفنون والحرف",
+]
+
+
+def _rows(blocks: list[str], keep: list[str]) -> set[frozenset]:
+    rows = set()
+    for text in blocks:
+        fields = parse_block(text)
+        if fields is not None:
+            rows.add(frozenset(
+                (label, fields[label])
+                for label in keep
+                if fields.get(label, "") not in EMPTY_VALUES
+            ))
+    return rows
+
+
+def _expand(context: str) -> set[frozenset]:
+    """
+    Lignes reconstruites depuis un contexte compressé (en-tête commun,
+    identité de la formation, puis une ligne "- a: x | b: y" par شعبة)
+    """
+    common, rows = {}, set()
+    for block in context.split("\n\n"):
+        lines = block.splitlines()
+        if lines and lines[0] == COMMON_HEADER:
+            common = dict(line.split(": ", 1) for line in lines[1:])
+            continue
+
+        identity, items = {}, []
+        for line in lines:
+            if line.startswith("- "):
+                items.append(dict(
+                    pair.split(": ", 1) for pair in line[2:].split(" | ")
+                ))
+                continue
+            label, sep, value = line.partition(": ")
+            if sep and label in FIELDS:
+                identity[label] = value
+        if not identity and not items:
+            continue
+        if identity and not set(identity) <= set(IDENTITY):
+            continue  # bloc libre
+        for item in items or [{}]:
+            rows.add(frozenset({**common, **identity, **item}.items()))
+    return rows
+
+
+def _numbers(text: str) -> set[str]:
+    return set(re.findall(r"\d+(?:\.\d+)?", text))
+
+
+def run(with_llm: bool = False):
+    index_manager.load()
+
+    compressor = BlockCompressor()
+    packer = ContextPacker(
+        budget=CONTEXT_TOKEN_BUDGET,
+        chars_per_token=CONTEXT_CHARS_PER_TOKEN,
+        min_truncate_tokens=CONTEXT_MIN_TRUNCATE_TOKENS
+    )
+    unbounded = ContextPacker(
+        budget=10 ** 9,
+        chars_per_token=CONTEXT_CHARS_PER_TOKEN,
+        min_truncate_tokens=CONTEXT_MIN_TRUNCATE_TOKENS
+    )
+
+    print(f"{'sujet':<9}{'brut':>7}{'budget':>8}{'compr.':>8}{'c+bud.':>8}"
+          f"{'ratio':>7}{'parité':>8}{'couv.':>7}{'couv.c':>8}  question")
+
+    ratios, parities, coverage, coverage_c, answer_parity = [], [], [], [], []
+    for question in QUESTIONS:
+        intent = detect_intent(question)
+        keep = TOPIC_FIELDS.get(intent.topic, FIELDS)
+        chunks = search_scored(question, top_k=CONTEXT_CANDIDATES)
+
+        original = _rows([text for text, _ in chunks], keep)
+        raw = unbounded.pack(chunks)
+        packed = packer.pack(chunks)
+
+        compressed_chunks = compressor.compress(chunks, intent)
+        compressed = unbounded.pack(compressed_chunks)
+        compressed_packed = packer.pack(compressed_chunks)
+
+        expanded = _expand(compressed.text)
+        parity = len(original & expanded) / len(original) if original else 1.0
+        cov = len(original & _rows(packed.text.split("\n\n"), keep)) / len(original) if original else 1.0
+        cov_c = len(original & _expand(compressed_packed.text)) / len(original) if original else 1.0
+        ratio = raw.tokens / max(1, compressed.tokens)
+
+        ratios.append(ratio)
+        parities.append(parity)
+        coverage.append(cov)
+        coverage_c.append(cov_c)
+
+        print(
+            f"{intent.topic:<9}{raw.tokens:>7}{packed.tokens:>8}{compressed.tokens:>8}"
+            f"{compressed_packed.tokens:>8}{ratio:>6.1f}x{parity:>8.2f}"
+            f"{cov:>7.2f}{cov_c:>8.2f}  {question}"
+        )
+
+        if with_llm:
+            a = llm_answer(question, packed.text)
+            b = llm_answer(question, compressed_packed.text)
+            na, nb = _numbers(a), _numbers(b)
+            answer_parity.append(len(na & nb) / len(na | nb) if na | nb else 1.0)
+
+    print(f"\nCompression moyenne : x{statistics.mean(ratios):.1f} "
+          f"(tokens bruts / compressés)")
+    print(f"Parité des lignes   : {statistics.mean(parities):.3f}")
+    print(f"Couverture sous budget : {statistics.mean(coverage):.2f} -> "
+          f"{statistics.mean(coverage_c):.2f}")
+    if answer_parity:
+        print(f"Parité des réponses (nombres cités, Jaccard) : "
+              f"{statistics.mean(answer_parity):.2f}")
+
+
+if __name__ == "__main__":
+    run("--llm" in sys.argv[1:])
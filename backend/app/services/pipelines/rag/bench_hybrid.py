@@ -0,0 +1,84 @@
+"""
+Benchmark : recherche vectorielle seule vs hybride (BM25 + vecteurs, RRF)
+et chemin rapide par code de formation.
+
+Jeu de questions construit depuis processed_scores_2025.json :
+- "code"        : "معدل القبول للرمز 12345"            -> blocs de ce code
+- "institution" : "<الاختصاص> <المؤسسة> <الشعبة>"      -> le bloc exact
+
+Mesure : hit@k (au moins un bloc attendu dans le top-k) et latence.
+
+Usage : python -m app.services.pipelines.rag.bench_hybrid [k]
+"""
+import json
+import random
+import statistics
+import sys
+import time
+
+from .rag_index import PROCESSED_SCORES_PATH, index_manager, retrieve
+from .rag_block import build_rag_block
+
+N_QUESTIONS = 200
+
+
+def _questions() -> dict[str, list[tuple[str, set[int]]]]:
+    _, corpus = index_manager.get()
+    text_to_id = {chunk: i for i, chunk in enumerate(corpus) if chunk}
+
+    with open(PROCESSED_SCORES_PATH, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    by_code: dict[str, set[int]] = {}
+    by_entry = []
+    for entry in entries:
+        chunk_id = text_to_id.get(build_rag_block(entry).split("###", 1)[1].strip())
+        if chunk_id is None:
+            continue
+        by_code.setdefault(entry["code"], set()).add(chunk_id)
+        if entry["university"] != "غير محدد":
+            question = f"{entry['speciality']} {entry['university']} {entry['bac_section']}"
+            by_entry.append((question, {chunk_id}))
+
+    rng = random.Random(0)
+    codes = rng.sample(sorted(by_code), min(N_QUESTIONS, len(by_code)))
+
+    return {
+        "code": [(f"معدل القبول للرمز {code}", by_code[code]) for code in codes],
+        "institution": rng.sample(by_entry, min(N_QUESTIONS, len(by_entry))),
+    }
+
+
+def _evaluate(questions, k: int, hybrid: bool) -> tuple[float, list[float]]:
+    hits, latencies = 0, []
+    for question, expected in questions:
+        start = time.perf_counter()
+        found = retrieve(question, top_k=k, hybrid=hybrid)
+        latencies.append(time.perf_counter() - start)
+        if expected & {i for i, _ in found}:
+            hits += 1
+    return hits / len(questions), latencies
+
+
+def run(k: int = 10):
+    index_manager.load()
+    questions = _questions()
+
+    # Préchauffage (encodeur, caches)
+    for question, _ in questions["code"][:5]:
+        retrieve(question, top_k=k, hybrid=False)
+
+    print(f"hit@{k} et latence par question\n")
+    print(f"{'jeu':<13}{'mode':<10}{'hit@k':>8}{'moy':>11}{'p99':>11}")
+    for name, subset in questions.items():
+        for mode, hybrid in (("vecteurs", False), ("hybride", True)):
+            hit_rate, latencies = _evaluate(subset, k, hybrid)
+            ms = sorted(t * 1000 for t in latencies)
+            print(
+                f"{name:<13}{mode:<10}{hit_rate:>8.3f}"
+                f"{statistics.mean(ms):>8.3f} ms{ms[int(0.99 * (len(ms) - 1))]:>8.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
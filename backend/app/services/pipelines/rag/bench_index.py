@@ -0,0 +1,89 @@
+"""
+Benchmark : latence par requête de la recherche FAISS
+- AVANT : relecture de faiss.index + faiss_meta.pkl (liste picklée des
+  chunks, ancien format) à chaque search()
+- APRÈS : index résident chargé une fois par IndexManager
+
+Les requêtes sont des vecteurs du corpus lui-même, pour mesurer uniquement
+la partie index (l'encodage de la question est identique dans les deux cas).
+
+Usage : python -m app.services.pipelines.rag.bench_index
+"""
+import pickle
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+
+from .rag_index import INDEX_PATH, get_faiss_index, index_manager, corpus_embeddings
+
+N_QUERIES = 200
+TOP_K = 50
+
+
+def _percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def _report(label: str, timings: list[float]):
+    ms = [t * 1000 for t in timings]
+    print(
+        f"{label:<28} mean={statistics.mean(ms):8.3f} ms  "
+        f"p50={_percentile(ms, 50):8.3f} ms  p99={_percentile(ms, 99):8.3f} ms"
+    )
+
+
+def run(n_queries: int = N_QUERIES, top_k: int = TOP_K):
+    embeddings = corpus_embeddings()
+    step = max(1, len(embeddings) // n_queries)
+    queries = [
+        embeddings[i].reshape(1, -1)
+        for i in range(0, len(embeddings), step)
+    ][:n_queries]
+
+    # -----------------------------
+    # AVANT : chargement à chaque requête
+    # -----------------------------
+    # faiss_meta.pkl n'est plus tenu à jour : on le recrée à partir du
+    # corpus courant, dans l'ancien format (liste picklée)
+    _, store = get_faiss_index()
+    with store, tempfile.TemporaryDirectory() as tmp:
+        meta_path = Path(tmp) / "faiss_meta.pkl"
+        with open(meta_path, "wb") as f:
+            pickle.dump(list(store), f)
+
+        before = []
+        for q in queries:
+            start = time.perf_counter()
+            index = faiss.read_index(str(INDEX_PATH))
+            with open(meta_path, "rb") as f:
+                corpus = pickle.load(f)
+            _, indices = index.search(q, top_k)
+            [corpus[i] for i in indices[0] if i != -1]
+            before.append(time.perf_counter() - start)
+
+    # -----------------------------
+    # APRÈS : index résident
+    # -----------------------------
+    index_manager.load()
+    after = []
+    for q in queries:
+        start = time.perf_counter()
+        index, corpus = index_manager.get()
+        _, indices = index.search(q, top_k)
+        [corpus[i] for i in indices[0] if i != -1]
+        after.append(time.perf_counter() - start)
+
+    print(f"Index {index_manager.fingerprint} — {index.ntotal} vecteurs, "
+          f"{len(queries)} requêtes, top_k={top_k}")
+    _report("avant (lecture disque)", before)
+    _report("après (index résident)", after)
+    print(f"Gain moyen : x{statistics.mean(before) / statistics.mean(after):.1f}")
+
+
+if __name__ == "__main__":
+    run()
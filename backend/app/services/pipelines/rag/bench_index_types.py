@@ -0,0 +1,97 @@
+"""
+Rapport de construction : compare chaque type d'index FAISS à l'index exact
+- rappel@k (recouvrement avec les k voisins exacts)
+- latence par requête
+- mémoire (taille sérialisée)
+et indique l'index le moins coûteux qui garde un rappel >= INDEX_RECALL_TARGET.
+
+Les requêtes sont des vecteurs du corpus légèrement bruités puis normalisés.
+
+Usage : python -m app.services.pipelines.rag.bench_index_types [k]
+"""
+import sys
+import time
+
+import numpy as np
+
+from .rag_index import corpus_embeddings
+from .index_factory import INDEX_TYPES, build_index, index_memory_bytes
+from .config import INDEX_RECALL_TARGET
+
+N_QUERIES = 300
+NOISE = 0.05
+
+
+def _queries(embeddings: np.ndarray, n: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    picked = embeddings[rng.choice(len(embeddings), size=min(n, len(embeddings)), replace=False)]
+    queries = picked + NOISE * rng.standard_normal(picked.shape).astype("float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries.astype("float32")
+
+
+def _recall(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(
+        len(set(t) & set(f[f != -1]))
+        for t, f in zip(truth, found)
+    )
+    return hits / truth.size
+
+
+def run(k: int = 10):
+    embeddings = corpus_embeddings()
+    queries = _queries(embeddings, N_QUERIES)
+
+    results = []
+    truth = None
+
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        try:
+            index = build_index(embeddings, index_type)
+        except Exception as e:
+            print(f"⚠️ {index_type} : construction impossible ({e})")
+            continue
+        build_seconds = time.perf_counter() - start
+
+        latencies, found = [], []
+        for q in queries:
+            start = time.perf_counter()
+            _, ids = index.search(q.reshape(1, -1), k)
+            latencies.append(time.perf_counter() - start)
+            found.append(ids[0])
+        found = np.array(found)
+
+        if index_type == "flat":
+            truth = found
+
+        results.append({
+            "type": index_type,
+            "recall": _recall(truth, found),
+            "latency_ms": 1000 * float(np.mean(latencies)),
+            "p99_ms": 1000 * float(np.percentile(latencies, 99)),
+            "memory_kb": index_memory_bytes(index) / 1024,
+            "build_s": build_seconds,
+        })
+
+    print(f"{len(embeddings)} vecteurs, {len(queries)} requêtes, rappel@{k}\n")
+    print(f"{'type':<8}{'rappel':>8}{'lat. moy':>11}{'p99':>10}{'mémoire':>12}{'build':>9}")
+    for r in results:
+        print(
+            f"{r['type']:<8}{r['recall']:>8.3f}{r['latency_ms']:>8.3f} ms"
+            f"{r['p99_ms']:>7.3f} ms{r['memory_kb']:>9.0f} KB{r['build_s']:>8.2f}s"
+        )
+
+    eligible = [r for r in results if r["recall"] >= INDEX_RECALL_TARGET]
+    if eligible:
+        best = min(eligible, key=lambda r: (r["memory_kb"], r["latency_ms"]))
+        print(
+            f"\n✅ Index recommandé (rappel >= {INDEX_RECALL_TARGET}) : "
+            f"INDEX_TYPE = \"{best['type']}\""
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
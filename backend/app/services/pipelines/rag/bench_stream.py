@@ -0,0 +1,70 @@
+"""
+Benchmark : temps jusqu'au premier token (TTFT), réponse bloquante vs
+streaming, avec un LLM local de substitution (aucun appel réseau).
+
+Le substitut (LocalProvider) émet N_TOKENS morceaux espacés de TOKEN_DELAY
+secondes après FIRST_TOKEN_DELAY, comme le ferait Gemini en mode streaming.
+
+Usage : python -m app.services.pipelines.rag.bench_stream
+"""
+import asyncio
+import statistics
+import time
+
+from . import pipeline_rag
+from .llm_providers import LocalProvider, set_provider
+
+N_TOKENS = 200
+FIRST_TOKEN_DELAY = 0.3
+TOKEN_DELAY = 0.01
+N_RUNS = 5
+
+QUESTIONS = [
+    "ما هي التكوينات المتاحة لشعبة رياضيات في جامعة صفاقس",
+    "ما هو معدل القبول في الإجازة في الإعلامية لشعبة علوم تجريبية",
+    "كيف يتم احتساب مجموع النقاط لشعبة آداب",
+]
+
+
+async def _stream(question: str) -> tuple[float, float]:
+    """(premier token, fin du flux) en secondes"""
+    start = time.perf_counter()
+    first = None
+    async for _ in pipeline_rag.rag_pipeline_stream(question):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def run():
+    set_provider(LocalProvider(
+        latency=FIRST_TOKEN_DELAY,
+        token_latency=TOKEN_DELAY,
+        output_tokens=N_TOKENS
+    ))
+    pipeline_rag.ANSWER_CACHE_ENABLED = False
+    pipeline_rag.STRUCTURED_QUERIES = False
+
+    # Préchauffage : index, encodeur
+    pipeline_rag.search_scored(QUESTIONS[0], top_k=1)
+
+    blocking, streaming, total = [], [], []
+    for _ in range(N_RUNS):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            pipeline_rag.rag_pipeline(question)
+            blocking.append(time.perf_counter() - start)
+
+            first, duration = asyncio.run(_stream(question))
+            streaming.append(first)
+            total.append(duration)
+
+    print(f"{len(blocking)} questions, substitut local : {N_TOKENS} tokens, "
+          f"1er token à {FIRST_TOKEN_DELAY * 1000:.0f} ms\n")
+    print(f"TTFT bloquant  : {statistics.mean(blocking) * 1000:8.1f} ms")
+    print(f"TTFT streaming : {statistics.mean(streaming) * 1000:8.1f} ms")
+    print(f"Durée totale streaming : {statistics.mean(total) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    run()
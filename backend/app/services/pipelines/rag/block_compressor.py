@@ -0,0 +1,156 @@
+from .intent import Intent
+
+# ======================================================
+# Champs des blocs produits par rag_block.build_rag_block()
+# ======================================================
+FIELDS = [
+    "التكوين",
+    "الاختصاص",
+    "المؤسسة",
+    "الجامعة",
+    "شعبة الباكالوريا",
+    "المدة",
+    "معدل القبول الأدنى",
+    "صيغة الاحتساب",
+    "شروط إضافية",
+]
+
+# Ce qui identifie une formation (une ligne par شعبة ensuite)
+IDENTITY = ["التكوين", "الاختصاص", "المؤسسة", "الجامعة"]
+
+# Champs utiles selon le sujet de la question (detect_intent)
+TOPIC_FIELDS = {
+    "score": IDENTITY + ["شعبة الباكالوريا", "معدل القبول الأدنى"],
+    "formula": IDENTITY + ["شعبة الباكالوريا", "صيغة الاحتساب"],
+    "duration": IDENTITY + ["المدة"],
+    "programs": IDENTITY + ["شعبة الباكالوريا", "معدل القبول الأدنى"],
+    "general": FIELDS,
+}
+
+# Valeurs sans information, jamais envoyées au LLM
+EMPTY_VALUES = {"", "غير محدد", "لا يوجد", "None"}
+
+COMMON_HEADER = "معطيات مشتركة بين كل التكوينات أدناه:"
+
+
+def parse_block(text: str) -> dict[str, str] | None:
+    """
+    Champs d'un bloc de formation, ou None pour un bloc libre
+    (règles d'orientation)
+    """
+    fields = {}
+    for line in text.splitlines():
+        label, sep, value = line.partition(":")
+        label = label.strip()
+        if sep and label in FIELDS:
+            fields[label] = value.strip()
+    return fields if "التكوين" in fields else None
+
+
+class BlockCompressor:
+    """
+    Compression extractive des blocs récupérés, avant assemblage du
+    contexte :
+    - ne garde que les champs utiles au sujet de la question
+    - retire les valeurs vides ("غير محدد", "لا يوجد")
+    - factorise les valeurs identiques dans tous les blocs (en-tête commun)
+    - regroupe les blocs d'une même formation : identité une fois, puis
+      une ligne par شعبة
+    Les blocs libres (règles) passent tels quels.
+    """
+
+    def __init__(self):
+        self._counters = {"calls": 0, "blocks_in": 0, "blocks_out": 0,
+                          "chars_in": 0, "chars_out": 0}
+
+    def compress(
+        self,
+        chunks: list[tuple[str, float]],
+        intent: Intent
+    ) -> list[tuple[str, float]]:
+        compressed = self._compress(chunks, intent)
+
+        self._counters["calls"] += 1
+        self._counters["blocks_in"] += len(chunks)
+        self._counters["blocks_out"] += len(compressed)
+        self._counters["chars_in"] += sum(len(text) for text, _ in chunks)
+        self._counters["chars_out"] += sum(len(text) for text, _ in compressed)
+        return compressed
+
+    def stats(self) -> dict:
+        ratio = (
+            self._counters["chars_out"] / self._counters["chars_in"]
+            if self._counters["chars_in"] else None
+        )
+        return {**self._counters, "ratio": ratio}
+
+    def _compress(
+        self,
+        chunks: list[tuple[str, float]],
+        intent: Intent
+    ) -> list[tuple[str, float]]:
+        keep = TOPIC_FIELDS.get(intent.topic, FIELDS)
+
+        free, rows = [], []
+        for text, score in chunks:
+            fields = parse_block(text)
+            if fields is None:
+                free.append((text, score))
+                continue
+            rows.append((
+                {
+                    label: fields[label]
+                    for label in keep
+                    if fields.get(label, "") not in EMPTY_VALUES
+                },
+                score
+            ))
+
+        if not rows:
+            return chunks
+
+        # Valeurs communes à tous les blocs : énoncées une seule fois
+        common = {}
+        if len(rows) > 1:
+            first = rows[0][0]
+            common = {
+                label: value
+                for label, value in first.items()
+                if all(fields.get(label) == value for fields, _ in rows[1:])
+            }
+
+        # Regroupement par formation, dans l'ordre des scores
+        groups: dict[tuple, dict] = {}
+        for fields, score in sorted(rows, key=lambda r: -r[1]):
+            key = tuple(
+                fields.get(label, "") for label in IDENTITY if label not in common
+            )
+            group = groups.setdefault(key, {"score": score, "lines": []})
+            line = " | ".join(
+                f"{label}: {value}"
+                for label, value in fields.items()
+                if label not in IDENTITY and label not in common
+            )
+            if line and line not in group["lines"]:
+                group["lines"].append(line)
+
+        compressed = []
+        if common:
+            header = "\n".join(
+                [COMMON_HEADER] + [f"{label}: {value}" for label, value in common.items()]
+            )
+            compressed.append((header, float("inf")))
+
+        for key, group in groups.items():
+            identity = [
+                f"{label}: {value}"
+                for label, value in zip(
+                    [label for label in IDENTITY if label not in common], key
+                )
+                if value
+            ]
+            lines = identity + [f"- {line}" for line in group["lines"]]
+            if lines:
+                compressed.append(("\n".join(lines), group["score"]))
+
+        return compressed + free
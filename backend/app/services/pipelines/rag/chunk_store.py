@@ -0,0 +1,111 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+# En-tête : signature, nombre de chunks, taille du blob
+_MAGIC = b"CHKSTOR1"
+_HEADER = struct.Struct("<8sqq")
+
+
+class ChunkStore:
+    """
+    Textes des chunks sur disque, dans un seul fichier ouvert en mmap :
+    en-tête, tableau d'offsets (int64, n+1) puis blob UTF-8. Les workers
+    uvicorn partagent les pages du page cache au lieu de désérialiser
+    chacun sa copie du corpus.
+
+    Le fichier est publié par un seul os.replace : un lecteur voit
+    toujours des offsets et un blob de la même écriture.
+
+    S'utilise comme une liste : store[i], len(store), for chunk in store ;
+    close() (ou with ChunkStore(...) as store) libère le mmap et le fichier.
+    """
+
+    def __init__(self, base_path: Path):
+        (self.path,) = self.paths(base_path)
+
+        self._file = open(self.path, "rb")
+        try:
+            magic, n, blob_size = _HEADER.unpack(self._file.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"❌ ChunkStore invalide : {self.path}")
+
+            self._offsets = np.frombuffer(self._file.read(8 * (n + 1)), dtype="int64")
+            self._start = _HEADER.size + 8 * (n + 1)
+            size = os.fstat(self._file.fileno()).st_size
+            if len(self._offsets) != n + 1 or size != self._start + blob_size:
+                raise ValueError(f"❌ ChunkStore tronqué : {self.path}")
+
+            self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._view = memoryview(self._blob)
+
+    @staticmethod
+    def paths(base_path: Path) -> tuple[Path]:
+        return (base_path.with_name(base_path.name + ".chunks"),)
+
+    @classmethod
+    def exists(cls, base_path: Path) -> bool:
+        return all(p.exists() for p in cls.paths(base_path))
+
+    @classmethod
+    def write(cls, base_path: Path, chunks: list[str]):
+        (path,) = cls.paths(base_path)
+        os.replace(cls.stage(base_path, chunks), path)
+
+    @classmethod
+    def stage(cls, base_path: Path, chunks: list[str]) -> Path:
+        """
+        Écrit le store dans un fichier temporaire (à publier par
+        os.replace sur paths(base_path)[0]) et renvoie son chemin
+        """
+        (path,) = cls.paths(base_path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+        data = [chunk.encode("utf-8") for chunk in chunks]
+        offsets = np.zeros(len(data) + 1, dtype="int64")
+        np.cumsum([len(d) for d in data], out=offsets[1:])
+
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(data), int(offsets[-1])))
+            f.write(offsets.tobytes())
+            for d in data:
+                f.write(d)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._view.release()
+        self._blob.close()
+        self._file.close()
+
+    def __enter__(self) -> "ChunkStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        start = self._start + int(self._offsets[i])
+        end = self._start + int(self._offsets[i + 1])
+        return str(self._view[start:end], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self) -> int:
+        return int(self._offsets[-1])
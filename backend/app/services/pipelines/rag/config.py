@@ -1,3 +1,5 @@
+import os
+
 # =========================
 # Recherche vectorielle
 # =========================
@@ -5,19 +7,128 @@ TOP_K = 6
 # ⬆️ On réduit légèrement le contexte pour laisser PLUS de tokens
 # à Gemini pour terminer sa réponse (ce n’est PAS un filtre métier)
 
+# Type d'index FAISS : "flat" (exact), "hnsw", "ivf" ou "ivfpq"
+# Changer le type reconstruit l'index au prochain chargement (get_faiss_index),
+# à partir des embeddings en cache
+INDEX_TYPE = "flat"
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+IVF_NLIST = 64
+IVF_NPROBE = 8
+
+PQ_M = 48       # sous-quantificateurs (doit diviser la dimension 384)
+PQ_NBITS = 8
+
+# Recherche hybride : BM25 (tokens arabes normalisés) + vecteurs,
+# fusionnés par Reciprocal Rank Fusion ; un code de formation exact
+# (5 chiffres) est servi directement sans embedding
+HYBRID_SEARCH = True
+HYBRID_CANDIDATES = 100
+RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Rappel minimal accepté par bench_index_types face à l'index exact
+INDEX_RECALL_TARGET = 0.95
+
 # =========================
 # Embeddings
 # =========================
 EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
 
+# Micro-batching des questions : les questions arrivant dans la même
+# fenêtre sont encodées en un seul appel
+QUERY_BATCHING = True
+QUERY_BATCH_MAX_SIZE = 32
+QUERY_BATCH_WINDOW_MS = 5
+# Attente maximale d'un appelant (file bloquée, encodeur figé)
+QUERY_BATCH_TIMEOUT_S = 30.0
+
+# Cache LRU question normalisée -> embedding
+QUERY_CACHE_SIZE = 2048
+
+# =========================
+# Requêtes structurées
+# =========================
+# Questions factuelles (code, معدل القبول, formations d'une جامعة/شعبة)
+# servies directement depuis processed_scores_<YEAR>.json (score/paths.py),
+# sans LLM
+STRUCTURED_QUERIES = True
+# Nombre maximal de formations listées dans une réponse structurée
+STRUCTURED_MAX_ROWS = 20
+
+# =========================
+# Contexte du prompt
+# =========================
+# Nombre de blocs récupérés avant l'assemblage du contexte
+CONTEXT_CANDIDATES = 50
+# Compression extractive : seuls les champs utiles au sujet de la question
+# sont gardés, les valeurs répétées sont factorisées (bench_compression)
+CONTEXT_COMPRESSION = True
+# Budget de tokens (estimés) du contexte envoyé au LLM
+CONTEXT_TOKEN_BUDGET = 3000
+# Estimation sans tokenizer : ~3 caractères par token pour l'arabe
+CONTEXT_CHARS_PER_TOKEN = 3.0
+# En dessous, le bloc qui dépasse est abandonné plutôt que tronqué
+CONTEXT_MIN_TRUNCATE_TOKENS = 40
+
+# =========================
+# Mémoire de conversation
+# =========================
+# Stockée sur le document de la conversation : résumé roulant + derniers
+# échanges, de taille bornée quelle que soit la longueur de la conversation
+CONVERSATION_RECENT_TURNS = 3
+CONVERSATION_SUMMARY_MAX_CHARS = 1200
+CONVERSATION_TURN_MAX_CHARS = 600
+# Une question d'au plus N mots sans sujet, code, شعبة ni جامعة propres
+# est traitée comme une relance : la recherche la complète avec la
+# question précédente
+FOLLOWUP_MAX_WORDS = 4
+
+# =========================
+# Single-flight
+# =========================
+# Une question identique (normalisée, avec le même historique de
+# conversation) déjà en cours de traitement n'est pas recalculée : les
+# appelants suivants attendent le même résultat
+SINGLE_FLIGHT = True
+
+# =========================
+# Cache sémantique des réponses
+# =========================
+# Une question assez proche (cosinus) d'une question déjà répondue,
+# sur la même version de l'index, reçoit la réponse stockée sans appel LLM
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_THRESHOLD = 0.95
+ANSWER_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ANSWER_CACHE_MAX_ENTRIES = 5000
+# Écriture disque différée (s) : hors du chemin de la requête
+ANSWER_CACHE_FLUSH_SECONDS = 5.0
+
 # =========================
 # LLM Gemini
 # =========================
 USE_LLM = True
-LLM_PROVIDER = "gemini"
+# "gemini" ou "local" (substitut déterministe, sans réseau ni clé API)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
 GEMINI_MODEL = "gemini-2.5-flash"
 
 LLM_TEMPERATURE = 0.2
 
 # ⬇️ CLÉ DU PROBLÈME : marge large pour réponses narratives
 LLM_MAX_OUTPUT_TOKENS = 8096
+
+# Client LLM asynchrone partagé : appels simultanés plafonnés, délai par
+# appel, nouvelles tentatives (backoff exponentiel) sur erreurs transitoires
+LLM_MAX_CONCURRENCY = 8
+LLM_TIMEOUT_SECONDS = 60
+LLM_MAX_RETRIES = 3
+LLM_RETRY_BASE_DELAY = 0.5
+
+# Substitut local (LLM_PROVIDER = "local") : benchmarks et tests de charge
+LOCAL_LLM_LATENCY_SECONDS = 0.3     # avant le premier token
+LOCAL_LLM_TOKEN_SECONDS = 0.01      # entre deux tokens
+LOCAL_LLM_OUTPUT_TOKENS = 200
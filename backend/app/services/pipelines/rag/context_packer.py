@@ -0,0 +1,140 @@
+import math
+
+from .metrics import Histogram
+from .question_parser import normalize_question
+
+
+class PackedContext:
+    def __init__(self, text: str, blocks: int, tokens: int, raw_tokens: int,
+                 duplicates: int, dropped: int, truncated: bool):
+        self.text = text
+        self.blocks = blocks
+        self.tokens = tokens
+        self.raw_tokens = raw_tokens
+        self.duplicates = duplicates
+        self.dropped = dropped
+        self.truncated = truncated
+
+
+class ContextPacker:
+    """
+    Assemble le contexte du prompt dans un budget de tokens :
+    - supprime les blocs en double ou contenus dans un bloc déjà retenu
+    - ordonne par score de recherche décroissant
+    - remplit le budget ; le premier bloc qui dépasse est tronqué (par
+      lignes) s'il reste assez de place, les suivants sont abandonnés
+    Le nombre de tokens est estimé (caractères / chars_per_token), sans
+    tokenizer : suffisant pour dimensionner le prompt.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        chars_per_token: float,
+        min_truncate_tokens: int,
+        separator: str = "\n\n"
+    ):
+        self.budget = budget
+        self.chars_per_token = chars_per_token
+        self.min_truncate_tokens = min_truncate_tokens
+        self.separator = separator
+        self._separator_tokens = self.estimate_tokens(separator)
+
+        self._tokens = Histogram([250, 500, 1000, 2000, 4000, 8000, 16000])
+        self._raw_tokens = Histogram([250, 500, 1000, 2000, 4000, 8000, 16000])
+        self._counters = {"requests": 0, "duplicates": 0, "dropped": 0, "truncated": 0}
+
+    def estimate_tokens(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    # -----------------------------
+    # Déduplication
+    # -----------------------------
+    @staticmethod
+    def _lines(block: str) -> frozenset[str]:
+        return frozenset(
+            normalize_question(line)
+            for line in block.splitlines()
+            if line.strip()
+        )
+
+    def _dedupe(self, chunks: list[tuple[str, float]]) -> list[tuple[str, float]]:
+        kept, kept_lines = [], []
+        for text, score in sorted(chunks, key=lambda c: -c[1]):
+            lines = self._lines(text)
+            if not lines or any(lines <= other for other in kept_lines):
+                continue
+            kept.append((text, score))
+            kept_lines.append(lines)
+        return kept
+
+    # -----------------------------
+    # Remplissage du budget
+    # -----------------------------
+    def _truncate(self, block: str, budget: int) -> str:
+        lines, used = [], 0
+        for line in block.splitlines():
+            cost = self.estimate_tokens(line + "\n")
+            if used + cost > budget:
+                break
+            lines.append(line)
+            used += cost
+        return "\n".join(lines)
+
+    def pack(self, chunks: list[tuple[str, float]]) -> PackedContext:
+        """
+        chunks : (texte, score de recherche) ; plus le score est haut,
+        plus le bloc a de valeur
+        """
+        raw_tokens = sum(self.estimate_tokens(text) for text, _ in chunks)
+        raw_tokens += self._separator_tokens * max(0, len(chunks) - 1)
+
+        unique = self._dedupe(chunks)
+        duplicates = len(chunks) - len(unique)
+
+        blocks, used, truncated = [], 0, False
+        for text, _ in unique:
+            cost = self.estimate_tokens(text) + (self._separator_tokens if blocks else 0)
+            if used + cost <= self.budget:
+                blocks.append(text)
+                used += cost
+                continue
+
+            remaining = self.budget - used - (self._separator_tokens if blocks else 0)
+            if remaining >= self.min_truncate_tokens:
+                partial = self._truncate(text, remaining)
+                if partial:
+                    blocks.append(partial)
+                    used += self.estimate_tokens(partial) + (
+                        self._separator_tokens if len(blocks) > 1 else 0
+                    )
+                    truncated = True
+            break
+
+        dropped = len(unique) - len(blocks)
+        packed = PackedContext(
+            text=self.separator.join(blocks),
+            blocks=len(blocks),
+            tokens=used,
+            raw_tokens=raw_tokens,
+            duplicates=duplicates,
+            dropped=dropped,
+            truncated=truncated
+        )
+
+        self._tokens.observe(packed.tokens)
+        self._raw_tokens.observe(packed.raw_tokens)
+        self._counters["requests"] += 1
+        self._counters["duplicates"] += duplicates
+        self._counters["dropped"] += dropped
+        self._counters["truncated"] += int(truncated)
+
+        return packed
+
+    def stats(self) -> dict:
+        return {
+            "budget": self.budget,
+            **self._counters,
+            "tokens": self._tokens.snapshot(),
+            "raw_tokens": self._raw_tokens.snapshot(),
+        }
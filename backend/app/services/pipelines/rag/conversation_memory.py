@@ -0,0 +1,131 @@
+import re
+
+from .intent import detect_intent
+
+# Débuts d'une question qui s'appuie sur la précédente ("ماذا عن ...")
+FOLLOWUP_MARKERS = ("ماذا عن", "نفس", "هذا", "هذه", "ذلك", "تلك")
+# Mots qu'un "و" collé introduit en relance ("وماذا", "وفي") ; "و" seul
+# compte aussi ("و في ..."), mais pas un mot qui commence par و (وزارة)
+FOLLOWUP_CLITIC_WORDS = ("ماذا", "في", "بالنسبة", "نفس", "هذا", "هذه", "ذلك", "تلك")
+
+
+def is_followup(question: str) -> bool:
+    words = re.findall(r"\w+", question)
+    if not words:
+        return False
+    first = words[0]
+    if first == "و" or (first.startswith("و") and first[1:] in FOLLOWUP_CLITIC_WORDS):
+        return True
+    text = " ".join(words)
+    return any(text == marker or text.startswith(marker + " ") for marker in FOLLOWUP_MARKERS)
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + "…"
+
+
+class ConversationMemory:
+    """
+    Mémoire bornée d'une conversation, stockée sur son document Mongo :
+    un résumé roulant des échanges anciens + les N derniers échanges.
+    Sa taille ne dépend pas de la longueur de la conversation : une seule
+    lecture (le document) et un prompt de taille constante à chaque tour.
+
+    Le résumé est extractif (question + début de réponse), sans appel LLM.
+    """
+
+    def __init__(self, summary: str = "", turns: list[dict] | None = None):
+        self.summary = summary or ""
+        self.turns = list(turns or [])
+
+    @classmethod
+    def from_document(cls, conversation: dict | None) -> "ConversationMemory":
+        if not conversation:
+            return cls()
+        return cls(
+            conversation.get("summary") or "",
+            conversation.get("recent_turns") or []
+        )
+
+    def to_document(self) -> dict:
+        return {"summary": self.summary, "recent_turns": self.turns}
+
+    def __bool__(self) -> bool:
+        return bool(self.summary or self.turns)
+
+    @property
+    def last_question(self) -> str | None:
+        return self.turns[-1]["question"] if self.turns else None
+
+    # -----------------------------
+    # Question autonome
+    # -----------------------------
+    def standalone_query(self, question: str, followup_max_words: int) -> str:
+        """
+        Requête de recherche pour la question : une relance ("وفي جامعة
+        صفاقس؟", ou une question courte sans sujet ni filtre propre,
+        "في صفاقس؟") est complétée par la question précédente. Une
+        question courte mais complète ("ما هي مدة الصيدلة") reste seule.
+        """
+        last = self.last_question
+        if not last:
+            return question
+        if is_followup(question):
+            return f"{last} {question}"
+        if len(question.split()) <= followup_max_words:
+            intent = detect_intent(question)
+            if not (intent.topic != "general" or intent.codes
+                    or intent.sections or intent.universities):
+                return f"{last} {question}"
+        return question
+
+    # -----------------------------
+    # Prompt
+    # -----------------------------
+    def render(self) -> str:
+        lines = []
+        if self.summary:
+            lines.append("ملخص ما سبق:")
+            lines.append(self.summary)
+        if self.turns:
+            lines.append("آخر التبادلات:")
+            for turn in self.turns:
+                lines.append(f"- سؤال: {turn['question']}")
+                lines.append(f"  جواب: {turn['answer']}")
+        return "\n".join(lines)
+
+    # -----------------------------
+    # Mise à jour incrémentale
+    # -----------------------------
+    def with_turn(
+        self,
+        question: str,
+        answer: str,
+        max_turns: int,
+        summary_max_chars: int,
+        turn_max_chars: int
+    ) -> "ConversationMemory":
+        """
+        Nouvelle mémoire après un échange : l'échange rejoint les derniers
+        tours, ceux qui sortent de la fenêtre passent dans le résumé (les
+        lignes les plus anciennes du résumé sont abandonnées au-delà de
+        summary_max_chars).
+        """
+        turns = self.turns + [{
+            "question": _shorten(question, turn_max_chars),
+            "answer": _shorten(answer, turn_max_chars),
+        }]
+        evicted, turns = turns[:-max_turns], turns[-max_turns:]
+
+        summary = [line for line in self.summary.splitlines() if line]
+        for turn in evicted:
+            summary.append(
+                f"- {_shorten(turn['question'], 120)} ← {_shorten(turn['answer'], 160)}"
+            )
+        while summary and len("\n".join(summary)) > summary_max_chars:
+            summary.pop(0)
+
+        return ConversationMemory("\n".join(summary), turns)
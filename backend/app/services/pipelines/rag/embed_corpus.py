@@ -1,12 +1,9 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from .config import EMBEDDING_MODEL
-
-model = SentenceTransformer(EMBEDDING_MODEL)
+from .encoder import get_encoder
 
 
 def embed_corpus(chunks: list[str]) -> np.ndarray:
-    embeddings = model.encode(
+    embeddings = get_encoder().encode(
         chunks,
         normalize_embeddings=True,
         show_progress_bar=True
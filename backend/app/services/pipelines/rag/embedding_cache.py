@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Cache LRU borné : question normalisée -> embedding.
+    Le cache est vidé automatiquement si le modèle d'embedding change.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_name = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+
+    @staticmethod
+    def _entry_bytes(key: str, vector: np.ndarray) -> int:
+        return len(key.encode("utf-8")) + vector.nbytes
+
+    def _check_model(self, model_name: str):
+        if self._model_name != model_name:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._model_name = model_name
+
+    def get(self, key: str, model_name: str) -> np.ndarray | None:
+        with self._lock:
+            self._check_model(model_name)
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray, model_name: str):
+        if self.capacity <= 0:
+            return
+
+        with self._lock:
+            self._check_model(model_name)
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_bytes(key, old)
+
+            self._entries[key] = vector
+            self._bytes += self._entry_bytes(key, vector)
+
+            while len(self._entries) > self.capacity:
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._bytes -= self._entry_bytes(old_key, old_vector)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "model": self._model_name,
+            "capacity": self.capacity,
+            "size": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
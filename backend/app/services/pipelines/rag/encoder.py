@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+from . import config
+
+try:
+    import psutil
+except ImportError:  # psutil est optionnel : seule la RSS ne sera pas mesurée
+    psutil = None
+
+
+class Encoder:
+    """
+    Encodeur SentenceTransformer partagé par l'indexation et la recherche.
+    Le modèle est chargé à la première utilisation (ou au warmup), une seule
+    fois, et les appels encode() concurrents du threadpool FastAPI sont
+    sérialisés (le tokenizer HF n'est pas thread-safe).
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+
+        self._load_seconds = None
+        self._rss_delta_bytes = None
+        self._param_bytes = None
+
+    # -----------------------------
+    # Chargement paresseux
+    # -----------------------------
+    def load(self):
+        if self._model is not None:
+            return self._model
+
+        with self._load_lock:
+            if self._model is not None:
+                return self._model
+
+            from sentence_transformers import SentenceTransformer
+
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+
+            model = SentenceTransformer(self.model_name)
+
+            self._load_seconds = time.perf_counter() - start
+            rss_after = _rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                self._rss_delta_bytes = rss_after - rss_before
+            self._param_bytes = sum(
+                p.numel() * p.element_size() for p in model.parameters()
+            )
+
+            self._model = model
+
+            print(
+                f"✅ Modèle d'embedding {self.model_name} chargé "
+                f"en {self._load_seconds:.2f}s"
+            )
+
+            return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def dimension(self) -> int:
+        return self.load().get_sentence_embedding_dimension()
+
+    # -----------------------------
+    # Encodage
+    # -----------------------------
+    def encode(self, texts: list[str], **kwargs):
+        model = self.load()
+        with self._encode_lock:
+            return model.encode(texts, **kwargs)
+
+    def info(self) -> dict:
+        return {
+            "model": self.model_name,
+            "loaded": self.is_loaded,
+            "load_seconds": (
+                round(self._load_seconds, 3)
+                if self._load_seconds is not None else None
+            ),
+            "param_bytes": self._param_bytes,
+            "rss_delta_bytes": self._rss_delta_bytes,
+        }
+
+
+def _rss_bytes() -> int | None:
+    if psutil is None:
+        return None
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+# ======================================================
+# Registre : un seul encodeur par modèle et par processus
+# ======================================================
+_encoders: dict[str, Encoder] = {}
+_registry_lock = threading.Lock()
+
+
+def get_encoder(model_name: str | None = None) -> Encoder:
+    model_name = model_name or config.EMBEDDING_MODEL
+    encoder = _encoders.get(model_name)
+    if encoder is not None:
+        return encoder
+
+    with _registry_lock:
+        if model_name not in _encoders:
+            _encoders[model_name] = Encoder(model_name)
+        return _encoders[model_name]
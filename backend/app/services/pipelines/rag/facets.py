@@ -0,0 +1,271 @@
+import re
+import threading
+
+import faiss
+import numpy as np
+
+from .index_factory import search_parameters
+from .lexical_index import normalize_arabic
+
+# ======================================================
+# Facettes reconnues
+# ======================================================
+# Forme canonique -> variantes (OCR, orthographe) ; l'ordre compte :
+# "رياضيات" doit être testé avant "رياضة"
+BAC_SECTION_ALIASES = {
+    "رياضيات": ["رياضيات"],
+    "علوم تجريبية": ["تجريبية", "تجريبي"],
+    "علوم تقنية": ["تقنية"],
+    "علوم إعلامية": ["إعلامية", "اعلامية", "اإلعالمية", "إعالمية"],
+    "اقتصاد وتصرف": ["اقتصاد", "إقتصاد", "تصرف"],
+    "آداب": ["آداب", "اداب", "أداب", "بادآ"],
+    "رياضة": ["رياضة"],
+}
+
+# Noms de شعبة sans ambiguïté (hors "شعبة ..."), ex : "إعلامية" seule peut
+# désigner une spécialité ("هندسة إعلامية"), pas la section
+SECTION_NAMES = {
+    "رياضيات": "رياضيات",
+    "علوم تجريبية": "علوم تجريبية",
+    "تجريبية": "علوم تجريبية",
+    "علوم تقنية": "علوم تقنية",
+    "علوم إعلامية": "علوم إعلامية",
+    "اقتصاد وتصرف": "اقتصاد وتصرف",
+    "آداب": "آداب",
+    "رياضة": "رياضة",
+}
+
+UNIVERSITY_CITIES = [
+    "تونس المنار", "تونس", "قرطاج", "منوبة", "جندوبة",
+    "نابل", "سوسة", "صفاقس", "قابس", "قفصة", "المنستير",
+    "القيروان", "سيدي بوزيد", "زغوان", "الزيتونة"
+]
+
+# Lignes des blocs produits par rag_block.build_rag_block()
+BLOCK_FIELDS = {
+    "bac_section": "شعبة الباكالوريا:",
+    "parent_university": "الجامعة:",
+    "duration": "المدة:",
+}
+
+
+def normalize_bac_section(raw: str | None) -> str | None:
+    if not raw:
+        return None
+    raw = re.sub(r"[()*]", " ", raw)
+    raw = re.sub(r"\s+", " ", raw).strip()
+    for canonical, aliases in BAC_SECTION_ALIASES.items():
+        if any(alias in raw for alias in aliases):
+            return canonical
+    return None
+
+
+def _university_key(text: str) -> str:
+    # L'extraction OCR perd souvent les "ب" (ex: "جامعة منو ة")
+    return re.sub(r"[\sب]", "", text)
+
+
+def normalize_university(raw: str | None) -> str | None:
+    if not raw:
+        return None
+    key = _university_key(raw)
+    for city in UNIVERSITY_CITIES:  # "تونس المنار" avant "تونس"
+        if key.startswith(_university_key(f"جامعة {city}")):
+            return f"جامعة {city}"
+    return None
+
+
+def entry_university(entry: dict) -> str | None:
+    """
+    جامعة d'une ligne de la table traitée. L'extraction coupe parfois le
+    nom entre les deux colonnes : "جامعة تونس" + "المنار كلية الطب..."
+    ou "جامعة تونس" + "تونس المنار المعهد العالي..." ; on garde alors la
+    جامعة la plus précise qui prolonge celle de parent_university.
+    """
+    parent_raw = entry.get("parent_university") or ""
+    institution = entry.get("university") or ""
+    parent = normalize_university(parent_raw)
+    if parent is None:
+        return normalize_university(f"{parent_raw} {institution}")
+
+    for text in (f"{parent_raw} {institution}", f"جامعة {institution}"):
+        university = normalize_university(text)
+        if university and university != parent and university.startswith(parent):
+            return university
+    return parent
+
+
+def normalize_duration(raw: str | None) -> str | None:
+    if not raw:
+        return None
+    m = re.search(r"(\d+)\s*سنوات?", raw)
+    return f"{m.group(1)} سنوات" if m else None
+
+
+# ======================================================
+# Détection des facettes dans la question
+# ======================================================
+# Les alias courts ne valent شعبة qu'après un mot de contexte
+_SECTION_PREFIX = re.compile(r"(?:شعبه|باكالوريا|بكالوريا)\s+((?:\S+\s*){1,3})")
+_SECTION_NAMES = sorted(
+    ((normalize_arabic(name), canonical) for name, canonical in SECTION_NAMES.items()),
+    key=lambda item: -len(item[0])
+)
+_SECTION_ALIASES = [
+    (canonical, [normalize_arabic(alias) for alias in aliases])
+    for canonical, aliases in BAC_SECTION_ALIASES.items()
+]
+
+
+def contains_phrase(text: str, phrase: str) -> bool:
+    """phrase (normalisée) présente comme mot entier, clitique و/ب/ل/ف admis"""
+    return f" {phrase} " in text or any(
+        f" {prefix}{phrase} " in text for prefix in ("و", "ب", "ل", "ف")
+    )
+
+
+def detect_sections(text: str) -> tuple[set[str], str]:
+    """
+    شعب citées dans un texte normalisé (normalize_arabic, entouré
+    d'espaces) : alias après "شعبة"/"باكالوريا", ou nom complet seul.
+    Renvoie aussi le texte privé des mentions reconnues.
+    """
+    sections = set()
+    m = _SECTION_PREFIX.search(text)
+    if m:
+        for canonical, aliases in _SECTION_ALIASES:  # "رياضيات" avant "رياضة"
+            if any(alias in m.group(1) for alias in aliases):
+                sections.add(canonical)
+                text = text.replace(m.group(0), " ")
+                break
+    for phrase, canonical in _SECTION_NAMES:
+        if contains_phrase(text, phrase):
+            sections.add(canonical)
+            text = text.replace(phrase, " ")
+    return sections, text
+
+
+def detect_facets(question: str) -> dict[str, set[str]]:
+    facets: dict[str, set[str]] = {}
+
+    words = re.sub(r"[^\w\s]", " ", normalize_arabic(question))
+    sections, _ = detect_sections(f" {words} ")
+    if sections:
+        facets["bac_section"] = sections
+
+    universities = set()
+    text = question
+    for city in UNIVERSITY_CITIES:  # "تونس المنار" avant "تونس"
+        if f"جامعة {city}" in text:
+            universities.add(f"جامعة {city}")
+            text = text.replace(f"جامعة {city}", " ")
+    if universities:
+        facets["parent_university"] = universities
+
+    duration = normalize_duration(question)
+    if duration:
+        facets["duration"] = {duration}
+
+    return facets
+
+
+# ======================================================
+# Bitmaps par facette
+# ======================================================
+class FacetIndex:
+    """
+    Bitmaps d'IDs précalculés par valeur de facette.
+    Les chunks sans facette (règles d'orientation) restent toujours
+    candidats.
+    """
+
+    NORMALIZERS = {
+        "bac_section": normalize_bac_section,
+        "parent_university": normalize_university,
+        "duration": normalize_duration,
+    }
+
+    def __init__(self, index, size: int):
+        self.index = index
+        self.size = size
+        self.bitmaps: dict[tuple[str, str], np.ndarray] = {}
+        self.general = np.zeros(size, dtype=bool)
+
+        self._lock = threading.Lock()
+        self.filtered_searches = 0
+        self.candidate_ratio_sum = 0.0
+
+    @classmethod
+    def from_corpus(cls, index, corpus: list[str]) -> "FacetIndex":
+        facet_index = cls(index, len(corpus))
+
+        for i, chunk in enumerate(corpus):
+            if not chunk:  # ID libéré par une mise à jour incrémentale
+                continue
+            values = facet_index._chunk_facets(chunk)
+            if not values:
+                facet_index.general[i] = True
+                continue
+            for facet, value in values.items():
+                bitmap = facet_index.bitmaps.get((facet, value))
+                if bitmap is None:
+                    bitmap = np.zeros(len(corpus), dtype=bool)
+                    facet_index.bitmaps[(facet, value)] = bitmap
+                bitmap[i] = True
+
+        return facet_index
+
+    def _chunk_facets(self, chunk: str) -> dict[str, str]:
+        values = {}
+        for line in chunk.splitlines():
+            for facet, label in BLOCK_FIELDS.items():
+                if line.startswith(label):
+                    value = self.NORMALIZERS[facet](line[len(label):])
+                    if value:
+                        values[facet] = value
+        return values
+
+    def candidates(self, facets: dict[str, set[str]]) -> np.ndarray | None:
+        mask = None
+        for facet, values in facets.items():
+            facet_mask = np.zeros(self.size, dtype=bool)
+            known = False
+            for value in values:
+                bitmap = self.bitmaps.get((facet, value))
+                if bitmap is not None:
+                    facet_mask |= bitmap
+                    known = True
+            if not known:
+                continue
+            mask = facet_mask if mask is None else mask & facet_mask
+
+        if mask is None:
+            return None
+        return mask | self.general
+
+    def search_params(self, mask: np.ndarray):
+        """
+        Paramètres FAISS restreignant la recherche aux candidats du masque.
+        """
+        bitmap = np.packbits(mask, bitorder="little")
+        selector = faiss.IDSelectorBitmap(self.size, faiss.swig_ptr(bitmap))
+        params = search_parameters(self.index, selector)
+        # Garder le buffer vivant tant que le sélecteur est utilisé
+        params.bitmap = bitmap
+
+        with self._lock:
+            self.filtered_searches += 1
+            self.candidate_ratio_sum += float(mask.sum()) / max(self.size, 1)
+
+        return params
+
+    def stats(self) -> dict:
+        return {
+            "facet_values": len(self.bitmaps),
+            "general_chunks": int(self.general.sum()),
+            "filtered_searches": self.filtered_searches,
+            "mean_candidate_ratio": (
+                round(self.candidate_ratio_sum / self.filtered_searches, 4)
+                if self.filtered_searches else None
+            ),
+        }
@@ -0,0 +1,251 @@
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from .load_corpus import load_corpus
+from .chunk_store import ChunkStore
+from .embed_corpus import embed_corpus
+from .index_factory import build_index, configure_search, index_type_of, supports_removal
+from .config import EMBEDDING_MODEL, INDEX_TYPE
+
+# Au-delà de cette proportion d'IDs libérés, on renumérote (sans ré-encoder)
+MAX_HOLE_RATIO = 0.5
+
+
+def chunk_hash(chunk: str) -> str:
+    return hashlib.sha1(chunk.encode("utf-8")).hexdigest()
+
+
+# ======================================================
+# Cache d'embeddings par chunk (hash -> id, vecteur)
+# ======================================================
+def load_chunk_cache(cache_path: Path) -> dict | None:
+    if not cache_path.exists():
+        return None
+
+    data = np.load(cache_path, allow_pickle=False)
+    if str(data["model"]) != EMBEDDING_MODEL:
+        return None
+
+    return {
+        "hashes": [str(h) for h in data["hashes"]],
+        "ids": data["ids"].astype("int64"),
+        "vectors": data["vectors"].astype("float32"),
+    }
+
+
+def save_chunk_cache(cache_path: Path, hashes: list[str], ids, vectors):
+    _stage_chunk_cache(cache_path, hashes, ids, vectors).replace(cache_path)
+
+
+def _stage_chunk_cache(cache_path: Path, hashes: list[str], ids, vectors) -> Path:
+    tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp.npz")
+    np.savez(
+        tmp,
+        model=np.array(EMBEDDING_MODEL),
+        hashes=np.array(hashes, dtype="U40"),
+        ids=np.asarray(ids, dtype="int64"),
+        vectors=np.asarray(vectors, dtype="float32"),
+    )
+    return tmp
+
+
+def _index_ids(index) -> np.ndarray:
+    return np.sort(faiss.vector_to_array(faiss.downcast_index(index).id_map))
+
+
+def index_is_current(
+    corpus_paths: list[Path],
+    index_path: Path,
+    store_path: Path,
+    cache_path: Path
+) -> bool:
+    """
+    Vrai si l'index publié est complet et plus récent que les corpus.
+    Le cache est publié en dernier par update_index : un index ou un
+    store plus récent que lui vient d'une mise à jour interrompue, un
+    corpus plus récent d'une modification pas encore indexée.
+    """
+    paths = [index_path, *ChunkStore.paths(store_path)]
+    if not cache_path.exists() or not all(p.exists() for p in paths):
+        return False
+    published = cache_path.stat().st_mtime_ns
+    return all(
+        p.stat().st_mtime_ns <= published
+        for p in paths + [c for c in corpus_paths if c.exists()]
+    )
+
+
+def _seed_from_legacy(index_path: Path, meta_path: Path | None) -> dict | None:
+    """
+    Ancien format (IndexFlatIP sans IDMap + liste picklée) : on récupère
+    les vecteurs exacts pour ne pas ré-encoder lors de la migration.
+    """
+    if meta_path is None or not (index_path.exists() and meta_path.exists()):
+        return None
+
+    index = faiss.read_index(str(index_path))
+    if not isinstance(index, faiss.IndexFlat):
+        return None
+
+    with open(meta_path, "rb") as f:
+        corpus = pickle.load(f)
+    if len(corpus) != index.ntotal:
+        return None
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    seen, hashes, keep = set(), [], []
+    for i, chunk in enumerate(corpus):
+        h = chunk_hash(chunk)
+        if h not in seen:
+            seen.add(h)
+            hashes.append(h)
+            keep.append(i)
+
+    return {
+        "hashes": hashes,
+        "ids": np.arange(len(hashes), dtype="int64"),
+        "vectors": vectors[keep].astype("float32"),
+    }
+
+
+# ======================================================
+# Mise à jour incrémentale
+# ======================================================
+def update_index(
+    corpus_paths: list[Path],
+    index_path: Path,
+    store_path: Path,
+    cache_path: Path,
+    legacy_meta_path: Path | None = None,
+    index_type: str = INDEX_TYPE
+):
+    """
+    Met l'index à jour à partir des corpus :
+    - les chunks inchangés réutilisent leur embedding en cache
+    - seuls les chunks nouveaux ou modifiés sont encodés
+    - les chunks supprimés sont retirés de l'index par leur ID
+
+    Si l'index existant n'est pas du type demandé (INDEX_TYPE modifié),
+    il est reconstruit à partir des embeddings en cache.
+
+    Le ChunkStore est indexé par ID ; un ID libéré y laisse une chaîne vide.
+    """
+    start = time.perf_counter()
+
+    # -----------------------------
+    # Corpus courant (dédoublonné)
+    # -----------------------------
+    chunks: dict[str, str] = {}
+    for path in corpus_paths:
+        if not path.exists():
+            raise FileNotFoundError(f"❌ Corpus manquant : {path}")
+        for chunk in load_corpus(path):
+            chunks.setdefault(chunk_hash(chunk), chunk)
+
+    # -----------------------------
+    # État précédent
+    # -----------------------------
+    cache = load_chunk_cache(cache_path)
+    index = None
+    if cache is not None and index_path.exists():
+        index = faiss.read_index(str(index_path))
+        if not isinstance(faiss.downcast_index(index), faiss.IndexIDMap2):
+            index = None
+        elif index_type_of(index) != index_type:
+            print(f"🔁 Type d'index modifié ({index_type_of(index)} -> {index_type}) : reconstruction")
+            index = None
+        elif not np.array_equal(_index_ids(index), np.sort(cache["ids"])):
+            # Mise à jour interrompue entre deux publications
+            print("⚠️ Index et cache d'embeddings désynchronisés : reconstruction")
+            index = None
+    if cache is None:
+        cache = _seed_from_legacy(index_path, legacy_meta_path)
+    if cache is None:
+        cache = {
+            "hashes": [],
+            "ids": np.zeros(0, dtype="int64"),
+            "vectors": None,
+        }
+
+    cached = {h: i for i, h in enumerate(cache["hashes"])}
+    removed = [h for h in cached if h not in chunks]
+    added = [h for h in chunks if h not in cached]
+    kept = [h for h in cache["hashes"] if h in chunks]
+
+    # -----------------------------
+    # Encodage des seuls nouveaux chunks
+    # -----------------------------
+    new_vectors = (
+        embed_corpus([chunks[h] for h in added]) if added else None
+    )
+
+    next_id = int(cache["ids"].max()) + 1 if len(cache["ids"]) else 0
+    new_ids = np.arange(next_id, next_id + len(added), dtype="int64")
+
+    hashes = kept + added
+    kept_rows = [cached[h] for h in kept]
+    ids = np.concatenate([cache["ids"][kept_rows], new_ids])
+    parts = []
+    if kept_rows:
+        parts.append(cache["vectors"][kept_rows])
+    if new_vectors is not None:
+        parts.append(new_vectors)
+    if not parts:
+        raise ValueError("❌ Corpus vide : aucun chunk à indexer")
+    vectors = np.vstack(parts).astype("float32")
+
+    # -----------------------------
+    # Index : mise à jour sur place ou reconstruction
+    # -----------------------------
+    max_id = int(ids.max()) + 1
+    holes = 1 - len(ids) / max_id
+    incremental = (
+        index is not None
+        and supports_removal(index)
+        and holes <= MAX_HOLE_RATIO
+    )
+
+    if incremental:
+        configure_search(index)
+        if removed:
+            index.remove_ids(
+                np.array([cache["ids"][cached[h]] for h in removed], dtype="int64")
+            )
+        if added:
+            index.add_with_ids(new_vectors, new_ids)
+    else:
+        if holes > MAX_HOLE_RATIO:
+            ids = np.arange(len(hashes), dtype="int64")
+        index = build_index(vectors, index_type, ids=ids)
+
+    corpus = [""] * (int(ids.max()) + 1)
+    for h, i in zip(hashes, ids):
+        corpus[i] = chunks[h]
+
+    # Les trois fichiers sont écrits à part puis publiés par os.replace
+    # (les workers peuvent avoir les anciens en mmap). Le cache, qui sert
+    # de référence à la mise à jour suivante, est publié en dernier : si
+    # le processus s'arrête avant, ses IDs ne correspondent plus à ceux
+    # de l'index et la mise à jour suivante reconstruit l'index.
+    tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    faiss.write_index(index, str(tmp_index))
+    tmp_store = ChunkStore.stage(store_path, corpus)
+    tmp_cache = _stage_chunk_cache(cache_path, hashes, ids, vectors)
+
+    tmp_index.replace(index_path)
+    tmp_store.replace(ChunkStore.paths(store_path)[0])
+    tmp_cache.replace(cache_path)
+
+    print(
+        f"✅ Index FAISS {'mis à jour' if incremental else 'construit'} : "
+        f"{len(hashes)} chunks ({len(added)} encodés, {len(kept)} réutilisés, "
+        f"{len(removed)} retirés) en {time.perf_counter() - start:.2f}s"
+    )
+
+    return index, ChunkStore(store_path)
@@ -0,0 +1,126 @@
+import faiss
+import numpy as np
+
+from .config import (
+    INDEX_TYPE,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    IVF_NLIST,
+    IVF_NPROBE,
+    PQ_M,
+    PQ_NBITS
+)
+
+INDEX_TYPES = ["flat", "hnsw", "ivf", "ivfpq"]
+
+
+def create_index(embeddings: np.ndarray, index_type: str = INDEX_TYPE):
+    """
+    Crée un index FAISS vide (produit scalaire = cosinus sur vecteurs
+    normalisés) du type demandé, entraîné si nécessaire sur les embeddings.
+    """
+    n, dim = embeddings.shape
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+
+    elif index_type in ("ivf", "ivfpq"):
+        # ~39 points d'entraînement par centroïde au minimum
+        nlist = max(1, min(IVF_NLIST, n // 39))
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == "ivf":
+            index = faiss.IndexIVFFlat(
+                quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, PQ_M, PQ_NBITS,
+                faiss.METRIC_INNER_PRODUCT
+            )
+        index.train(embeddings)
+
+    else:
+        raise ValueError(
+            f"INDEX_TYPE inconnu : {index_type} (attendu : {INDEX_TYPES})"
+        )
+
+    return index
+
+
+def build_index(
+    embeddings: np.ndarray,
+    index_type: str = INDEX_TYPE,
+    ids: np.ndarray | None = None
+):
+    """
+    Construit et remplit l'index. Avec ids, l'index est enveloppé dans un
+    IndexIDMap2 pour permettre les mises à jour incrémentales.
+    """
+    index = create_index(embeddings, index_type)
+
+    if ids is None:
+        index.add(embeddings)
+    else:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(embeddings, ids.astype("int64"))
+
+    configure_search(index)
+    return index
+
+
+def supports_removal(index) -> bool:
+    # HNSW ne permet pas de retirer des vecteurs
+    return not isinstance(_base_index(index), faiss.IndexHNSW)
+
+
+def _base_index(index):
+    # Les index IDMap enveloppent l'index réel
+    index = faiss.downcast_index(index)
+    if hasattr(index, "id_map"):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def index_type_of(index) -> str:
+    """Type (INDEX_TYPES) d'un index construit par build_index"""
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def configure_search(index):
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = HNSW_EF_SEARCH
+    elif isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(IVF_NPROBE, base.nlist)
+    return index
+
+
+def search_parameters(index, selector=None):
+    """
+    SearchParameters du bon type pour l'index (FAISS refuse des paramètres
+    génériques sur un index IVF ou HNSW).
+    """
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=HNSW_EF_SEARCH)
+    if isinstance(base, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(
+            sel=selector, nprobe=min(IVF_NPROBE, base.nlist)
+        )
+    return faiss.SearchParameters(sel=selector)
+
+
+def index_memory_bytes(index) -> int:
+    return int(faiss.serialize_index(index).size)
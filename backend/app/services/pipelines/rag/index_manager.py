@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+
+def _close(corpus):
+    close = getattr(corpus, "close", None)
+    if close is not None:
+        close()
+
+
+class IndexManager:
+    """
+    Garde l'index FAISS et la liste des chunks en mémoire pour tout le
+    processus : chargés une seule fois (warmup du lifespan FastAPI ou
+    premier appel), puis servis depuis la RAM à chaque search().
+
+    Des structures dérivées de l'index (bitmaps de facettes...) peuvent être
+    enregistrées : elles sont reconstruites à chaque (re)chargement.
+
+    Après un reload, le corpus précédent reste ouvert pour les requêtes en
+    cours ; il est fermé (close(), mmap et fichier) au reload suivant.
+    """
+
+    def __init__(self, loader: Callable, paths: list[Path]):
+        self._loader = loader
+        self._paths = paths
+        self._lock = threading.Lock()
+        self._builders: dict[str, Callable] = {}
+        self._derived: dict = {}
+
+        self._index = None
+        self._corpus = None
+        self._retired = None
+        self._fingerprint = None
+        self._loaded_at = None
+        self._load_seconds = None
+
+    # -----------------------------
+    # Chargement
+    # -----------------------------
+    def load(self, force: bool = False):
+        with self._lock:
+            if self._index is not None and not force:
+                return self._index, self._corpus
+
+            start = time.perf_counter()
+            index, corpus = self._loader()
+
+            _close(self._retired)
+            self._retired = self._corpus
+
+            self._index = index
+            self._corpus = corpus
+            self._derived = {
+                name: builder(index, corpus)
+                for name, builder in self._builders.items()
+            }
+            self._fingerprint = self._compute_fingerprint()
+            self._loaded_at = time.time()
+            self._load_seconds = time.perf_counter() - start
+
+            print(
+                f"✅ Index FAISS chargé en mémoire "
+                f"({len(corpus)} chunks, version {self._fingerprint})"
+            )
+
+            return self._index, self._corpus
+
+    def reload(self):
+        return self.load(force=True)
+
+    def close(self):
+        """Ferme le corpus courant et le précédent (arrêt du serveur)"""
+        with self._lock:
+            _close(self._retired)
+            _close(self._corpus)
+            self._retired = None
+            self._index = self._corpus = None
+            self._derived = {}
+
+    def get(self):
+        index, corpus = self._index, self._corpus
+        if index is None:
+            return self.load()
+        return index, corpus
+
+    # -----------------------------
+    # Structures dérivées
+    # -----------------------------
+    def register(self, name: str, builder: Callable):
+        """
+        builder(index, corpus) -> structure construite au chargement
+        """
+        self._builders[name] = builder
+
+    def derived(self, name: str):
+        self.get()
+        value = self._derived.get(name)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._builders[name](self._index, self._corpus)
+                    self._derived[name] = value
+        return value
+
+    # -----------------------------
+    # Version de l'index
+    # -----------------------------
+    def _compute_fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for path in self._paths:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()[:16]
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self.load()
+        return self._fingerprint
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._index is not None
+
+    def info(self) -> dict:
+        if self._index is None:
+            return {"loaded": False}
+
+        return {
+            "loaded": True,
+            "version": self._fingerprint,
+            "index_type": type(self._index).__name__,
+            "ntotal": int(self._index.ntotal),
+            "chunks": len(self._corpus),
+            "loaded_at": self._loaded_at,
+            "load_seconds": round(self._load_seconds, 4),
+        }
@@ -0,0 +1,139 @@
+import re
+
+from .facets import UNIVERSITY_CITIES, contains_phrase, detect_sections
+from .lexical_index import extract_codes, normalize_arabic, tokenize
+
+# ======================================================
+# Vocabulaire des intentions
+# ======================================================
+# Sujet de la question -> mots déclencheurs (formes normalisées plus bas)
+TOPIC_KEYWORDS = {
+    "formula": ["صيغة", "احتساب", "الاحتساب", "حساب", "formule"],
+    "score": ["معدل", "مجموع", "سكور", "عتبة", "score", "النقاط", "الأدنى"],
+    "duration": ["مدة", "المدة", "سنوات", "كم سنة"],
+    "programs": [
+        "التكوينات", "تكوينات", "الاختصاصات", "اختصاصات",
+        "الشعب", "قائمة", "تقبل", "المتاحة", "المتوفرة", "الإمكانيات",
+        "أدرس", "ادرس",
+    ],
+}
+
+# Questions d'explication ou de procédure : toujours laissées au RAG
+EXPLANATION_KEYWORDS = [
+    "كيف", "لماذا", "هل", "شروط", "مراحل", "مواعيد", "موعد", "الأيام",
+    "طريقة", "الفرق", "نصيحة", "أنصح", "تنصح", "أفضل", "افضل", "التوجيه",
+    "إعادة", "الدورة", "بطاقة",
+]
+
+
+def _phrase(text: str) -> str:
+    return f" {normalize_arabic(text)} "
+
+
+class Intent:
+    """
+    Ce que demande la question : sujet (formula, score, duration,
+    programs ou general) et filtres reconnus (codes, شعب, جامعات, معدل
+    de l'élève). `remainder` contient les mots restants (spécialité
+    éventuelle).
+    """
+
+    def __init__(self, topic: str, explanation: bool, codes: list[str],
+                 sections: set[str], universities: set[str], remainder: list[str],
+                 scores: list[float] | None = None):
+        self.topic = topic
+        self.explanation = explanation
+        self.codes = codes
+        self.sections = sections
+        self.universities = universities
+        self.remainder = remainder
+        self.scores = scores or []
+
+    @property
+    def is_lookup(self) -> bool:
+        """
+        Question factuelle à laquelle la table peut répondre seule
+        """
+        if self.explanation:
+            return False
+        if self.codes:
+            return True
+        return self.topic != "general" and bool(
+            self.sections or self.universities or self.remainder or self.scores
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "topic": self.topic,
+            "lookup": self.is_lookup,
+            "codes": self.codes,
+            "sections": sorted(self.sections),
+            "universities": sorted(self.universities),
+            "scores": self.scores,
+            "remainder": self.remainder,
+        }
+
+
+_TOPICS = {
+    topic: [normalize_arabic(k) for k in keywords]
+    for topic, keywords in TOPIC_KEYWORDS.items()
+}
+_EXPLANATIONS = [normalize_arabic(k) for k in EXPLANATION_KEYWORDS]
+_UNIVERSITIES = [
+    (normalize_arabic(f"جامعة {city}"), f"جامعة {city}")
+    for city in UNIVERSITY_CITIES  # "تونس المنار" avant "تونس"
+]
+_KEYWORD_TOKENS = {
+    token
+    for keywords in list(TOPIC_KEYWORDS.values()) + [EXPLANATION_KEYWORDS]
+    for keyword in keywords
+    for token in tokenize(keyword)
+} | set(tokenize(
+    "شعبة باكالوريا بكالوريا جامعة الرمز رمز كود تكوين التكوين الإجازة إجازة "
+    "المؤسسة مؤسسة اختصاص القبول قبول الأدنى أدنى للقبول سنة لسنة 2025 يمكن "
+    "ممكن الممكنة أريد نريد دراسة الدراسة التي الذي يتم متى "
+    "ما هي ماهي أين اين ماذا"
+))
+
+
+# معدل de l'élève (1 à 3 chiffres) ; codes (5), années (4) et durées
+# ("3 سنوات") sont à part
+_SCORE = re.compile(r"(?<![\d.,])\d{1,3}(?:[.,]\d+)?(?![\d.,])(?!\s*(?:سنوات|سنين))")
+
+
+def _is_keyword(token: str) -> bool:
+    # "بمعدل", "وللقبول"... : mot-clé précédé d'un clitique
+    return token in _KEYWORD_TOKENS or (
+        token[0] in "وبلف" and token[1:] in _KEYWORD_TOKENS
+    )
+
+
+def detect_intent(question: str) -> Intent:
+    text = _phrase(question)
+
+    explanation = any(contains_phrase(text, k) for k in _EXPLANATIONS)
+
+    topic = "general"
+    for name, keywords in _TOPICS.items():  # ordre = priorité
+        if any(contains_phrase(text, k) for k in keywords):
+            topic = name
+            break
+
+    codes = extract_codes(text)
+    for code in codes:
+        text = text.replace(code, " ")
+
+    universities = set()
+    for phrase, canonical in _UNIVERSITIES:
+        if phrase in text:
+            universities.add(canonical)
+            text = text.replace(phrase, " ")
+
+    sections, text = detect_sections(text)
+
+    scores = [float(n.replace(",", ".")) for n in _SCORE.findall(text)]
+    text = _SCORE.sub(" ", text)
+
+    remainder = [t for t in tokenize(text) if not _is_keyword(t)]
+
+    return Intent(topic, explanation, codes, sections, universities, remainder, scores)
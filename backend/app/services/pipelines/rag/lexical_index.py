@@ -0,0 +1,160 @@
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from .question_parser import normalize_question
+from .rag_block import build_rag_block
+
+CODE_PATTERN = re.compile(r"(?<!\d)\d{5}(?!\d)")
+
+STOP_WORDS = {
+    "في", "من", "على", "الى", "إلى", "عن", "مع", "او", "أو", "و", "ما",
+    "ماهي", "ماهو", "هي", "هو", "هل", "التي", "الذي", "كيف", "كم", "اي",
+    "أي", "لي", "هذا", "هذه", "بعد", "قبل", "عند", "كل", "ان", "أن", "لا",
+}
+
+_ALEF = re.compile(r"[أإآٱ]")
+_PREFIXES = ("وال", "بال", "فال", "كال", "لل", "ال")
+
+
+# ======================================================
+# Normalisation et tokenisation arabes
+# ======================================================
+def normalize_arabic(text: str) -> str:
+    text = normalize_question(text)
+    text = _ALEF.sub("ا", text).replace("ـ", "")  # tatweel : "الـطــب"
+    return text.replace("ى", "ي").replace("ة", "ه")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in re.findall(r"\w+", normalize_arabic(text)):
+        for prefix in _PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                token = token[len(prefix):]
+                break
+        if token not in STOP_WORDS and len(token) > 1:
+            tokens.append(token)
+    return tokens
+
+
+def extract_codes(text: str) -> list[str]:
+    return CODE_PATTERN.findall(text)
+
+
+# ======================================================
+# Index inversé BM25 + table des codes
+# ======================================================
+class LexicalIndex:
+    """
+    Index inversé BM25 construit à côté de l'index FAISS (mêmes IDs),
+    plus une table code de formation (5 chiffres) -> IDs des chunks.
+    """
+
+    def __init__(self, size: int, k1: float, b: float):
+        self.size = size
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: dict[str, float] = {}
+        self.doc_lengths = np.zeros(size, dtype="float32")
+        self.avg_length = 1.0
+        self.codes: dict[str, list[int]] = {}
+
+    @classmethod
+    def from_corpus(
+        cls,
+        corpus,
+        scores_path: Path | None,
+        k1: float,
+        b: float
+    ) -> "LexicalIndex":
+        lexical = cls(len(corpus), k1, b)
+
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        text_to_id: dict[str, int] = {}
+
+        for i, chunk in enumerate(corpus):
+            if not chunk:
+                continue
+            text_to_id.setdefault(chunk, i)
+            counts = Counter(tokenize(chunk))
+            lexical.doc_lengths[i] = sum(counts.values())
+            for token, tf in counts.items():
+                postings[token].append((i, tf))
+
+        n_docs = max(1, int((lexical.doc_lengths > 0).sum()))
+        for token, entries in postings.items():
+            ids = np.array([i for i, _ in entries], dtype="int64")
+            tfs = np.array([tf for _, tf in entries], dtype="float32")
+            lexical.postings[token] = (ids, tfs)
+            df = len(entries)
+            lexical.idf[token] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        lexical.avg_length = float(lexical.doc_lengths.sum()) / n_docs
+
+        # Les blocs du corpus ne portent pas le code : on le retrouve via la
+        # table traitée, dont chaque ligne produit exactement un bloc
+        if scores_path is not None and scores_path.exists():
+            with open(scores_path, "r", encoding="utf-8") as f:
+                for entry in json.load(f):
+                    text = build_rag_block(entry).split("###", 1)[1].strip()
+                    chunk_id = text_to_id.get(text)
+                    if chunk_id is not None and entry.get("code"):
+                        lexical.codes.setdefault(entry["code"], []).append(chunk_id)
+
+        return lexical
+
+    # -----------------------------
+    # Recherche
+    # -----------------------------
+    def lookup_codes(self, codes: list[str]) -> list[int]:
+        ids = []
+        for code in codes:
+            ids.extend(self.codes.get(code, []))
+        return ids
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        candidates: np.ndarray | None = None
+    ) -> list[tuple[int, float]]:
+        scores = np.zeros(self.size, dtype="float32")
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / self.avg_length)
+
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            ids, tfs = posting
+            scores[ids] += self.idf[token] * tfs * (self.k1 + 1) / (tfs + norm[ids])
+
+        if candidates is not None:
+            scores[~candidates] = 0
+
+        top_k = min(top_k, self.size)
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def stats(self) -> dict:
+        return {
+            "terms": len(self.postings),
+            "codes": len(self.codes),
+        }
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[int]],
+    k: int
+) -> list[tuple[int, float]]:
+    fused: dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] += 1 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: -item[1])
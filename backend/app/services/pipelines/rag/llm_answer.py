@@ -1,41 +1,24 @@
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-import google.generativeai as genai
-
 from .config import (
-    GEMINI_MODEL,
-    LLM_TEMPERATURE,
-    LLM_MAX_OUTPUT_TOKENS
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY
 )
+from .llm_client import LLMClient
+from .llm_providers import get_provider
 
-# ======================================================
-# Charger le fichier .env depuis la racine du projet
-# ======================================================
-BASE_DIR = Path(__file__).resolve().parents[5]  # Orientini/
-ENV_PATH = BASE_DIR / ".env"
-
-load_dotenv(dotenv_path=ENV_PATH)
-
-# ======================================================
-# Configuration Gemini
-# ======================================================
-API_KEY = os.getenv("GOOGLE_API_KEY")
 
-if not API_KEY:
-    raise RuntimeError(
-        f"GOOGLE_API_KEY non trouvée. Vérifiez le fichier {ENV_PATH}"
-    )
+NO_DATA_ANSWER = "لا تتوفر معطيات كافية للإجابة عن هذا السؤال."
 
-genai.configure(api_key=API_KEY)
 
+def build_prompt(question: str, context: str, history: str = "") -> str:
+    if history:
+        history = (
+            "سياق المحادثة السابقة (لفهم السؤال فقط، وليس مصدرًا للمعطيات):\n"
+            f"{history}\n"
+        )
 
-def llm_answer(question: str, context: str) -> str:
-    """
-    Génère une réponse en arabe naturel, de type assistant d’orientation,
-    sans format technique (JSON, listes, champs).
-    """
-    prompt = f"""
+    return f"""
     أنت مستشار توجيه جامعي في تونس.
 
     السؤال:
@@ -69,23 +52,63 @@ def llm_answer(question: str, context: str) -> str:
     أجب حرفيًا:
     "لا تتوفر معطيات كافية للإجابة عن هذا السؤال."
 
+    {history}
     السياق المتوفر:
     {context}
 
     الإجابة النهائية:
     """
 
-    model = genai.GenerativeModel(GEMINI_MODEL)
 
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": LLM_TEMPERATURE,
-            "max_output_tokens": LLM_MAX_OUTPUT_TOKENS
-        }
+llm_client = LLMClient(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    timeout=LLM_TIMEOUT_SECONDS,
+    max_retries=LLM_MAX_RETRIES,
+    base_delay=LLM_RETRY_BASE_DELAY
+)
+
+
+def llm_answer(question: str, context: str, history: str = "") -> str:
+    """
+    Génère une réponse en arabe naturel, de type assistant d’orientation,
+    sans format technique (JSON, listes, champs).
+    """
+    answer = get_provider().generate(build_prompt(question, context, history))
+
+    return answer or NO_DATA_ANSWER
+
+
+async def llm_answer_async(question: str, context: str, history: str = "") -> str:
+    """
+    Variante asynchrone de llm_answer() passant par le client partagé
+    (concurrence limitée, délai par appel, nouvelles tentatives)
+    """
+    provider = get_provider()
+    answer = await llm_client.call(
+        provider.generate_async,
+        build_prompt(question, context, history),
+        retry_on=provider.transient_errors
     )
 
-    if hasattr(response, "text") and response.text:
-        return response.text.strip()
+    return answer or NO_DATA_ANSWER
+
 
-    return "لا تتوفر معطيات كافية للإجابة عن هذا السؤال."
+async def llm_answer_stream(question: str, context: str, history: str = ""):
+    """
+    Même réponse que llm_answer(), émise morceau par morceau
+    dès que le modèle les produit, via le client partagé (place gardée
+    pendant tout le flux, délai sur le premier morceau, ouverture retentée)
+    """
+    provider = get_provider()
+    emitted = False
+    async for text in llm_client.stream(
+        provider.stream,
+        build_prompt(question, context, history),
+        retry_on=provider.transient_errors
+    ):
+        if text:
+            emitted = True
+            yield text
+
+    if not emitted:
+        yield NO_DATA_ANSWER
@@ -0,0 +1,157 @@
+import asyncio
+import random
+import time
+
+from .metrics import Histogram
+
+# Fin d'un flux lu avec next(chunks, _END)
+_END = object()
+
+
+def _close(chunks):
+    """Ferme le générateur du fournisseur (sauf s'il tourne encore dans un thread)"""
+    if chunks is None:
+        return
+    try:
+        chunks.close()
+    except ValueError:  # generator already executing
+        pass
+
+
+class LLMClient:
+    """
+    Couche asynchrone partagée par toutes les requêtes devant le LLM :
+    - sémaphore global : au plus max_concurrency appels en vol
+    - délai maximal par tentative (asyncio.wait_for)
+    - nouvelles tentatives avec backoff exponentiel + jitter, sur
+      dépassement du délai et sur les erreurs `retry_on` du fournisseur
+    L'annulation de la tâche appelante (client déconnecté) interrompt
+    l'appel en cours ou l'attente d'une place.
+
+    stream() applique les mêmes limites à une réponse en streaming : la
+    place est gardée jusqu'à la fin du flux, le délai porte sur le premier
+    morceau et seule l'ouverture du flux est retentée.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        timeout: float,
+        max_retries: int,
+        base_delay: float
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._counters = {
+            "calls": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "cancelled": 0,
+        }
+        self._latency = Histogram([0.5, 1, 2, 5, 10, 20, 30, 60, 120])
+        self._queue_wait = Histogram([0.001, 0.01, 0.1, 0.5, 1, 5, 10, 30])
+        self._first_token = Histogram([0.1, 0.25, 0.5, 1, 2, 5, 10, 30])
+
+    # -----------------------------
+    # Places (sémaphore)
+    # -----------------------------
+    async def _acquire(self):
+        self._counters["calls"] += 1
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            self._counters["cancelled"] += 1
+            raise
+        finally:
+            self._waiting -= 1
+
+        self._queue_wait.observe(time.perf_counter() - start)
+        self._in_flight += 1
+
+    def _release(self):
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    # -----------------------------
+    # Appels
+    # -----------------------------
+    async def call(self, fn, *args, retry_on: tuple = ()):
+        """
+        Exécute la coroutine fn(*args) sous les limites du client
+        """
+        await self._acquire()
+        try:
+            return await self._with_retries(
+                lambda: fn(*args), retry_on, self._latency
+            )
+        except asyncio.CancelledError:
+            self._counters["cancelled"] += 1
+            raise
+        finally:
+            self._release()
+
+    async def stream(self, open_stream, *args, retry_on: tuple = ()):
+        """
+        Relaie les morceaux du générateur (bloquant) open_stream(*args),
+        lus dans un thread, sous les limites du client
+        """
+        await self._acquire()
+        chunks = None
+        try:
+            async def first_chunk():
+                nonlocal chunks
+                _close(chunks)  # tentative précédente
+                chunks = open_stream(*args)
+                return await asyncio.to_thread(next, chunks, _END)
+
+            chunk = await self._with_retries(first_chunk, retry_on, self._first_token)
+            while chunk is not _END:
+                yield chunk
+                chunk = await asyncio.to_thread(next, chunks, _END)
+        except (asyncio.CancelledError, GeneratorExit):
+            self._counters["cancelled"] += 1
+            raise
+        finally:
+            self._release()
+            _close(chunks)
+
+    async def _with_retries(self, attempt_fn, retry_on: tuple, latency: Histogram):
+        transient = (asyncio.TimeoutError, *retry_on)
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(attempt_fn(), timeout=self.timeout)
+                latency.observe(time.perf_counter() - start)
+                return result
+            except transient as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._counters["timeouts"] += 1
+                if attempt == self.max_retries:
+                    self._counters["failures"] += 1
+                    raise
+                self._counters["retries"] += 1
+                delay = self.base_delay * 2 ** attempt
+                await asyncio.sleep(delay * (1 + random.random()))
+            except Exception:
+                self._counters["failures"] += 1
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            **self._counters,
+            "latency_seconds": self._latency.snapshot(),
+            "queue_wait_seconds": self._queue_wait.snapshot(),
+            "first_token_seconds": self._first_token.snapshot(),
+        }
@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from . import config
+
+# ======================================================
+# Charger le fichier .env depuis la racine du projet
+# ======================================================
+BASE_DIR = Path(__file__).resolve().parents[5]  # Orientini/
+ENV_PATH = BASE_DIR / ".env"
+
+load_dotenv(dotenv_path=ENV_PATH)
+
+
+class LLMProvider:
+    """
+    Interface commune des fournisseurs LLM. Chaque méthode reçoit le
+    prompt complet et renvoie le texte brut ("" si le modèle n'a rien
+    produit) ; llm_answer se charge du reste.
+    """
+
+    name = "base"
+
+    # Erreurs pour lesquelles LLMClient retente l'appel
+    transient_errors: tuple = ()
+
+    def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def generate_async(self, prompt: str) -> str:
+        return await asyncio.to_thread(self.generate, prompt)
+
+    def stream(self, prompt: str):
+        yield self.generate(prompt)
+
+    def info(self) -> dict:
+        return {"provider": self.name}
+
+
+# ======================================================
+# Gemini (google.generativeai)
+# ======================================================
+class GeminiProvider(LLMProvider):
+
+    name = "gemini"
+
+    def __init__(self, model_name: str, generation_config: dict, timeout: float):
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
+
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                f"GOOGLE_API_KEY non trouvée. Vérifiez le fichier {ENV_PATH}"
+            )
+
+        genai.configure(api_key=api_key)
+
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.request_options = {"timeout": timeout}
+        # Modèle unique réutilisé par tous les appels (et sa connexion)
+        self.model = genai.GenerativeModel(model_name)
+
+        self.transient_errors = (
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.InternalServerError,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.GatewayTimeout,
+            google_exceptions.DeadlineExceeded,
+        )
+
+    @staticmethod
+    def _text(response) -> str:
+        if hasattr(response, "text") and response.text:
+            return response.text.strip()
+        return ""
+
+    def generate(self, prompt: str) -> str:
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self.generation_config,
+            request_options=self.request_options
+        )
+        return self._text(response)
+
+    async def generate_async(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self.generation_config,
+            request_options=self.request_options
+        )
+        return self._text(response)
+
+    def stream(self, prompt: str):
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self.generation_config,
+            stream=True,
+            request_options=self.request_options
+        )
+
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:  # morceau sans texte (filtre de sécurité...)
+                continue
+            if text:
+                yield text
+
+    def info(self) -> dict:
+        return {"provider": self.name, "model": self.model_name}
+
+
+# ======================================================
+# Substitut local : déterministe, sans réseau
+# ======================================================
+class LocalProvider(LLMProvider):
+    """
+    Simule un LLM pour les benchmarks et tests de charge hors ligne :
+    attend `latency` secondes avant le premier token puis `token_latency`
+    entre chaque token, et renvoie `output_tokens` mots tirés du prompt.
+    Même prompt -> même réponse.
+    """
+
+    name = "local"
+
+    def __init__(self, latency: float, token_latency: float, output_tokens: int):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.output_tokens = output_tokens
+
+    def _tokens(self, prompt: str) -> list[str]:
+        words = prompt.split() or ["…"]
+        seed = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        return [
+            words[(seed + i) % len(words)] + " "
+            for i in range(self.output_tokens)
+        ]
+
+    def _duration(self) -> float:
+        return self.latency + self.token_latency * max(0, self.output_tokens - 1)
+
+    def generate(self, prompt: str) -> str:
+        time.sleep(self._duration())
+        return "".join(self._tokens(prompt)).strip()
+
+    async def generate_async(self, prompt: str) -> str:
+        await asyncio.sleep(self._duration())
+        return "".join(self._tokens(prompt)).strip()
+
+    def stream(self, prompt: str):
+        time.sleep(self.latency)
+        for i, token in enumerate(self._tokens(prompt)):
+            if i:
+                time.sleep(self.token_latency)
+            yield token
+
+    def info(self) -> dict:
+        return {
+            "provider": self.name,
+            "latency": self.latency,
+            "token_latency": self.token_latency,
+            "output_tokens": self.output_tokens,
+        }
+
+
+# ======================================================
+# Registre : fournisseur choisi par config.LLM_PROVIDER
+# ======================================================
+def _gemini() -> LLMProvider:
+    return GeminiProvider(
+        config.GEMINI_MODEL,
+        generation_config={
+            "temperature": config.LLM_TEMPERATURE,
+            "max_output_tokens": config.LLM_MAX_OUTPUT_TOKENS
+        },
+        timeout=config.LLM_TIMEOUT_SECONDS
+    )
+
+
+def _local() -> LLMProvider:
+    return LocalProvider(
+        latency=config.LOCAL_LLM_LATENCY_SECONDS,
+        token_latency=config.LOCAL_LLM_TOKEN_SECONDS,
+        output_tokens=config.LOCAL_LLM_OUTPUT_TOKENS
+    )
+
+
+PROVIDERS = {
+    "gemini": _gemini,
+    "local": _local,
+}
+
+_provider: LLMProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> LLMProvider:
+    """
+    Fournisseur du processus, créé au premier appel (une clé Gemini
+    manquante n'empêche donc plus d'importer le pipeline)
+    """
+    global _provider
+    if _provider is not None:
+        return _provider
+
+    with _provider_lock:
+        if _provider is None:
+            name = config.LLM_PROVIDER
+            if name not in PROVIDERS:
+                raise ValueError(
+                    f"LLM_PROVIDER inconnu : {name!r} "
+                    f"(attendu : {', '.join(PROVIDERS)})"
+                )
+            _provider = PROVIDERS[name]()
+        return _provider
+
+
+def provider_info() -> dict:
+    if _provider is None:
+        return {"provider": config.LLM_PROVIDER, "loaded": False}
+    return {**_provider.info(), "loaded": True}
+
+
+def set_provider(provider: LLMProvider):
+    """
+    Remplace le fournisseur courant (benchmarks)
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,54 @@
+import bisect
+import threading
+
+
+class Histogram:
+    """
+    Histogramme à buckets fixes (style Prometheus), thread-safe.
+    Les percentiles sont estimés à partir des bornes des buckets.
+    """
+
+    def __init__(self, buckets: list[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # dernier = +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._count += 1
+            self._sum += value
+
+    def percentile(self, p: float) -> float | None:
+        if not self._count:
+            return None
+        rank = p / 100 * self._count
+        seen = 0
+        for bound, n in zip(self.buckets + [float("inf")], self._counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._sum
+
+        cumulative, buckets = 0, {}
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = count
+
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "mean": round(total / count, 6) if count else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
@@ -1,23 +1,231 @@
-from .rag_index import search
-from .llm_answer import llm_answer
+import asyncio
+import re
+import time
+
+from .rag_index import (
+    search_scored,
+    encode_query,
+    index_version,
+    DATA_DIR,
+    PROCESSED_SCORES_PATH
+)
+from .llm_answer import (
+    llm_answer,
+    llm_answer_async,
+    llm_answer_stream,
+    NO_DATA_ANSWER
+)
 from .question_parser import parse_question
+from .answer_cache import SemanticAnswerCache
+from .context_packer import ContextPacker
+from .block_compressor import BlockCompressor
+from .intent import detect_intent
+from .conversation_memory import ConversationMemory
+from .structured_query import StructuredQueryEngine
+from .config import (
+    EMBEDDING_MODEL,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_FLUSH_SECONDS,
+    CONTEXT_CANDIDATES,
+    CONTEXT_COMPRESSION,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_CHARS_PER_TOKEN,
+    CONTEXT_MIN_TRUNCATE_TOKENS,
+    STRUCTURED_QUERIES,
+    STRUCTURED_MAX_ROWS,
+    FOLLOWUP_MAX_WORDS,
+    CONVERSATION_RECENT_TURNS,
+    CONVERSATION_SUMMARY_MAX_CHARS,
+    CONVERSATION_TURN_MAX_CHARS
+)
+
+answer_cache = SemanticAnswerCache(
+    DATA_DIR / "answer_cache",
+    threshold=ANSWER_CACHE_THRESHOLD,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+    max_entries=ANSWER_CACHE_MAX_ENTRIES,
+    flush_seconds=ANSWER_CACHE_FLUSH_SECONDS
+)
+
+structured_engine = StructuredQueryEngine(
+    PROCESSED_SCORES_PATH,
+    max_rows=STRUCTURED_MAX_ROWS
+)
+
+block_compressor = BlockCompressor()
+
+context_packer = ContextPacker(
+    budget=CONTEXT_TOKEN_BUDGET,
+    chars_per_token=CONTEXT_CHARS_PER_TOKEN,
+    min_truncate_tokens=CONTEXT_MIN_TRUNCATE_TOKENS
+)
+
+
+def remember(memory: ConversationMemory, question: str, answer: str) -> ConversationMemory:
+    """
+    Mémoire mise à jour après un échange (bornes de config)
+    """
+    return memory.with_turn(
+        question,
+        answer,
+        max_turns=CONVERSATION_RECENT_TURNS,
+        summary_max_chars=CONVERSATION_SUMMARY_MAX_CHARS,
+        turn_max_chars=CONVERSATION_TURN_MAX_CHARS
+    )
+
+
+def answer_cache_version() -> str:
+    # Reconstruire l'index ou changer de modèle invalide les réponses
+    return f"{index_version()}:{EMBEDDING_MODEL}"
+
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def answer_scope(query: str, intent) -> str:
+    """
+    Portée d'une question pour le cache sémantique : شعب et جامعات
+    reconnues, tous les nombres (codes, années, معدل, durée) et, hors
+    questions d'explication, les mots de spécialité (remainder de
+    l'intention : "طب" / "صيدله"). Deux questions ne partagent une
+    réponse que si leur portée est identique.
+    """
+    parts = sorted(intent.sections) + sorted(intent.universities)
+    parts += sorted(set(_NUMBER.findall(query)))
+    if not intent.explanation:
+        parts += sorted(set(intent.remainder))
+    return "|".join(parts)
+
+
+class _Turn:
+    """
+    Étapes communes avant l'appel LLM : analyse de la question, requête
+    structurée, cache sémantique, recherche puis compression et
+    assemblage du contexte. `answer` est renseignée quand la réponse est
+    connue sans LLM (question vide, question factuelle servie par la
+    table, cache, aucun contexte).
+
+    Avec une mémoire de conversation, une relance courte est complétée par
+    la question précédente (`query`) pour toutes les étapes ; le prompt
+    reçoit la question telle quelle et l'historique borné.
+    """
+
+    def __init__(self, question: str, memory: ConversationMemory | None = None):
+        self.question = parse_question(question)
+        self.query = self.question
+        self.history = ""
+        self.intent = None
+        self.answer = None
+        self.context = None
+        self.query_vector = None
+        self.version = None
+        self.scope = ""
 
+        if not self.question:
+            self.answer = "الرجاء طرح سؤال واضح."
+            return
 
-def rag_pipeline(question: str) -> str:
-    question = parse_question(question)
+        if memory:
+            self.query = memory.standalone_query(self.question, FOLLOWUP_MAX_WORDS)
+            self.history = memory.render()
 
-    if not question:
-        return "الرجاء طرح سؤال واضح."
+        self.intent = detect_intent(self.query)
 
-    # On limite légèrement le contexte pour laisser finir Gemini
-    chunks = search(question, top_k=50)
+        if STRUCTURED_QUERIES:
+            self.answer = structured_engine.answer(self.query, self.intent)
+            if self.answer is not None:
+                return
 
-    if not chunks:
-        return "لا تتوفر معطيات كافية للإجابة عن هذا السؤال."
+        if ANSWER_CACHE_ENABLED:
+            self.query_vector = encode_query(self.query)
+            self.version = answer_cache_version()
+            self.scope = answer_scope(self.query, self.intent)
 
-    context = "\n\n".join(chunks)
+            cached = answer_cache.lookup(self.query_vector, self.version, self.scope)
+            if cached is not None:
+                self.answer = cached
+                return
 
-    return llm_answer(question, context)
+        chunks = search_scored(self.query, top_k=CONTEXT_CANDIDATES)
+
+        if not chunks:
+            self.answer = NO_DATA_ANSWER
+            return
+
+        if CONTEXT_COMPRESSION:
+            chunks = block_compressor.compress(chunks, self.intent)
+
+        # Contexte borné en tokens : doublons retirés, meilleurs blocs d'abord
+        packed = context_packer.pack(chunks)
+        print(
+            f"🧮 Contexte : {packed.blocks}/{len(chunks)} blocs, "
+            f"~{packed.tokens} tokens (brut ~{packed.raw_tokens}, "
+            f"{packed.duplicates} doublons, {packed.dropped} écartés)"
+        )
+        self.context = packed.text
+
+    def store(self, answer: str, llm_seconds: float):
+        if ANSWER_CACHE_ENABLED and answer != NO_DATA_ANSWER:
+            answer_cache.store(
+                self.query, self.query_vector, answer, llm_seconds,
+                self.version, self.scope
+            )
+
+
+def rag_pipeline(question: str, memory: ConversationMemory | None = None) -> str:
+    turn = _Turn(question, memory)
+    if turn.answer is not None:
+        return turn.answer
+
+    start = time.perf_counter()
+    answer = llm_answer(turn.question, turn.context, turn.history)
+    turn.store(answer, time.perf_counter() - start)
+
+    return answer
+
+
+async def rag_pipeline_async(
+    question: str,
+    memory: ConversationMemory | None = None
+) -> str:
+    """
+    Variante asynchrone de rag_pipeline() : l'encodage et la recherche
+    (bloquants) passent dans un thread, l'appel LLM est attendu sans
+    occuper de thread. Annuler la tâche annule l'appel LLM.
+    """
+    turn = await asyncio.to_thread(_Turn, question, memory)
+    if turn.answer is not None:
+        return turn.answer
+
+    start = time.perf_counter()
+    answer = await llm_answer_async(turn.question, turn.context, turn.history)
+    await asyncio.to_thread(turn.store, answer, time.perf_counter() - start)
+
+    return answer
+
+
+async def rag_pipeline_stream(question: str, memory: ConversationMemory | None = None):
+    """
+    Variante streaming de rag_pipeline_async() : émet la réponse morceau
+    par morceau. La réponse n'est mise en cache que si le flux va à son terme.
+    """
+    turn = await asyncio.to_thread(_Turn, question, memory)
+    if turn.answer is not None:
+        yield turn.answer
+        return
+
+    start = time.perf_counter()
+    parts = []
+    async for token in llm_answer_stream(turn.question, turn.context, turn.history):
+        parts.append(token)
+        yield token
+
+    await asyncio.to_thread(
+        turn.store, "".join(parts).strip(), time.perf_counter() - start
+    )
 
 
 # ==================================================
@@ -28,6 +236,8 @@ if __name__ == "__main__":
     print("📝 يمكنك طرح عدة أسئلة متتالية")
     print("⛔ اكتب exit للخروج\n")
 
+    memory = ConversationMemory()
+
     while True:
         question = input("❓ اطرح سؤالك: ").strip()
 
@@ -39,7 +249,8 @@ if __name__ == "__main__":
             print("\n👋 بالتوفيق في مسارك الجامعي")
             break
 
-        answer = rag_pipeline(question)
+        answer = rag_pipeline(question, memory)
+        memory = remember(memory, question, answer)
 
         print("\n🟢 الإجابة:\n")
         print(answer)
@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from .metrics import Histogram
+
+
+class QueryBatcher:
+    """
+    Regroupe les questions qui arrivent dans une courte fenêtre
+    (ou jusqu'à max_batch_size) et les encode en un seul appel.
+    Chaque appelant reçoit un Future résolu avec son propre vecteur.
+
+    Chaque Future d'un lot est toujours résolu (vecteur ou exception),
+    le worker est relancé s'il s'est arrêté, et encode() n'attend pas
+    plus de timeout_s.
+    """
+
+    def __init__(self, encode_fn, max_batch_size: int, window_ms: float,
+                 timeout_s: float | None = None):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.timeout = timeout_s
+        self.failed_batches = 0
+
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100, 250])
+
+    # -----------------------------
+    # API appelant
+    # -----------------------------
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.submit(text).result(timeout=self.timeout)
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="query-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._encode_batch(batch)
+            except Exception as e:
+                self.failed_batches += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _encode_batch(self, batch: list):
+        started = time.perf_counter()
+
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued in batch:
+            self.queue_wait_ms.observe((started - enqueued) * 1000)
+
+        vectors = self._encode_fn([text for text, _, _ in batch])
+        if len(vectors) != len(batch):
+            raise RuntimeError(
+                f"encode_fn returned {len(vectors)} vectors for {len(batch)} texts"
+            )
+
+        for (_, future, _), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000,
+            "pending": self._queue.qsize(),
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
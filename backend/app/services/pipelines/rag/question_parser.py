@@ -1,3 +1,4 @@
+import re
 
 
 
@@ -5,3 +6,18 @@ def parse_question(question: str) -> str:
     if not question:
         return ""
     return question.strip()
+
+
+# Diacritiques arabes (tachkil) + tatweel
+_ARABIC_MARKS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Forme canonique d'une question, utilisée comme clé de cache :
+    sans tachkil ni tatweel, en minuscules, espaces normalisés.
+    """
+    if not question:
+        return ""
+    question = _ARABIC_MARKS.sub("", question)
+    return re.sub(r"\s+", " ", question).strip().lower()
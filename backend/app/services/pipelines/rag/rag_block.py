@@ -0,0 +1,19 @@
+from typing import Any, Dict
+
+# ---------------------------------------------------------------------
+# Bloc RAG d'une formation : écrit dans le corpus par transform_score,
+# relu par lexical_index (code -> chunk), facets et block_compressor
+# ---------------------------------------------------------------------
+def build_rag_block(entry: Dict[str, Any]) -> str:
+    return (
+        "###\n"
+        f"التكوين: {entry['diploma']}\n"
+        f"الاختصاص: {entry['speciality']}\n"
+        f"المؤسسة: {entry['university']}\n"
+        f"الجامعة: {entry['parent_university']}\n"
+        f"شعبة الباكالوريا: {entry['bac_section']}\n"
+        f"المدة: {entry['duration']}\n"
+        f"معدل القبول الأدنى: {entry['min_score']}\n"
+        f"صيغة الاحتساب: {entry['formula']}\n"
+        f"شروط إضافية: {entry['requirements'] or 'لا يوجد'}\n"
+    )
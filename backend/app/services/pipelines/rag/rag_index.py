@@ -1,11 +1,31 @@
 from pathlib import Path
-import pickle
 import faiss
-from sentence_transformers import SentenceTransformer
 
-from .load_corpus import load_corpus
-from .embed_corpus import embed_corpus
-from .config import TOP_K, EMBEDDING_MODEL
+from .encoder import get_encoder
+from .index_manager import IndexManager
+from .index_factory import configure_search, index_type_of
+from .index_builder import index_is_current, update_index, load_chunk_cache
+from .chunk_store import ChunkStore
+from .query_batcher import QueryBatcher
+from .embedding_cache import EmbeddingCache
+from .question_parser import normalize_question
+from .facets import FacetIndex, detect_facets
+from .lexical_index import LexicalIndex, extract_codes, reciprocal_rank_fusion
+from ..score.paths import processed_scores_path
+from .config import (
+    TOP_K,
+    INDEX_TYPE,
+    HYBRID_SEARCH,
+    HYBRID_CANDIDATES,
+    RRF_K,
+    BM25_K1,
+    BM25_B,
+    QUERY_BATCHING,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_WINDOW_MS,
+    QUERY_BATCH_TIMEOUT_S,
+    QUERY_CACHE_SIZE
+)
 
 # ======================================================
 # Paths
@@ -14,7 +34,15 @@ BASE_DIR = Path(__file__).resolve().parents[4]
 DATA_DIR = BASE_DIR / "data" / "processed"
 
 INDEX_PATH = DATA_DIR / "faiss.index"
+# Textes des chunks (un fichier : offsets + blob UTF-8, ouvert en mmap)
+STORE_PATH = DATA_DIR / "chunk_store"
+# Ancien format picklé, lu uniquement pour migrer sans ré-encoder
 META_PATH = DATA_DIR / "faiss_meta.pkl"
+# Cache d'embeddings par chunk (hash -> ID + vecteur)
+CHUNK_CACHE_PATH = DATA_DIR / "faiss_chunks.npz"
+
+# Table traitée de l'année servie (codes de formation -> chunks)
+PROCESSED_SCORES_PATH = processed_scores_path()
 
 # 👉 TOUS les corpus RAG
 CORPUS_PATHS = [
@@ -22,55 +50,209 @@ CORPUS_PATHS = [
     DATA_DIR / "rag_corpus_orientation_rules.txt",
 ]
 
-# ======================================================
-model = SentenceTransformer(EMBEDDING_MODEL)
-# ======================================================
-
-
 def get_faiss_index():
     # -----------------------------
     # Load existing index
     # -----------------------------
-    if INDEX_PATH.exists() and META_PATH.exists():
-        index = faiss.read_index(str(INDEX_PATH))
-        with open(META_PATH, "rb") as f:
-            corpus = pickle.load(f)
-        return index, corpus
+    # Corpus modifié depuis la dernière indexation ou publication
+    # interrompue : mise à jour incrémentale avant de charger
+    if index_is_current(CORPUS_PATHS, INDEX_PATH, STORE_PATH, CHUNK_CACHE_PATH):
+        index = read_index_mmap(INDEX_PATH)
+        if index_type_of(index) == INDEX_TYPE:
+            return configure_search(index), ChunkStore(STORE_PATH)
+        # INDEX_TYPE modifié : reconstruction à partir des embeddings en cache
+        print(f"🔁 Index {index_type_of(index)} sur disque, INDEX_TYPE = {INDEX_TYPE}")
 
     # -----------------------------
-    # Build index from scratch
+    # Build index (réutilise les embeddings en cache)
     # -----------------------------
-    all_chunks: list[str] = []
+    return build_faiss_index()
 
-    for path in CORPUS_PATHS:
-        if not path.exists():
-            raise FileNotFoundError(f"❌ Corpus manquant : {path}")
-        chunks = load_corpus(path)
-        all_chunks.extend(chunks)
 
-    embeddings = embed_corpus(all_chunks)
+def read_index_mmap(path: Path):
+    """
+    Lecture en mmap (pages partagées entre workers) quand la version de
+    FAISS le permet pour ce type d'index, lecture classique sinon.
+    """
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    try:
+        return faiss.read_index(str(path), flags | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        return faiss.read_index(str(path))
 
-    dim = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dim)
-    index.add(embeddings)
 
-    faiss.write_index(index, str(INDEX_PATH))
-    with open(META_PATH, "wb") as f:
-        pickle.dump(all_chunks, f)
+def build_faiss_index():
+    """
+    Met à jour l'index de façon incrémentale : seuls les chunks nouveaux
+    ou modifiés des CORPUS_PATHS sont ré-encodés.
+    """
+    return update_index(
+        CORPUS_PATHS,
+        INDEX_PATH,
+        STORE_PATH,
+        CHUNK_CACHE_PATH,
+        legacy_meta_path=META_PATH,
+        index_type=INDEX_TYPE
+    )
+
 
-    print(f"✅ Index FAISS créé avec {len(all_chunks)} chunks")
+def corpus_embeddings():
+    """
+    Embeddings des chunks indexés (depuis le cache par chunk).
+    """
+    _, store = get_faiss_index()
+    store.close()
+    cache = load_chunk_cache(CHUNK_CACHE_PATH)
+    if cache is None:
+        build_faiss_index()
+        cache = load_chunk_cache(CHUNK_CACHE_PATH)
+    return cache["vectors"]
 
-    return index, all_chunks
 
+# ======================================================
+# Index résident (chargé une seule fois par processus)
+# ======================================================
+index_manager = IndexManager(
+    get_faiss_index,
+    [INDEX_PATH, *ChunkStore.paths(STORE_PATH)]
+)
+index_manager.register("facets", FacetIndex.from_corpus)
+index_manager.register(
+    "lexical",
+    lambda index, corpus: LexicalIndex.from_corpus(
+        corpus, PROCESSED_SCORES_PATH, k1=BM25_K1, b=BM25_B
+    )
+)
 
-def search(query: str, top_k: int = TOP_K) -> list[str]:
-    index, corpus = get_faiss_index()
 
-    query_embedding = model.encode(
-        [query],
+def warmup():
+    """
+    Charge l'index et l'encodeur en mémoire (appelé dans le lifespan FastAPI).
+    """
+    index_manager.load()
+    get_encoder().load()
+
+
+def index_version() -> str:
+    return index_manager.fingerprint
+
+
+# ======================================================
+# Encodage des questions (micro-batching)
+# ======================================================
+def _encode_queries(queries: list[str]):
+    return get_encoder().encode(
+        queries,
         normalize_embeddings=True
+    ).astype("float32")
+
+
+query_batcher = QueryBatcher(
+    _encode_queries,
+    max_batch_size=QUERY_BATCH_MAX_SIZE,
+    window_ms=QUERY_BATCH_WINDOW_MS,
+    timeout_s=QUERY_BATCH_TIMEOUT_S
+)
+
+
+query_cache = EmbeddingCache(QUERY_CACHE_SIZE)
+
+
+def encode_query(query: str):
+    model_name = get_encoder().model_name
+    key = normalize_question(query)
+
+    # On encode la clé elle-même : toutes les variantes d'une question
+    # reçoivent le même vecteur, quel que soit l'ordre des requêtes
+    vector = query_cache.get(key, model_name)
+    if vector is None:
+        if QUERY_BATCHING:
+            vector = query_batcher.encode(key)
+        else:
+            vector = _encode_queries([key])[0]
+        query_cache.put(key, vector, model_name)
+
+    return vector.reshape(1, -1)
+
+
+retrieval_stats = {"code_lookups": 0, "hybrid": 0, "vector_only": 0}
+
+
+def retrieve(
+    query: str,
+    top_k: int = TOP_K,
+    use_facets: bool = True,
+    hybrid: bool = HYBRID_SEARCH
+) -> list[tuple[int, float]]:
+    """
+    IDs et scores des chunks les plus pertinents pour la question.
+    """
+    index, corpus = index_manager.get()
+    lexical = index_manager.derived("lexical") if hybrid else None
+
+    # Chemin rapide : code de formation exact, sans embedding
+    if lexical is not None:
+        ids = lexical.lookup_codes(extract_codes(query))
+        if ids:
+            retrieval_stats["code_lookups"] += 1
+            return [(i, 1.0) for i in ids[:top_k]]
+
+    # Pré-filtrage : si la question cite une شعبة, une جامعة ou une durée,
+    # on ne classe que les chunks correspondants (+ règles générales)
+    mask, params = None, None
+    if use_facets:
+        facets = detect_facets(query)
+        if facets:
+            facet_index = index_manager.derived("facets")
+            mask = facet_index.candidates(facets)
+            if mask is not None:
+                params = facet_index.search_params(mask)
+
+    k = max(top_k, HYBRID_CANDIDATES) if lexical is not None else top_k
+    scores, indices = index.search(encode_query(query), k, params=params)
+    dense = [
+        (int(i), float(score))
+        for i, score in zip(indices[0], scores[0])
+        if i != -1
+    ]
+
+    sparse = lexical.search(query, k, candidates=mask) if lexical else []
+    if not sparse:
+        retrieval_stats["vector_only"] += 1
+        return dense[:top_k]
+
+    retrieval_stats["hybrid"] += 1
+    fused = reciprocal_rank_fusion(
+        [[i for i, _ in dense], [i for i, _ in sparse]],
+        RRF_K
     )
+    return fused[:top_k]
+
+
+def search_scored(
+    query: str,
+    top_k: int = TOP_K,
+    use_facets: bool = True,
+    hybrid: bool = HYBRID_SEARCH
+) -> list[tuple[str, float]]:
+    _, corpus = index_manager.get()
+    return [
+        (corpus[i], score)
+        for i, score in retrieve(query, top_k, use_facets=use_facets, hybrid=hybrid)
+    ]
+
+
+def search(
+    query: str,
+    top_k: int = TOP_K,
+    use_facets: bool = True,
+    hybrid: bool = HYBRID_SEARCH
+) -> list[str]:
+    return [
+        text
+        for text, _ in search_scored(query, top_k, use_facets=use_facets, hybrid=hybrid)
+    ]
 
-    _, indices = index.search(query_embedding, top_k)
 
-    return [corpus[i] for i in indices[0] if i != -1]
+if __name__ == "__main__":
+    build_faiss_index()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques en cours : le premier appelant d'une
+    clé exécute le travail, les suivants attendent son résultat au lieu
+    de le recalculer. La clé est libérée dès la fin du travail (pas de
+    cache : un appel ultérieur recalcule).
+
+    - do()       : appelants synchrones (threads)
+    - do_async() : coroutines ; le travail tourne dans une tâche à part,
+      annulée seulement quand tous ses appelants ont abandonné
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self._tasks: dict[str, tuple[asyncio.Task, list[int]]] = {}
+        self._counters = {"leaders": 0, "coalesced": 0}
+
+    # -----------------------------
+    # Synchrone
+    # -----------------------------
+    def do(self, key: str, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._counters["leaders"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    # -----------------------------
+    # Asynchrone
+    # -----------------------------
+    async def do_async(self, key: str, coro_fn, *args):
+        entry = self._tasks.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(coro_fn(*args))
+            entry = (task, [0])
+            self._tasks[key] = entry
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self._counters["leaders"] += 1
+        else:
+            self._counters["coalesced"] += 1
+
+        task, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Plus personne n'attend : inutile de poursuivre l'appel LLM
+            if waiters[0] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def stats(self) -> dict:
+        return {
+            **self._counters,
+            "in_flight": len(self._calls) + len(self._tasks),
+        }
@@ -0,0 +1,233 @@
+import bisect
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from .facets import entry_university, normalize_bac_section
+from .intent import Intent, detect_intent
+from .lexical_index import tokenize
+from .metrics import Histogram
+
+UNKNOWN = "غير محدد"
+
+
+def skeleton(token: str) -> str:
+    """
+    Clé de comparaison tolérante à l'OCR du PDF, qui déplace souvent les
+    "ا" (اإلعالمية pour الإعلامية, جغارفيا pour جغرافيا) : on retire les
+    alifs puis l'article restant.
+    """
+    token = token.replace("ا", "")
+    for prefix in ("ول", "بل", "فل", "كل", "لل", "ل"):
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            return token[len(prefix):]
+    return token
+
+
+def _clean(value) -> str:
+    if value is None:
+        return ""
+    value = re.sub(r"\s*-\s*(?:-\s*)*", "، ", str(value))
+    value = re.sub(r"\s+", " ", value)
+    return value.strip(" ،")
+
+
+class StructuredQueryEngine:
+    """
+    Moteur de requêtes en mémoire sur processed_scores_*.json, indexé par
+    code, شعبة, جامعة, mots de la spécialité (et du diplôme) et معدل
+    القبول. Répond directement aux questions factuelles reconnues par
+    detect_intent() dont chaque mot est compris ; answer() renvoie None
+    pour laisser la question au RAG.
+    """
+
+    # Sujets qui demandent une valeur (pas une liste de formations)
+    VALUE_TOPICS = ("score", "formula", "duration")
+
+    def __init__(self, path: Path, max_rows: int):
+        self.path = path
+        self.max_rows = max_rows
+
+        self.rows: list[dict] = []
+        self.by_code: dict[str, set[int]] = defaultdict(set)
+        self.by_section: dict[str, set[int]] = defaultdict(set)
+        self.by_university: dict[str, set[int]] = defaultdict(set)
+        self.by_speciality: dict[str, set[int]] = defaultdict(set)
+        # IDs triés par معدل القبول croissant (recherche dichotomique)
+        self.score_order: list[int] = []
+        self.sorted_scores: list[float] = []
+
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._counters = {"questions": 0, "answered": 0, "fallthrough": 0}
+        self._latency = Histogram([0.1, 0.5, 1, 2, 5, 10, 50])
+
+    # -----------------------------
+    # Chargement + index
+    # -----------------------------
+    def load(self, force: bool = False) -> "StructuredQueryEngine":
+        if self._loaded and not force:
+            return self
+
+        with self._lock:
+            if self._loaded and not force:
+                return self
+
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+
+            rows = []
+            by_code, by_section = defaultdict(set), defaultdict(set)
+            by_university, by_speciality = defaultdict(set), defaultdict(set)
+
+            for i, entry in enumerate(entries):
+                rows.append(entry)
+                if entry.get("code"):
+                    by_code[entry["code"]].add(i)
+
+                section = normalize_bac_section(entry.get("bac_section"))
+                if section:
+                    by_section[section].add(i)
+
+                university = entry_university(entry)
+                if university:
+                    by_university[university].add(i)
+
+                text = f"{entry.get('speciality') or ''} {entry.get('diploma') or ''}"
+                for token in tokenize(text):
+                    by_speciality[skeleton(token)].add(i)
+
+            scored = sorted(
+                (row["min_score"], i)
+                for i, row in enumerate(rows)
+                if isinstance(row.get("min_score"), (int, float))
+            )
+
+            self.rows = rows
+            self.by_code, self.by_section = by_code, by_section
+            self.by_university, self.by_speciality = by_university, by_speciality
+            self.sorted_scores = [score for score, _ in scored]
+            self.score_order = [i for _, i in scored]
+            self._loaded = True
+
+        return self
+
+    # -----------------------------
+    # Requêtes
+    # -----------------------------
+    def accessible(self, score: float) -> set[int]:
+        """Formations dont le معدل القبول الأدنى est au plus score"""
+        self.load()
+        return set(self.score_order[:bisect.bisect_right(self.sorted_scores, score)])
+
+    def query(self, intent: Intent) -> list[dict] | None:
+        """
+        Lignes satisfaisant tous les filtres de l'intention, triées par
+        معدل القبول décroissant. None si l'intention ne filtre rien ou si
+        un mot restant n'est pas une spécialité connue : la table ne sait
+        pas y répondre.
+        """
+        self.load()
+
+        filters: list[set[int]] = []
+
+        if intent.codes:
+            filters.append(set().union(*(self.by_code.get(c, set()) for c in intent.codes)))
+        if intent.sections:
+            filters.append(set().union(*(self.by_section.get(s, set()) for s in intent.sections)))
+        if intent.universities:
+            filters.append(set().union(*(self.by_university.get(u, set()) for u in intent.universities)))
+
+        for score in intent.scores:
+            filters.append(self.accessible(score))
+
+        # Mots restants : chacun doit désigner une spécialité
+        for key in {skeleton(token) for token in intent.remainder}:
+            if key not in self.by_speciality:
+                return None
+            filters.append(self.by_speciality[key])
+
+        if not filters:
+            return None
+
+        ids = set.intersection(*filters)
+        return sorted(
+            (self.rows[i] for i in ids),
+            key=lambda row: -(row.get("min_score") or 0)
+        )
+
+    def answer(self, question: str, intent: Intent | None = None) -> str | None:
+        start = time.perf_counter()
+        self._counters["questions"] += 1
+
+        intent = intent or detect_intent(question)
+        rows = self.query(intent) if intent.is_lookup else None
+
+        # Une valeur demandée pour trop de formations : question trop large
+        # (avec le معدل de l'élève, c'est une liste de formations accessibles)
+        if rows and intent.topic in self.VALUE_TOPICS and len(rows) > self.max_rows \
+                and not (intent.codes or intent.scores):
+            rows = None
+
+        answer = self._format(intent, rows) if rows else None
+        self._counters["answered" if answer else "fallthrough"] += 1
+        self._latency.observe((time.perf_counter() - start) * 1000)
+        return answer
+
+    # -----------------------------
+    # Mise en forme
+    # -----------------------------
+    @staticmethod
+    def _line(row: dict) -> str:
+        place = [
+            _clean(row.get(field))
+            for field in ("university", "parent_university")
+            if _clean(row.get(field)) not in ("", UNKNOWN, "جامعة")
+        ]
+        parts = []
+        diploma = _clean(row.get("diploma"))
+        if diploma and diploma != UNKNOWN:
+            parts.append(diploma)
+        speciality = _clean(row.get("speciality"))
+        if speciality and speciality != UNKNOWN:
+            parts.append(f"({speciality})" if parts else speciality)
+        if place:
+            parts.append(f"— {'، '.join(place)}")
+
+        section = (
+            normalize_bac_section(row.get("bac_section"))
+            or _clean(row.get("bac_section"))
+        )
+        details = [f"شعبة {section}"]
+        if row.get("min_score") is not None:
+            details.append(f"معدل القبول الأدنى {row['min_score']}")
+        if row.get("formula"):
+            formula = re.sub(r"\s+", "", row["formula"])
+            details.append(f"صيغة الاحتساب {formula}")
+        if row.get("duration"):
+            details.append(f"المدة {_clean(row['duration'])}")
+
+        return f"- الرمز {row.get('code')} : {' '.join(parts)} ؛ {'، '.join(details)}."
+
+    def _format(self, intent: Intent, rows: list[dict]) -> str:
+        if intent.codes and len(rows) <= self.max_rows:
+            header = f"معطيات التكوين ذي الرمز {'، '.join(intent.codes)} :"
+        else:
+            header = f"يوجد {len(rows)} تكوينًا مطابقًا لسؤالك"
+            if len(rows) > self.max_rows:
+                header += f"، إليك أعلى {self.max_rows} حسب معدل القبول الأدنى"
+            header += " :"
+
+        lines = [self._line(row) for row in rows[:self.max_rows]]
+        return "\n".join([header, *lines])
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self.rows),
+            "codes": len(self.by_code),
+            **self._counters,
+            "latency_ms": self._latency.snapshot(),
+        }
@@ -0,0 +1,79 @@
+"""
+Benchmark : latence du moteur d'éligibilité (recherche dichotomique sur
+les tableaux triés par شعبة) sur la table complète, avec et sans filtres,
+puis de la simulation à partir des notes (évaluation des صيغ).
+
+Usage : python -m app.services.pipelines.score.bench_eligibility [n]
+"""
+import random
+import sys
+import time
+
+from .eligibility import EligibilityEngine
+
+N_QUERIES = 20000
+
+
+def _percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run(n_queries: int = N_QUERIES):
+    start = time.perf_counter()
+    engine = EligibilityEngine().load()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(0)
+    sections = sorted(engine.sections)
+    universities = sorted(engine.university_ids)
+
+    cases = {
+        "sans filtre": lambda: {},
+        "université": lambda: {"parent_university": rng.choice(universities)},
+        "université + durée": lambda: {
+            "parent_university": rng.choice(universities),
+            "duration": 3,
+        },
+    }
+
+    print(f"{len(engine.rows)} formations, {len(sections)} شعب, "
+          f"chargement {load_ms:.1f} ms\n")
+    print(f"{'cas':<22}{'p50':>10}{'p99':>10}{'max':>10}{'résultats moy.':>16}")
+
+    for name, filters in cases.items():
+        latencies, totals = [], []
+        for _ in range(n_queries):
+            kwargs = filters()
+            section = rng.choice(sections)
+            score = rng.uniform(60, 200)
+            t = time.perf_counter()
+            total, _ = engine.eligible(section, score, offset=0, limit=20, **kwargs)
+            latencies.append((time.perf_counter() - t) * 1e6)
+            totals.append(total)
+        print(
+            f"{name:<22}{_percentile(latencies, 50):>7.1f} µs"
+            f"{_percentile(latencies, 99):>7.1f} µs{max(latencies):>7.0f} µs"
+            f"{sum(totals) / len(totals):>16.1f}"
+        )
+
+    latencies, totals = [], []
+    for _ in range(n_queries):
+        section = rng.choice(sections)
+        grades = {name: rng.uniform(5, 20) for name in engine.variables}
+        grades["FG"] = rng.uniform(60, 180)
+        t = time.perf_counter()
+        total, _, _ = engine.simulate(section, grades, offset=0, limit=20)
+        latencies.append((time.perf_counter() - t) * 1e6)
+        totals.append(total)
+    print(
+        f"{'simulation (notes)':<22}{_percentile(latencies, 50):>7.1f} µs"
+        f"{_percentile(latencies, 99):>7.1f} µs{max(latencies):>7.0f} µs"
+        f"{sum(totals) / len(totals):>16.1f}"
+    )
+    print(f"\n{len(engine.formulas)} صيغ compilées, "
+          f"{sum(engine.formula_failures.values())} formations sans formule lisible")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else N_QUERIES)
@@ -0,0 +1,111 @@
+"""
+Benchmark : moteurs d'extraction des tables (pdfplumber / PyMuPDF) sur
+le guide. Pour chaque moteur : temps par page (sans cache ni pool), puis
+comparaison des lignes obtenues sur (code, score, bac, formula), pour
+vérifier la parité avant de changer de moteur par défaut.
+
+Usage : python -m app.services.pipelines.score.bench_extract [--pdf ...]
+        [--first-page 40] [--last-page N] [--show 10]
+"""
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+
+from .extract_score import BACKENDS, FIRST_PAGE, PDF_FILE, RAW_DIR, parse_tables
+
+COMPARED_FIELDS = ("code", "score", "bac", "formula")
+
+
+def _percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run_backend(name, pdf_path, first_page, last_page):
+    """(lignes, temps par page en ms) pour un moteur"""
+    start = time.perf_counter()
+    pdf = BACKENDS[name](pdf_path)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    rows, timings = [], []
+    try:
+        last_page = min(last_page or len(pdf), len(pdf))
+        for page_num in range(first_page - 1, last_page):
+            t = time.perf_counter()
+            rows.extend(parse_tables(pdf.tables(page_num), page_num))
+            timings.append((time.perf_counter() - t) * 1000)
+    finally:
+        pdf.close()
+    return rows, timings, open_ms
+
+
+def _keyed(rows):
+    """{(page, code, bac): ligne} ; les doublons sont numérotés"""
+    seen, keyed = Counter(), {}
+    for row in rows:
+        base = (row["page"], row["code"], row["bac"])
+        keyed[base + (seen[base],)] = row
+        seen[base] += 1
+    return keyed
+
+
+def diff_rows(left, right):
+    left, right = _keyed(left), _keyed(right)
+    only_left = sorted(left.keys() - right.keys())
+    only_right = sorted(right.keys() - left.keys())
+    mismatches = []
+    for key in sorted(left.keys() & right.keys()):
+        fields = [f for f in COMPARED_FIELDS if left[key][f] != right[key][f]]
+        if fields:
+            mismatches.append((key, fields))
+    return only_left, only_right, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", type=Path, default=RAW_DIR / PDF_FILE)
+    parser.add_argument("--first-page", type=int, default=FIRST_PAGE)
+    parser.add_argument("--last-page", type=int, default=None)
+    parser.add_argument("--show", type=int, default=10, help="différences affichées")
+    args = parser.parse_args(argv)
+
+    names = list(BACKENDS)
+    results = {}
+
+    print(f"{'moteur':<12}{'ouverture':>12}{'ms/page p50':>14}{'p99':>10}"
+          f"{'pages/s':>10}{'lignes':>9}")
+    for name in names:
+        rows, timings, open_ms = run_backend(name, args.pdf, args.first_page, args.last_page)
+        results[name] = rows
+        total_s = sum(timings) / 1000
+        rate = len(timings) / total_s if total_s else 0.0
+        print(f"{name:<12}{open_ms:>9.0f} ms{_percentile(timings, 50):>11.1f} ms"
+              f"{_percentile(timings, 99):>7.1f} ms{rate:>10.1f}{len(rows):>9}")
+
+    ref, other = names
+    only_ref, only_other, mismatches = diff_rows(results[ref], results[other])
+    compared = len(_keyed(results[ref]).keys() & _keyed(results[other]).keys())
+
+    print(f"\nParité sur ({', '.join(COMPARED_FIELDS)}) :")
+    print(f"  lignes communes       : {compared}")
+    print(f"  seulement {ref:<12}: {len(only_ref)}")
+    print(f"  seulement {other:<12}: {len(only_other)}")
+    print(f"  champs différents     : {len(mismatches)}")
+
+    left, right = _keyed(results[ref]), _keyed(results[other])
+    for key in only_ref[:args.show]:
+        print(f"  - {ref} page {key[0]} code {key[1]} bac {key[2]!r}")
+    for key in only_other[:args.show]:
+        print(f"  + {other} page {key[0]} code {key[1]} bac {key[2]!r}")
+    for key, fields in mismatches[:args.show]:
+        for field in fields:
+            print(f"  ≠ page {key[0]} code {key[1]} {field} : "
+                  f"{left[key][field]!r} / {right[key][field]!r}")
+
+    if not (only_ref or only_other or mismatches):
+        print(f"✅ {other} reproduit exactement {ref}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,8 @@
 import fitz
-from pathlib import Path
 
-BASE_DIR = Path(__file__).resolve().parents[4]
-RAW_DIR = BASE_DIR / "data" / "raw"
-PDF_FILE = "guide_scores_2025.pdf"
+from .paths import RAW_DIR, guide_pdf
+
+PDF_FILE = guide_pdf()
 
 def debug_page(page_number=40):
     pdf_path = RAW_DIR / PDF_FILE
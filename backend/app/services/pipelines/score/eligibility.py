@@ -0,0 +1,248 @@
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..rag.facets import entry_university, normalize_bac_section
+from ..rag.metrics import Histogram
+from .formula import FormulaError, formula_compiler
+from .paths import processed_scores_path
+
+# ---------------------------------------------------------------------
+# PATHS
+# ---------------------------------------------------------------------
+PROCESSED_SCORES_PATH = processed_scores_path()
+
+# Champs renvoyés pour chaque formation
+PUBLIC_FIELDS = (
+    "code", "diploma", "speciality", "university", "parent_university",
+    "bac_section", "duration", "min_score", "formula",
+)
+
+
+def duration_years(raw: str | None) -> int:
+    m = re.search(r"(\d+)", raw or "")
+    return int(m.group(1)) if m else 0
+
+
+class EligibilityEngine:
+    """
+    "Où puis-je être admis ?" sans LLM : pour chaque شعبة, les formations
+    sont rangées dans des tableaux NumPy triés par min_score. Une
+    recherche dichotomique donne toutes les formations accessibles avec
+    un score donné ; elles sont classées par marge croissante (les plus
+    sélectives d'abord), puis filtrées par université et par durée.
+    """
+
+    def __init__(self, path: Path = PROCESSED_SCORES_PATH):
+        self.path = path
+        self.rows: list[dict] = []
+        # شعبة -> (min_score trié croissant, IDs de lignes alignés)
+        self.sections: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.university_ids: dict[str, int] = {}
+        self.universities = np.zeros(0, dtype="int16")
+        self.durations = np.zeros(0, dtype="int8")
+        self.min_scores = np.zeros(0, dtype="float64")
+        # صيغة de chaque ligne : indice dans self.formulas, -1 si illisible
+        self.formulas = []
+        self.formula_ids = np.zeros(0, dtype="int16")
+        self.formula_failures: dict[str, int] = {}
+        self.variables: frozenset[str] = frozenset()
+        self.skipped = 0
+
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._latency = Histogram([10, 25, 50, 100, 250, 500, 1000, 5000])
+        self._simulate_latency = Histogram([10, 25, 50, 100, 250, 500, 1000, 5000])
+
+    # -----------------------------------------------------------------
+    # Chargement
+    # -----------------------------------------------------------------
+    def load(self, force: bool = False) -> "EligibilityEngine":
+        if self._loaded and not force:
+            return self
+
+        with self._lock:
+            if self._loaded and not force:
+                return self
+
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+
+            rows, by_section, skipped = [], {}, 0
+            university_ids: dict[str, int] = {}
+            universities, durations = [], []
+            formulas, formula_index, formula_ids = [], {}, []
+            formula_failures: dict[str, int] = {}
+
+            for entry in entries:
+                section = normalize_bac_section(entry.get("bac_section"))
+                if section is None or entry.get("min_score") is None:
+                    skipped += 1
+                    continue
+
+                university = entry_university(entry)
+                row_id = len(rows)
+                rows.append({
+                    **{field: entry.get(field) for field in PUBLIC_FIELDS},
+                    "bac_section": section,
+                    "parent_university": university or entry.get("parent_university"),
+                })
+                universities.append(
+                    university_ids.setdefault(university, len(university_ids))
+                    if university else -1
+                )
+                durations.append(duration_years(entry.get("duration")))
+
+                source = entry.get("formula") or ""
+                if source not in formula_index:
+                    try:
+                        formula_index[source] = len(formulas)
+                        formulas.append(formula_compiler.compile(source))
+                    except FormulaError:
+                        formula_index[source] = -1
+                if formula_index[source] < 0:
+                    formula_failures[source] = formula_failures.get(source, 0) + 1
+                formula_ids.append(formula_index[source])
+
+                by_section.setdefault(section, []).append((entry["min_score"], row_id))
+
+            sections = {}
+            for section, items in by_section.items():
+                items.sort()
+                sections[section] = (
+                    np.array([score for score, _ in items], dtype="float64"),
+                    np.array([row_id for _, row_id in items], dtype="int32"),
+                )
+
+            self.rows = rows
+            self.sections = sections
+            self.university_ids = university_ids
+            self.universities = np.array(universities, dtype="int16")
+            self.durations = np.array(durations, dtype="int8")
+            self.min_scores = np.array([row["min_score"] for row in rows], dtype="float64")
+            self.formulas = formulas
+            self.formula_ids = np.array(formula_ids, dtype="int16")
+            self.formula_failures = formula_failures
+            self.variables = frozenset().union(*(f.variables for f in formulas))
+            self.skipped = skipped
+            self._loaded = True
+
+        return self
+
+    # -----------------------------------------------------------------
+    # Requête
+    # -----------------------------------------------------------------
+    def eligible(
+        self,
+        bac_section: str,
+        score: float,
+        parent_university: str | None = None,
+        duration: int | None = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> tuple[int, list[dict]]:
+        """
+        (nombre total, page) des formations de la شعبة dont min_score <=
+        score, par marge croissante. bac_section et parent_university
+        sont des formes canoniques (normalize_bac_section/university).
+        """
+        self.load()
+        start = time.perf_counter()
+
+        scores, row_ids = self.sections.get(bac_section, (None, None))
+        if scores is None:
+            return 0, []
+
+        n = int(np.searchsorted(scores, score, side="right"))
+        ids = row_ids[:n][::-1]
+
+        ids = self._filter(ids, parent_university, duration)
+
+        page = [
+            {**self.rows[i], "margin": round(score - self.rows[i]["min_score"], 3)}
+            for i in ids[offset:offset + limit].tolist()
+        ]
+
+        self._latency.observe((time.perf_counter() - start) * 1e6)
+        return len(ids), page
+
+    def simulate(
+        self,
+        bac_section: str,
+        grades: dict[str, float],
+        parent_university: str | None = None,
+        duration: int | None = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> tuple[int, int, list[dict]]:
+        """
+        (nombre admis, nombre non calculables, page) : le score de l'élève
+        est calculé avec la صيغة de chaque formation de la شعبة, puis
+        comparé à son min_score. Chaque formule distincte est évaluée une
+        fois ; les scores sont ensuite répartis sur les formations par
+        indexation NumPy. Une formation dont la formule est illisible ou
+        demande une matière absente de grades n'est pas calculable.
+        """
+        self.load()
+        start = time.perf_counter()
+
+        _, ids = self.sections.get(bac_section, (None, None))
+        if ids is None:
+            return 0, 0, []
+        ids = self._filter(ids, parent_university, duration)
+
+        per_formula = np.array(
+            [float(f.evaluate(grades)) for f in self.formulas] + [np.nan],
+            dtype="float64",
+        )
+        # formula_ids == -1 pointe sur le NaN final
+        scores = per_formula[self.formula_ids[ids]]
+        margins = scores - self.min_scores[ids]
+
+        computable = ~np.isnan(margins)
+        admitted = computable & (margins >= 0)
+        ids, scores, margins = ids[admitted], scores[admitted], margins[admitted]
+        order = np.argsort(margins, kind="stable")[offset:offset + limit]
+
+        page = [
+            {
+                **self.rows[i],
+                "score": round(float(scores[k]), 3),
+                "margin": round(float(margins[k]), 3),
+            }
+            for k, i in zip(order.tolist(), ids[order].tolist())
+        ]
+
+        self._simulate_latency.observe((time.perf_counter() - start) * 1e6)
+        return len(ids), int((~computable).sum()), page
+
+    def _filter(
+        self,
+        ids: np.ndarray,
+        parent_university: str | None,
+        duration: int | None
+    ) -> np.ndarray:
+        if parent_university is None and duration is None:
+            return ids
+        mask = np.ones(len(ids), dtype=bool)
+        if parent_university is not None:
+            mask &= self.universities[ids] == self.university_ids.get(parent_university, -2)
+        if duration is not None:
+            mask &= self.durations[ids] == duration
+        return ids[mask]
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self.rows),
+            "skipped": self.skipped,
+            "sections": {s: len(scores) for s, (scores, _) in self.sections.items()},
+            "universities": len(self.university_ids),
+            "formulas": len(self.formulas),
+            "formula_failures": self.formula_failures,
+            "latency_us": self._latency.snapshot(),
+            "simulate_latency_us": self._simulate_latency.snapshot(),
+        }
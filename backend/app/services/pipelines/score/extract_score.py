@@ -1,29 +1,36 @@
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from pdfminer.pdftypes import resolve1
+import argparse
+import hashlib
 import pdfplumber
 import json
+import os
+import time
 import warnings
-import sys
 from io import StringIO
 import re
 
+from .paths import EXTRACTED_DIR, RAW_DIR, YEAR, guide_pdf, structured_scores_path
+
 warnings.filterwarnings("ignore")
 
 # Chemins
-BASE_DIR = Path(__file__).resolve().parents[4]
-RAW_DIR = BASE_DIR / "data" / "raw"
-EXTRACTED_DIR = BASE_DIR / "data" / "extracted"
-
-PDF_FILE = "guide_scores_2025.pdf"
-OUTPUT_FILE = "structured_scores_2025.json"
+PAGE_CACHE_DIR = EXTRACTED_DIR / ".page_cache"
 
-pdf_path = RAW_DIR / PDF_FILE
-output_path = EXTRACTED_DIR / OUTPUT_FILE
+PDF_FILE = guide_pdf()
+OUTPUT_FILE = structured_scores_path().name
 
-structured_data = []
+# Les tableaux de scores commencent à la page 40
+FIRST_PAGE = 40
+# Pages par tâche envoyée au pool (équilibrage de charge)
+CHUNK_SIZE = 4
+# À incrémenter à chaque modification du parsing : invalide le cache
+PARSER_VERSION = "1"
+# Moteur de détection des tables : "pdfplumber" ou "pymupdf"
+DEFAULT_BACKEND = "pdfplumber"
 
-# Suppression des warnings pdfplumber
-old_stderr = sys.stderr
-sys.stderr = StringIO()
 
 def clean_and_reverse(text):
     """Nettoie et reverse le texte arabe correctement"""
@@ -34,127 +41,412 @@ def clean_and_reverse(text):
         return text[::-1]
     return text
 
-try:
-    with pdfplumber.open(pdf_path) as pdf:
-        print(f"Total pages: {len(pdf.pages)}")
-        
-        for page_num in range(39, len(pdf.pages)):  # À partir de la page 40
-            page = pdf.pages[page_num]
+
+# =====================================================================
+# PARSING D'UNE PAGE
+# =====================================================================
+def parse_table(table, page_num):
+    """Lignes de scores d'un tableau (page_num : indice 0 de la page)"""
+    entries = []
+
+    previous = [""] * 7
+    current_diploma = ""      # Nom classique de l'إجازة
+    current_preparatory = ""  # Nom du cycle préparatoire (ex: مرحلة تحضيرية مندمجة...)
+
+    for row in table:
+        if row is None:
+            continue
+
+        # Normalisation à 7 colonnes
+        if len(row) > 7:
+            row = row[:7]
+        elif len(row) < 7:
+            row += [""] * (7 - len(row))
+
+        # Nettoyage et reverse arabe
+        cleaned_row = []
+        for cell in row:
+            cell_text = "" if cell is None else str(cell).strip()
+            cleaned_row.append(clean_and_reverse(cell_text))
+
+        # Fill down des cellules mergées
+        for j in range(7):
+            if cleaned_row[j]:
+                previous[j] = cleaned_row[j]
+            else:
+                cleaned_row[j] = previous[j]
+
+        diploma_raw = cleaned_row[6]
+
+        # Détection d'un nouveau cycle préparatoire intégré
+        if any(keyword in diploma_raw for keyword in ["مرحلة تحضيرية", "مندمجة", "فيزياء - كيمياء", "العلمية", "Préparatoire"]):
+            current_preparatory = diploma_raw.strip()
+            continue  # Ce n'est pas une ligne de données
+
+        # Mise à jour du diploma normal
+        if (diploma_raw and
+            not re.search(r'سن[تو]ان\s*\+\s*3', diploma_raw) and
+            "(امد)" not in diploma_raw and
+            not any(k in diploma_raw for k in ["إجبارية", "اختبار", "تطلب"])):
+            current_diploma = diploma_raw.strip()
+
+        # Skip des en-têtes
+        if any(kw in " ".join(cleaned_row) for kw in ["مجموع نقاط", "صيغة احتساب", "الشعبة", "المؤسسة", "الرمز", "الجامعة", "الشهادة"]):
+            continue
+
+        # Validation du code (5 chiffres)
+        code = cleaned_row[3].strip()
+        if not re.fullmatch(r'\d{5}', code):
+            continue
+
+        # Validation du score
+        score_str = cleaned_row[0].replace(",", ".")
+        if score_str in ['', '-']:
+            continue
+        try:
+            score = float(score_str)
+        except ValueError:
+            continue
+
+        # Gestion spéciale des cycles préparatoires
+        if current_preparatory and re.search(r'سن[تو]ان\s*\+\s*3', diploma_raw):
+            diploma = current_preparatory
+            periode = "سنتان +3 سنوات"
+        else:
+            diploma = current_diploma or None
+            periode = None
+
+        # Extraction période et exigences (sécurisée contre None)
+        exigences = []
+        raw_diploma_cell = row[6]  # Cellule brute pour éviter None après nettoyage
+        if raw_diploma_cell:
+            diploma_lines = [l.strip() for l in str(raw_diploma_cell).split('\n') if l.strip()]
+            for line in diploma_lines:
+                rev_line = clean_and_reverse(line)
+                if re.search(r'\d+\s*سنوات?', rev_line) or '(امد)' in line:
+                    periode = rev_line
+                elif any(word in rev_line for word in ['اختبار', 'إجبارية', 'تطلب', 'تربية بدنية']):
+                    exigences.append(rev_line)
+
+        # University
+        university_raw = cleaned_row[5].replace('\n', ' ').strip()
+        university = " ".join(university_raw.split())
+
+        # Speciality
+        speciality_raw = cleaned_row[4].replace('\n', ' - ').strip()
+        speciality = " ".join(speciality_raw.split())
+
+        entries.append({
+            "diploma": diploma,
+            "university": university,
+            "speciality": speciality if speciality else None,
+            "code": code,
+            "bac": cleaned_row[2],
+            "formula": cleaned_row[1],
+            "score": score,
+            "page": page_num + 1,
+            "periode": periode,
+            "exigence": '، '.join(exigences) if exigences else None
+        })
+
+    return entries
+
+
+def parse_tables(tables, page_num):
+    """Lignes de toutes les tables d'une page"""
+    entries = []
+    for table in tables or []:
+        if len(table) < 3:
+            continue
+        entries.extend(parse_table(table, page_num))
+    return entries
+
+
+# =====================================================================
+# MOTEURS D'EXTRACTION
+# =====================================================================
+def _content_key(backend, box, streams):
+    """
+    Empreinte du contenu d'une page (flux de contenu + format + moteur),
+    indépendante de sa position dans le PDF : une page inchangée d'un
+    guide rectifié garde la même empreinte.
+    """
+    h = hashlib.sha256(f"{PARSER_VERSION}:{backend}:{box}".encode())
+    for data in streams:
+        h.update(data)
+    return h.hexdigest()
+
+
+class PdfplumberBackend:
+    """Tables détectées par pdfplumber (moteur historique)"""
+
+    name = "pdfplumber"
+
+    def __init__(self, pdf_path):
+        with redirect_stderr(StringIO()):
+            self.pdf = pdfplumber.open(pdf_path)
+
+    def __len__(self):
+        return len(self.pdf.pages)
+
+    def tables(self, page_num):
+        page = self.pdf.pages[page_num]
+        # Suppression des warnings pdfplumber (limitée au parsing)
+        with redirect_stderr(StringIO()):
             tables = page.extract_tables()
-            
-            if not tables:
-                continue
-                
-            for table in tables:
-                if len(table) < 3:
-                    continue
-                
-                previous = [""] * 7
-                current_diploma = ""      # Nom classique de l'إجازة
-                current_preparatory = ""  # Nom du cycle préparatoire (ex: مرحلة تحضيرية مندمجة...)
-                
-                for row in table:
-                    if row is None:
-                        continue
-                    
-                    # Normalisation à 7 colonnes
-                    if len(row) > 7:
-                        row = row[:7]
-                    elif len(row) < 7:
-                        row += [""] * (7 - len(row))
-                    
-                    # Nettoyage et reverse arabe
-                    cleaned_row = []
-                    for cell in row:
-                        cell_text = "" if cell is None else str(cell).strip()
-                        cleaned_row.append(clean_and_reverse(cell_text))
-                    
-                    # Fill down des cellules mergées
-                    for j in range(7):
-                        if cleaned_row[j]:
-                            previous[j] = cleaned_row[j]
-                        else:
-                            cleaned_row[j] = previous[j]
-                    
-                    diploma_raw = cleaned_row[6]
-                    
-                    # Détection d'un nouveau cycle préparatoire intégré
-                    if any(keyword in diploma_raw for keyword in ["مرحلة تحضيرية", "مندمجة", "فيزياء - كيمياء", "العلمية", "Préparatoire"]):
-                        current_preparatory = diploma_raw.strip()
-                        continue  # Ce n'est pas une ligne de données
-                    
-                    # Mise à jour du diploma normal
-                    if (diploma_raw and 
-                        not re.search(r'سن[تو]ان\s*\+\s*3', diploma_raw) and
-                        "(امد)" not in diploma_raw and
-                        not any(k in diploma_raw for k in ["إجبارية", "اختبار", "تطلب"])):
-                        current_diploma = diploma_raw.strip()
-                    
-                    # Skip des en-têtes
-                    if any(kw in " ".join(cleaned_row) for kw in ["مجموع نقاط", "صيغة احتساب", "الشعبة", "المؤسسة", "الرمز", "الجامعة", "الشهادة"]):
-                        continue
-                    
-                    # Validation du code (5 chiffres)
-                    code = cleaned_row[3].strip()
-                    if not re.fullmatch(r'\d{5}', code):
-                        continue
-                    
-                    # Validation du score
-                    score_str = cleaned_row[0].replace(",", ".")
-                    if score_str in ['', '-']:
-                        continue
-                    try:
-                        score = float(score_str)
-                    except ValueError:
-                        continue
-                    
-                    # Gestion spéciale des cycles préparatoires
-                    if current_preparatory and re.search(r'سن[تو]ان\s*\+\s*3', diploma_raw):
-                        diploma = current_preparatory
-                        periode = "سنتان +3 سنوات"
-                    else:
-                        diploma = current_diploma or None
-                        periode = None
-                    
-                    # Extraction période et exigences (sécurisée contre None)
-                    exigences = []
-                    raw_diploma_cell = row[6]  # Cellule brute pour éviter None après nettoyage
-                    if raw_diploma_cell:
-                        diploma_lines = [l.strip() for l in str(raw_diploma_cell).split('\n') if l.strip()]
-                        for line in diploma_lines:
-                            rev_line = clean_and_reverse(line)
-                            if re.search(r'\d+\s*سنوات?', rev_line) or '(امد)' in line:
-                                periode = rev_line
-                            elif any(word in rev_line for word in ['اختبار', 'إجبارية', 'تطلب', 'تربية بدنية']):
-                                exigences.append(rev_line)
-                    
-                    # University
-                    university_raw = cleaned_row[5].replace('\n', ' ').strip()
-                    university = " ".join(university_raw.split())
-                    
-                    # Speciality
-                    speciality_raw = cleaned_row[4].replace('\n', ' - ').strip()
-                    speciality = " ".join(speciality_raw.split())
-                    
-                    entry = {
-                        "diploma": diploma,
-                        "university": university,
-                        "speciality": speciality if speciality else None,
-                        "code": code,
-                        "bac": cleaned_row[2],
-                        "formula": cleaned_row[1],
-                        "score": score,
-                        "page": page_num + 1,
-                        "periode": periode,
-                        "exigence": '، '.join(exigences) if exigences else None
-                    }
-                    structured_data.append(entry)
-
-finally:
-    sys.stderr = old_stderr
-
-# Sauvegarde
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(structured_data, f, ensure_ascii=False, indent=4)
-
-print(f"Extraction terminée : {len(structured_data)} entrées sauvegardées dans {output_path}")
\ No newline at end of file
+        page.close()
+        return tables
+
+    def page_key(self, page_num):
+        page = self.pdf.pages[page_num]
+        obj = page.page_obj
+        key = _content_key(
+            self.name,
+            obj.mediabox,
+            (resolve1(stream).get_data() for stream in obj.contents)
+        )
+        page.close()
+        return key
+
+    def close(self):
+        self.pdf.close()
+
+
+class PymupdfBackend:
+    """
+    Tables détectées par PyMuPDF (find_tables, stratégie "lines" comme
+    pdfplumber), nettement plus rapide. Cellules fusionnées : None.
+    """
+
+    name = "pymupdf"
+
+    def __init__(self, pdf_path):
+        import pymupdf
+        self.doc = pymupdf.open(pdf_path)
+
+    def __len__(self):
+        return len(self.doc)
+
+    def tables(self, page_num):
+        # find_tables affiche un conseil (pymupdf_layout) au premier appel
+        with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+            found = self.doc[page_num].find_tables()
+            return [table.extract() for table in found.tables]
+
+    def page_key(self, page_num):
+        page = self.doc[page_num]
+        return _content_key(self.name, tuple(page.mediabox), [page.read_contents()])
+
+    def close(self):
+        self.doc.close()
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PymupdfBackend.name: PymupdfBackend,
+}
+
+
+# =====================================================================
+# WORKERS
+# =====================================================================
+# PDF ouvert une fois par processus : l'ouverture (lecture de la table
+# xref, des polices...) coûte plus cher que le parsing de quelques pages
+_worker_pdf = None
+
+
+def _open_worker(pdf_path, backend):
+    global _worker_pdf
+    _worker_pdf = BACKENDS[backend](pdf_path)
+
+
+def _close_worker():
+    global _worker_pdf
+    if _worker_pdf is not None:
+        _worker_pdf.close()
+        _worker_pdf = None
+
+
+def _extract_pages(page_nums):
+    """[(page_num, lignes)] pour une tranche de pages (exécuté dans un worker)"""
+    return [
+        (page_num, parse_tables(_worker_pdf.tables(page_num), page_num))
+        for page_num in page_nums
+    ]
+
+
+def _chunks(page_nums, size):
+    for i in range(0, len(page_nums), size):
+        yield page_nums[i:i + size]
+
+
+# =====================================================================
+# CACHE PAR PAGE
+# =====================================================================
+class PageCache:
+    """
+    Lignes extraites de chaque page, un fichier JSON par empreinte de
+    contenu. Seules les pages modifiées d'un PDF republié sont
+    re-parsées ; une extraction interrompue reprend aussi par ce biais
+    (chaque page terminée est écrite aussitôt, de façon atomique).
+    """
+
+    def __init__(self, directory: Path = PAGE_CACHE_DIR):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, page_num: int):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # La même page peut avoir changé de numéro dans le nouveau PDF
+        for row in rows:
+            row["page"] = page_num + 1
+        return rows
+
+    def put(self, key: str, rows: list):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# =====================================================================
+# EXTRACTION
+# =====================================================================
+def extract(
+    pdf_path=RAW_DIR / PDF_FILE,
+    output_path=EXTRACTED_DIR / OUTPUT_FILE,
+    first_page=FIRST_PAGE,
+    last_page=None,
+    workers=None,
+    chunk_size=CHUNK_SIZE,
+    force=False,
+    cache=None,
+    backend=DEFAULT_BACKEND
+):
+    """
+    Extrait les lignes de scores des pages [first_page, last_page]
+    (numérotées à partir de 1) avec le moteur backend ("pdfplumber" ou
+    "pymupdf") et les écrit dans output_path.
+
+    Les pages dont le contenu est déjà dans le cache ne sont pas
+    re-parsées (force=True ignore le cache, qui est tout de même mis à
+    jour). Les autres sont réparties par tranches sur un pool de
+    processus. Les lignes sont fusionnées dans l'ordre des pages : la
+    sortie ne dépend ni du nombre de workers ni de l'ordre de fin des
+    tâches.
+    """
+    pdf_path, output_path = Path(pdf_path), Path(output_path)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend} (expected: {', '.join(BACKENDS)})")
+    workers = workers or os.cpu_count() or 1
+    cache = cache or PageCache()
+
+    pdf = BACKENDS[backend](pdf_path)
+    try:
+        total_pages = len(pdf)
+        print(f"Total pages: {total_pages}")
+
+        last_page = min(last_page or total_pages, total_pages)
+        page_nums = list(range(first_page - 1, last_page))
+        keys = {page_num: pdf.page_key(page_num) for page_num in page_nums}
+    finally:
+        pdf.close()
+
+    done = {}
+    if not force:
+        for page_num in page_nums:
+            rows = cache.get(keys[page_num], page_num)
+            if rows is not None:
+                done[page_num] = rows
+    todo = [p for p in page_nums if p not in done]
+
+    start = time.perf_counter()
+    if todo:
+        if workers == 1:
+            _open_worker(pdf_path, backend)
+            try:
+                for chunk in _chunks(todo, chunk_size):
+                    for page_num, rows in _extract_pages(chunk):
+                        cache.put(keys[page_num], rows)
+                        done[page_num] = rows
+            finally:
+                _close_worker()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_open_worker,
+                initargs=(pdf_path, backend)
+            ) as pool:
+                futures = [
+                    pool.submit(_extract_pages, chunk)
+                    for chunk in _chunks(todo, chunk_size)
+                ]
+                for future in as_completed(futures):
+                    for page_num, rows in future.result():
+                        cache.put(keys[page_num], rows)
+                        done[page_num] = rows
+
+    elapsed = time.perf_counter() - start
+    structured_data = [row for page_num in sorted(done) for row in done[page_num]]
+
+    # Sauvegarde
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(structured_data, f, ensure_ascii=False, indent=4)
+
+    rate = len(todo) / elapsed if elapsed > 0 else 0.0
+    stats = cache.stats()
+    print(f"🗃️  Cache : {stats['hits']} pages inchangées, {len(todo)} à parser"
+          f"{' (--force)' if force else ''}")
+    print(f"⏱️  {len(todo)} pages en {elapsed:.1f}s ({rate:.1f} pages/s, {workers} workers, {backend})")
+    print(f"Extraction terminée : {len(structured_data)} entrées sauvegardées dans {output_path}")
+    return structured_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraction des scores du guide d'orientation (PDF → JSON)")
+    parser.add_argument("--year", type=int, default=YEAR, help="année du guide (chemins par défaut)")
+    parser.add_argument("--pdf", type=Path, default=None, help="défaut : data/raw/guide_scores_<année>.pdf")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="défaut : data/extracted/structured_scores_<année>.json")
+    parser.add_argument("--first-page", type=int, default=FIRST_PAGE)
+    parser.add_argument("--last-page", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="défaut : nombre de CPU")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="pages par tâche")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--force", action="store_true", help="re-parser toutes les pages (ignorer le cache)")
+    args = parser.parse_args(argv)
+
+    extract(
+        args.pdf or RAW_DIR / guide_pdf(args.year),
+        args.output or structured_scores_path(args.year),
+        first_page=args.first_page,
+        last_page=args.last_page,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        force=args.force,
+        backend=args.backend
+    )
+
+
+if __name__ == "__main__":
+    main()
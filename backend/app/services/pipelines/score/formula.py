@@ -0,0 +1,240 @@
+import re
+import threading
+
+import numpy as np
+
+# ---------------------------------------------------------------------
+# صيغة الاحتساب : "FG+(M+SP)/2", "FG+(A+Ang+2F)/4",
+# "FG+Max((Ang-15),0)+Max((M-12),0)"...
+#
+# Grammaire :
+#   expr   := term (("+" | "-") term)*
+#   term   := factor (("*" | "/") factor)*
+#   factor := NUMBER [IDENT | "("expr")"]     coefficient implicite : 2F
+#           | IDENT "(" expr ("," expr)* ")"  fonction : Max, Min
+#           | IDENT                           note d'une matière
+#           | "(" expr ")" | "-" factor
+# ---------------------------------------------------------------------
+
+FUNCTIONS = {
+    "max": np.maximum,
+    "min": np.minimum,
+}
+
+_TOKEN = re.compile(r"(?P<number>\d+(?:[.,]\d+)?)|(?P<ident>[A-Za-z]+)|(?P<op>[-+*/(),])")
+
+
+class FormulaError(ValueError):
+    pass
+
+
+def _tokenize(source: str) -> list[tuple[str, str]]:
+    # Les retours à la ligne viennent de l'extraction PDF ("(A+Ang+2F)/\n4")
+    text = re.sub(r"\s+", "", source or "")
+    if not text:
+        raise FormulaError("empty formula")
+
+    tokens, pos = [], 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise FormulaError(f"unexpected character {text[pos]!r} at {pos}")
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind)))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Descente récursive : chaque règle renvoie une fonction
+    env -> valeur, où env associe une matière à un scalaire ou à un
+    tableau NumPy (un élève ou un lot d'élèves)
+    """
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+        self.variables: set[str] = set()
+
+    def peek(self, value: str | None = None) -> bool:
+        if self.pos >= len(self.tokens):
+            return False
+        return value is None or self.tokens[self.pos][1] == value
+
+    def take(self, value: str | None = None) -> tuple[str, str]:
+        if self.pos >= len(self.tokens):
+            raise FormulaError("unexpected end of formula")
+        token = self.tokens[self.pos]
+        if value is not None and token[1] != value:
+            raise FormulaError(f"expected {value!r}, got {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"unexpected {self.tokens[self.pos][1]!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek("+") or self.peek("-"):
+            op = self.take()[1]
+            left, right = node, self.term()
+            if op == "+":
+                node = lambda env, l=left, r=right: l(env) + r(env)
+            else:
+                node = lambda env, l=left, r=right: l(env) - r(env)
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek("*") or self.peek("/"):
+            op = self.take()[1]
+            left, right = node, self.factor()
+            if op == "*":
+                node = lambda env, l=left, r=right: l(env) * r(env)
+            else:
+                node = lambda env, l=left, r=right: l(env) / r(env)
+        return node
+
+    def factor(self):
+        kind, value = self.take()
+
+        if kind == "number":
+            number = float(value.replace(",", "."))
+            if self.pos < len(self.tokens) and (
+                self.tokens[self.pos][0] == "ident" or self.peek("(")
+            ):
+                operand = self.factor()
+                return lambda env, k=number, o=operand: k * o(env)
+            return lambda env, k=number: k
+
+        if kind == "ident":
+            if self.peek("("):
+                fn = FUNCTIONS.get(value.lower())
+                if fn is None:
+                    raise FormulaError(f"unknown function {value!r}")
+                self.take("(")
+                args = [self.expr()]
+                while self.peek(","):
+                    self.take(",")
+                    args.append(self.expr())
+                self.take(")")
+                if len(args) < 2:
+                    raise FormulaError(f"{value} expects at least 2 arguments")
+                node = args[0]
+                for arg in args[1:]:
+                    node = lambda env, f=fn, l=node, r=arg: f(l(env), r(env))
+                return node
+
+            self.variables.add(value)
+            return lambda env, name=value: env.get(name, np.nan)
+
+        if value == "(":
+            node = self.expr()
+            self.take(")")
+            return node
+
+        if value == "-":
+            operand = self.factor()
+            return lambda env, o=operand: -o(env)
+
+        raise FormulaError(f"unexpected {value!r}")
+
+
+class CompiledFormula:
+
+    def __init__(self, source: str, fn, variables: frozenset[str]):
+        self.source = source
+        self.variables = variables
+        self._fn = fn
+
+    def evaluate(self, grades: dict):
+        """
+        Score pour des notes {matière: valeur}. Les valeurs peuvent être
+        des tableaux (un lot d'élèves) ; une matière absente donne NaN.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._fn(grades)
+
+    def __repr__(self) -> str:
+        return f"CompiledFormula({self.source!r})"
+
+
+def compile_formula(source: str) -> CompiledFormula:
+    parser = _Parser(_tokenize(source))
+    fn = parser.parse()
+    return CompiledFormula(source, fn, frozenset(parser.variables))
+
+
+class FormulaCompiler:
+    """
+    Compile chaque صيغة distincte une seule fois. Les échecs sont
+    mémorisés eux aussi (avec leur message), pour ne pas réessayer à
+    chaque requête et pour repérer les formules mal extraites du PDF.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compiled: dict[str, CompiledFormula] = {}
+        self._failures: dict[str, str] = {}
+        self._counters = {"hits": 0, "misses": 0}
+
+    def compile(self, source: str) -> CompiledFormula:
+        with self._lock:
+            compiled = self._compiled.get(source)
+            if compiled is not None:
+                self._counters["hits"] += 1
+                return compiled
+            if source in self._failures:
+                self._counters["hits"] += 1
+                raise FormulaError(self._failures[source])
+            self._counters["misses"] += 1
+
+        try:
+            compiled = compile_formula(source)
+        except FormulaError as e:
+            with self._lock:
+                self._failures[source] = str(e)
+            raise
+
+        with self._lock:
+            self._compiled[source] = compiled
+        return compiled
+
+    def failures(self) -> dict[str, str]:
+        return dict(self._failures)
+
+    def stats(self) -> dict:
+        return {
+            **self._counters,
+            "compiled": len(self._compiled),
+            "failures": self.failures(),
+        }
+
+
+formula_compiler = FormulaCompiler()
+
+
+if __name__ == "__main__":
+    import json
+    from collections import Counter
+
+    from .eligibility import PROCESSED_SCORES_PATH
+
+    with open(PROCESSED_SCORES_PATH, "r", encoding="utf-8") as f:
+        counts = Counter(entry.get("formula") or "" for entry in json.load(f))
+
+    variables = set()
+    for source, n in counts.most_common():
+        try:
+            variables |= formula_compiler.compile(source).variables
+        except FormulaError as e:
+            print(f"❌ {n:>4} x {source!r} : {e}")
+
+    stats = formula_compiler.stats()
+    print(f"✅ {stats['compiled']} formules compilées, "
+          f"{len(stats['failures'])} en échec")
+    print(f"Matières : {', '.join(sorted(variables))}")
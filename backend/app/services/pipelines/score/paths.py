@@ -0,0 +1,27 @@
+from pathlib import Path
+
+# ---------------------------------------------------------------------
+# PATHS
+# ---------------------------------------------------------------------
+BASE_DIR = Path(__file__).resolve().parents[4]
+RAW_DIR = BASE_DIR / "data" / "raw"
+EXTRACTED_DIR = BASE_DIR / "data" / "extracted"
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+
+# Année du guide servi par défaut (table traitée, corpus RAG) : les
+# autres années restent disponibles dans le ScoreStore (historique)
+YEAR = 2025
+
+
+def guide_pdf(year: int = YEAR) -> str:
+    return f"guide_scores_{year}.pdf"
+
+
+def structured_scores_path(year: int = YEAR) -> Path:
+    """Sortie de extract_score"""
+    return EXTRACTED_DIR / f"structured_scores_{year}.json"
+
+
+def processed_scores_path(year: int = YEAR) -> Path:
+    """Table traitée (sortie de transform_score)"""
+    return PROCESSED_DIR / f"processed_scores_{year}.json"
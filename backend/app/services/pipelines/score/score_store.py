@@ -0,0 +1,201 @@
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# ---------------------------------------------------------------------
+# PATHS
+# ---------------------------------------------------------------------
+BASE_DIR = Path(__file__).resolve().parents[4]
+STORE_DIR = BASE_DIR / "data" / "processed" / "scores"
+
+# Une partition par année : scores/year=2025/scores.arrow
+PARTITION_FILE = "scores.arrow"
+# Lignes par record batch à l'écriture (mémoire bornée en streaming)
+BATCH_ROWS = 10_000
+
+# Colonnes de la table traitée (transform_entry)
+SCHEMA = pa.schema([
+    ("code", pa.string()),
+    ("diploma", pa.string()),
+    ("university", pa.string()),
+    ("parent_university", pa.string()),
+    ("speciality", pa.string()),
+    ("bac_section", pa.string()),
+    ("formula", pa.string()),
+    ("min_score", pa.float64()),
+    ("duration", pa.string()),
+    ("requirements", pa.string()),
+    ("source_page", pa.int32()),
+])
+
+
+def code_key(code) -> int:
+    """Code de formation sous forme d'entier (-1 si absent ou invalide)"""
+    code = str(code or "")
+    return int(code) if code.isdigit() else -1
+
+
+def partition_path(year: int, directory: Path = STORE_DIR) -> Path:
+    return Path(directory) / f"year={year}" / PARTITION_FILE
+
+
+# =====================================================================
+# ÉCRITURE
+# =====================================================================
+def _record_batch(entries: list[dict]) -> pa.RecordBatch:
+    return pa.RecordBatch.from_pydict(
+        {field.name: [e.get(field.name) for e in entries] for field in SCHEMA},
+        schema=SCHEMA,
+    )
+
+
+def write_partition(
+    entries,
+    year: int,
+    directory: Path = STORE_DIR,
+    presorted: bool = False
+) -> Path:
+    """
+    Écrit (remplace) la partition d'une année. Fichier Arrow IPC non
+    compressé, trié par code : il peut être mappé en mémoire sans copie
+    et interrogé par recherche dichotomique.
+
+    presorted=True : entries est un itérable déjà trié par code, écrit
+    au fil de l'eau par lots de BATCH_ROWS lignes.
+    """
+    if not presorted:
+        entries = sorted(entries, key=lambda e: code_key(e.get("code")))
+
+    path = partition_path(year, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with ipc.new_file(sink, SCHEMA) as writer:
+            batch = []
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= BATCH_ROWS:
+                    writer.write_batch(_record_batch(batch))
+                    batch = []
+            if batch or writer.stats.num_record_batches == 0:
+                writer.write_batch(_record_batch(batch))
+    tmp.replace(path)
+    return path
+
+
+# =====================================================================
+# LECTURE
+# =====================================================================
+class ScoreStore:
+    """
+    Tables de scores de toutes les années disponibles. Chaque partition
+    est mappée en mémoire : seules les colonnes réellement lues sont
+    chargées depuis le disque (et partagées entre processus par le
+    cache de pages de l'OS).
+
+    columns restreint les colonnes gardées (code est toujours inclus).
+
+    Index : pour chaque année, les codes (triés à l'écriture) sous forme
+    d'entiers, interrogés par np.searchsorted.
+    """
+
+    def __init__(self, directory: Path = STORE_DIR, columns: list[str] | None = None):
+        self.directory = Path(directory)
+        self.columns = ["code"] + [c for c in columns if c != "code"] if columns else None
+        self._tables: dict[int, pa.Table] = {}
+        self._codes: dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # -----------------------------------------------------------------
+    # Chargement
+    # -----------------------------------------------------------------
+    def years(self) -> list[int]:
+        self.load()
+        return sorted(self._tables)
+
+    def load(self, force: bool = False) -> "ScoreStore":
+        if self._loaded and not force:
+            return self
+
+        with self._lock:
+            if self._loaded and not force:
+                return self
+
+            tables, codes = {}, {}
+            for path in sorted(self.directory.glob(f"year=*/{PARTITION_FILE}")):
+                m = re.fullmatch(r"year=(\d{4})", path.parent.name)
+                if not m:
+                    continue
+                year = int(m.group(1))
+                # Lecture sans copie : les tampons pointent dans le mapping
+                source = pa.memory_map(str(path), "r")
+                table = ipc.open_file(source).read_all()
+                tables[year] = table.select(self.columns) if self.columns else table
+                codes[year] = np.array(
+                    [code_key(c) for c in tables[year].column("code").to_pylist()],
+                    dtype="int64",
+                )
+
+            self._tables = tables
+            self._codes = codes
+            self._loaded = True
+
+        return self
+
+    def table(self, year: int, columns: list[str] | None = None) -> pa.Table:
+        """Partition d'une année, restreinte aux colonnes demandées"""
+        self.load()
+        if year not in self._tables:
+            raise KeyError(f"No scores for year {year}")
+        table = self._tables[year]
+        return table.select(columns) if columns else table
+
+    # -----------------------------------------------------------------
+    # Requêtes
+    # -----------------------------------------------------------------
+    def lookup(self, code: str, columns: list[str]) -> list[dict]:
+        """Lignes d'un code pour toutes les années, par année croissante"""
+        self.load()
+        key = code_key(code)
+        if key < 0:
+            return []
+
+        rows = []
+        for year in sorted(self._tables):
+            codes = self._codes[year]
+            lo = int(np.searchsorted(codes, key, side="left"))
+            hi = int(np.searchsorted(codes, key, side="right"))
+            if lo == hi:
+                continue
+            part = self._tables[year].select(columns).slice(lo, hi - lo)
+            rows.extend({"year": year, **row} for row in part.to_pylist())
+        return rows
+
+    def min_score_history(self, code: str) -> list[dict]:
+        """
+        Évolution du score minimum d'une formation (code) d'une année à
+        l'autre, une ligne par (année, شعبة)
+        """
+        return self.lookup(code, ["code", "bac_section", "min_score", "formula", "university"])
+
+    def stats(self) -> dict:
+        self.load()
+        return {
+            "years": {year: table.num_rows for year, table in sorted(self._tables.items())},
+            "bytes": sum(table.nbytes for table in self._tables.values()),
+        }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    store = ScoreStore()
+    print(store.stats())
+    for code in sys.argv[1:]:
+        print(json.dumps(store.min_score_history(code), ensure_ascii=False, indent=2))
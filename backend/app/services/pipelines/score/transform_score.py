@@ -1,21 +1,30 @@
+import heapq
 import json
+import os
+import pickle
 import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from ..rag.rag_block import build_rag_block
+from .paths import PROCESSED_DIR, YEAR, processed_scores_path, structured_scores_path
+from .score_store import write_partition
 
 # ---------------------------------------------------------------------
 # PATHS
 # ---------------------------------------------------------------------
-BASE_DIR = Path(__file__).resolve().parents[4]
-EXTRACTED_DIR = BASE_DIR / "data" / "extracted"
-PROCESSED_DIR = BASE_DIR / "data" / "processed"
-
-INPUT_JSON = EXTRACTED_DIR / "structured_scores_2025.json"
-OUTPUT_JSON = PROCESSED_DIR / "processed_scores_2025.json"
 RAG_TEXT_FILE = PROCESSED_DIR / "rag_corpus.txt"
 
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
+# Streaming : taille des lectures et du tampon de tri de la table traitée
+READ_CHUNK_CHARS = 1 << 16
+SORT_BUFFER_ROWS = 20_000
+# Entrées par lot relu d'un fichier de tri (mémoire de la fusion)
+RUN_BATCH_ROWS = 1_000
+
 # ---------------------------------------------------------------------
 # CONSTANTES
 # ---------------------------------------------------------------------
@@ -122,23 +131,6 @@ def extract_duration(text: str) -> Optional[str]:
     m = re.search(r"(\d+)\s*سنوات?", text)
     return f"{m.group(1)} سنوات" if m else None
 
-# ---------------------------------------------------------------------
-# RAG BLOCK
-# ---------------------------------------------------------------------
-def build_rag_block(entry: Dict[str, Any]) -> str:
-    return (
-        "###\n"
-        f"التكوين: {entry['diploma']}\n"
-        f"الاختصاص: {entry['speciality']}\n"
-        f"المؤسسة: {entry['university']}\n"
-        f"الجامعة: {entry['parent_university']}\n"
-        f"شعبة الباكالوريا: {entry['bac_section']}\n"
-        f"المدة: {entry['duration']}\n"
-        f"معدل القبول الأدنى: {entry['min_score']}\n"
-        f"صيغة الاحتساب: {entry['formula']}\n"
-        f"شروط إضافية: {entry['requirements'] or 'لا يوجد'}\n"
-    )
-
 # ---------------------------------------------------------------------
 # TRANSFORMATION D’UNE ENTRÉE
 # ---------------------------------------------------------------------
@@ -179,37 +171,258 @@ def transform_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 # ---------------------------------------------------------------------
-# MAIN
+# STREAMING : LECTURE
 # ---------------------------------------------------------------------
-def main():
+def read_entries(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Entrées extraites, une à une : JSONL (une entrée par ligne) ou
+    tableau JSON (décodé par morceaux, sans charger tout le fichier)
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        buffer, pos, started = "", 0, False
+        while True:
+            chunk = f.read(READ_CHUNK_CHARS)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            while True:
+                # Séparateurs : "[" initial, "," entre entrées, "]" final
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+                    if buffer[pos] == "[":
+                        started = True
+                    pos += 1
+                if pos >= len(buffer):
+                    break
+                if not started:
+                    raise ValueError(f"{path} : tableau JSON attendu")
+                try:
+                    entry, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        raise
+                    break  # entrée incomplète : lire la suite
+                yield entry
+                pos = end
+            if not chunk:
+                return
+
+
+def input_path(year: int) -> Path:
+    """structured_scores_<année>.jsonl si présent, sinon le .json"""
+    json_path = structured_scores_path(year)
+    jsonl = json_path.with_suffix(".jsonl")
+    return jsonl if jsonl.exists() else json_path
+
+
+def corpus_path(year: int) -> Path:
+    return RAG_TEXT_FILE if year == YEAR else PROCESSED_DIR / f"rag_corpus_{year}.txt"
 
-    with open(INPUT_JSON, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
 
-    processed, rag_blocks, seen = [], [], set()
-
-    for e in raw_data:
+# ---------------------------------------------------------------------
+# STREAMING : ÉTAPES
+# ---------------------------------------------------------------------
+def dedupe(entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Première occurrence de chaque (code, bac) ; seules les clés sont gardées"""
+    seen = set()
+    for e in entries:
         key = (e.get("code"), e.get("bac"))
         if key in seen:
             continue
         seen.add(key)
+        yield e
 
-        t = transform_entry(e)
 
+def transform(entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for e in entries:
+        t = transform_entry(e)
         if t["code"] and t["min_score"] is not None:
-            processed.append(t)
-            rag_blocks.append(build_rag_block(t))
+            yield t
 
-    processed.sort(key=lambda x: x["code"])
 
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(processed, f, ensure_ascii=False, indent=2)
+# ---------------------------------------------------------------------
+# STREAMING : SORTIES
+# ---------------------------------------------------------------------
+class CorpusWriter:
+    """
+    Blocs RAG écrits au fil de l'eau, dans l'ordre d'arrivée, dans un
+    fichier temporaire : le corpus servi n'est remplacé (os.replace) que
+    par close(publish=True), une fois toute la transformation réussie.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self._file = open(self._tmp, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, entry: Dict[str, Any]):
+        if self.count:
+            self._file.write("\n")
+        self._file.write(build_rag_block(entry))
+        self.count += 1
+
+    def close(self, publish: bool = True):
+        self._file.close()
+        if publish:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink(missing_ok=True)
+
+
+class ProcessedTableWriter:
+    """
+    Table traitée triée par code, en mémoire bornée : les entrées sont
+    accumulées par lots de SORT_BUFFER_ROWS, chaque lot trié est déversé
+    dans un fichier temporaire, puis les lots sont fusionnés (heapq.merge
+    est stable : même ordre qu'un tri global) vers le JSON et vers la
+    partition Arrow de l'année.
+    """
+
+    def __init__(self, output_json: Path, year: int, buffer_rows: int = SORT_BUFFER_ROWS):
+        self.output_json = output_json
+        self.year = year
+        self.buffer_rows = buffer_rows
+        self.count = 0
+        self._buffer: list[Dict[str, Any]] = []
+        self._runs: list = []
+
+    def write(self, entry: Dict[str, Any]):
+        self._buffer.append(entry)
+        self.count += 1
+        if len(self._buffer) >= self.buffer_rows:
+            self._spill()
+
+    def _spill(self):
+        self._buffer.sort(key=_sort_key)
+        run = tempfile.TemporaryFile("w+b")
+        for i in range(0, len(self._buffer), RUN_BATCH_ROWS):
+            pickle.dump(self._buffer[i:i + RUN_BATCH_ROWS], run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        self._runs.append(run)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(run) -> Iterator[Dict[str, Any]]:
+        while True:
+            try:
+                yield from pickle.load(run)
+            except EOFError:
+                return
+
+    def _sorted(self) -> Iterator[Dict[str, Any]]:
+        self._buffer.sort(key=_sort_key)
+        runs = [self._read_run(run) for run in self._runs]
+        return heapq.merge(*runs, self._buffer, key=_sort_key)
+
+    def close(self) -> Path:
+        # Un seul passage sur le flux trié, dupliqué vers les deux sorties
+        json_sink = _JsonArrayWriter(self.output_json)
+        published = False
+        try:
+            partition = write_partition(
+                (json_sink.write(entry) for entry in self._sorted()),
+                self.year,
+                presorted=True
+            )
+            published = True
+        finally:
+            # En cas d'échec, l'ancien JSON reste en place
+            json_sink.close(publish=published)
+            for run in self._runs:
+                run.close()
+        return partition
+
+
+def _sort_key(entry: Dict[str, Any]):
+    return entry["code"]
+
+
+class _JsonArrayWriter:
+    """
+    Équivalent incrémental de json.dump(items, f, ensure_ascii=False,
+    indent=2), écrit dans un fichier temporaire publié par os.replace à
+    la fermeture : un lecteur ne voit jamais de tableau tronqué.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self._file = open(self._tmp, "w", encoding="utf-8")
+        self._count = 0
+
+    def write(self, item):
+        text = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._file.write(("[\n  " if not self._count else ",\n  ") + text)
+        self._count += 1
+        return item
+
+    def close(self, publish: bool = True):
+        self._file.write("\n]" if self._count else "[]")
+        self._file.close()
+        if publish:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink(missing_ok=True)
 
-    with open(RAG_TEXT_FILE, "w", encoding="utf-8") as f:
-        f.write("\n".join(rag_blocks))
 
-    print(f"✅ DONE — {len(processed)} entrées traitées correctement")
+# ---------------------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------------------
+def main(year: int = YEAR, input_file: Optional[Path] = None):
+    """
+    Lecture → dédoublonnage → transform_entry → (table traitée, corpus
+    RAG). Chaque entrée traverse le pipeline une à une : la mémoire ne
+    dépend pas de la taille de l'entrée (hors clés de dédoublonnage et
+    tampon de tri).
+    """
+    output_json = processed_scores_path(year)
+
+    table = ProcessedTableWriter(output_json, year)
+    corpus = CorpusWriter(corpus_path(year))
+    published = False
+    try:
+        for t in transform(dedupe(read_entries(input_file or input_path(year)))):
+            table.write(t)
+            corpus.write(t)
+
+        # Stockage colonnaire partitionné par année (historique des scores)
+        partition = table.close()
+        published = True
+    finally:
+        # Corpus publié après la table : en cas d'échec, l'ancien reste servi
+        corpus.close(publish=published)
+
+    print(f"✅ DONE — {table.count} entrées traitées correctement")
+    print(f"🗂️  Partition {year} : {partition}")
+    return table.count
+
+
+def main_years(years: list[int], workers: Optional[int] = None) -> Dict[int, int]:
+    """Plusieurs guides annuels en parallèle, un processus par année"""
+    if len(years) == 1:
+        return {years[0]: main(years[0])}
+
+    with ProcessPoolExecutor(max_workers=workers or min(len(years), os.cpu_count() or 1)) as pool:
+        return dict(zip(years, pool.map(main, years)))
 
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Transformation des scores extraits (table traitée + corpus RAG)")
+    parser.add_argument("years", type=int, nargs="*", default=[YEAR])
+    parser.add_argument("--input", type=Path, default=None, help="entrée JSON/JSONL (une seule année)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.input:
+        main(args.years[0], args.input)
+    else:
+        main_years(args.years, args.workers)
@@ -1,11 +1,124 @@
-from .pipelines.rag.pipeline_rag import rag_pipeline
+import hashlib
+
+from .pipelines.rag.pipeline_rag import (
+    rag_pipeline,
+    rag_pipeline_async,
+    rag_pipeline_stream,
+    remember,
+    answer_cache,
+    context_packer,
+    block_compressor,
+    structured_engine
+)
+from .pipelines.rag import rag_index
+from .pipelines.rag.encoder import get_encoder
+from .pipelines.rag.llm_answer import llm_client
+from .pipelines.rag.llm_providers import get_provider, provider_info
+from .pipelines.rag.question_parser import normalize_question
+from .pipelines.rag.single_flight import SingleFlight
+from .pipelines.rag.conversation_memory import ConversationMemory
+from .pipelines.rag.config import SINGLE_FLIGHT, FOLLOWUP_MAX_WORDS
+
+# Questions identiques (normalisées) en cours : un seul calcul partagé
+single_flight = SingleFlight()
+
+
+def _flight_key(question: str, memory: ConversationMemory | None) -> str:
+    # Une relance est identifiée par la question autonome reconstituée.
+    # Le prompt contient aussi l'historique et la question telle quelle :
+    # deux conversations ne partagent une réponse que si les deux sont
+    # identiques
+    if not memory:
+        return normalize_question(question)
+    standalone = memory.standalone_query(question, FOLLOWUP_MAX_WORDS)
+    prompt = hashlib.sha1(
+        f"{memory.render()}\n{normalize_question(question)}".encode("utf-8")
+    ).hexdigest()
+    return f"{normalize_question(standalone)}#{prompt}"
 
 
 class RagService:
 
     @staticmethod
-    def ask(question: str) -> str:
+    def ask(question: str, memory: ConversationMemory | None = None) -> str:
         """
         Appelle le cœur RAG sans exposer sa complexité
         """
-        return rag_pipeline(question)
+        if not SINGLE_FLIGHT:
+            return rag_pipeline(question, memory)
+        return single_flight.do(
+            _flight_key(question, memory), rag_pipeline, question, memory
+        )
+
+    @staticmethod
+    async def ask_async(question: str, memory: ConversationMemory | None = None) -> str:
+        """
+        Version asynchrone : n'occupe pas de thread pendant l'appel LLM
+        """
+        if not SINGLE_FLIGHT:
+            return await rag_pipeline_async(question, memory)
+        return await single_flight.do_async(
+            _flight_key(question, memory), rag_pipeline_async, question, memory
+        )
+
+    @staticmethod
+    def ask_stream(question: str, memory: ConversationMemory | None = None):
+        """
+        Même chose, en émettant la réponse morceau par morceau
+        (générateur asynchrone)
+        """
+        return rag_pipeline_stream(question, memory)
+
+    @staticmethod
+    def remember(
+        memory: ConversationMemory,
+        question: str,
+        answer: str
+    ) -> ConversationMemory:
+        """
+        Mémoire de conversation mise à jour après un échange
+        """
+        return remember(memory, question, answer)
+
+    @staticmethod
+    def warmup():
+        """
+        Charge les ressources RAG (index FAISS...) avant la première requête
+        """
+        rag_index.warmup()
+        structured_engine.load()
+
+        try:
+            get_provider()
+        except RuntimeError as e:
+            print(f"⚠️ LLM indisponible : {e}")
+
+    @staticmethod
+    def shutdown():
+        """
+        Écrit sur disque ce qui est encore en mémoire (cache de réponses)
+        et libère l'index résident
+        """
+        answer_cache.flush()
+        rag_index.index_manager.close()
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Statistiques exposées au monitoring
+        """
+        return {
+            "index": rag_index.index_manager.info(),
+            "facets": rag_index.index_manager.derived("facets").stats(),
+            "lexical": rag_index.index_manager.derived("lexical").stats(),
+            "retrieval": dict(rag_index.retrieval_stats),
+            "encoder": get_encoder().info(),
+            "query_batcher": rag_index.query_batcher.stats(),
+            "query_cache": rag_index.query_cache.stats(),
+            "answer_cache": answer_cache.stats(),
+            "structured": structured_engine.stats(),
+            "compression": block_compressor.stats(),
+            "context": context_packer.stats(),
+            "single_flight": single_flight.stats(),
+            "llm": {**provider_info(), **llm_client.stats()}
+        }
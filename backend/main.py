@@ -4,15 +4,22 @@ from contextlib import asynccontextmanager
 
 from app.api.v1.routes import auth, chat
 from app.api.v1.routes import users
+from app.api.v1.routes import metrics
+from app.api.v1.routes import orientation
 from app.db.mongo import get_db
 from app.services.auth_service import create_admin_if_not_exists
+from app.services.rag_service import RagService
+from app.services.orientation_service import OrientationService
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     db = get_db()
     create_admin_if_not_exists(db)
+    RagService.warmup()
+    OrientationService.warmup()
     yield
+    RagService.shutdown()
 
 
 
@@ -37,6 +44,8 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(orientation.router, prefix="/api")
 
 # Root
 @app.get("/")
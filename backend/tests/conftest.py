@@ -0,0 +1,51 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from app.services.pipelines.rag import config
+from app.services.pipelines.rag import encoder as encoder_module
+
+DIMENSION = 384
+
+
+class HashingModel:
+    """
+    Modèle d'embedding déterministe pour les tests : un vecteur par texte,
+    tiré d'un générateur initialisé par le hash du texte (pas de
+    téléchargement de modèle, même texte -> même vecteur)
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.encoded = 0
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def parameters(self):
+        return []
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        self.calls += 1
+        self.encoded += len(texts)
+
+        vectors = np.zeros((len(texts), DIMENSION), dtype="float32")
+        for i, text in enumerate(texts):
+            seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+            vectors[i] = np.random.default_rng(seed).standard_normal(DIMENSION)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def hashing_model(monkeypatch):
+    """Encodeur partagé branché sur HashingModel le temps du test"""
+    model = HashingModel()
+    encoder = encoder_module.Encoder(config.EMBEDDING_MODEL)
+    encoder._model = model
+    monkeypatch.setitem(encoder_module._encoders, config.EMBEDDING_MODEL, encoder)
+    return model
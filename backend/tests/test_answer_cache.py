@@ -0,0 +1,82 @@
+import numpy as np
+
+from app.services.pipelines.rag.answer_cache import SemanticAnswerCache
+from app.services.pipelines.rag.intent import detect_intent
+from app.services.pipelines.rag.pipeline_rag import answer_scope
+
+
+def _vector(seed: int, dim: int = 8) -> np.ndarray:
+    v = np.random.default_rng(seed).standard_normal(dim).astype("float32")
+    return v / np.linalg.norm(v)
+
+
+def _cache(tmp_path, **kwargs) -> SemanticAnswerCache:
+    options = {"threshold": 0.95, "ttl_seconds": 3600, "max_entries": 100,
+               "flush_seconds": None}
+    options.update(kwargs)
+    return SemanticAnswerCache(tmp_path / "answer_cache", **options)
+
+
+def test_hit_requires_same_version_and_scope(tmp_path):
+    cache = _cache(tmp_path)
+    v = _vector(0)
+    cache.store("q", v, "answer", 1.5, "v1", scope="علوم تجريبية|2024")
+
+    assert cache.lookup(v, "v1", scope="علوم تجريبية|2024") == "answer"
+    assert cache.lookup(v, "v1", scope="آداب|2024") is None
+    assert cache.lookup(v, "v1", scope="") is None
+    assert cache.stats()["hits"] == 1
+
+    # Nouvelle version de l'index : l'entrée est évincée
+    assert cache.lookup(v, "v2", scope="علوم تجريبية|2024") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_store_does_not_write_until_flush(tmp_path):
+    cache = _cache(tmp_path)
+    v = _vector(1)
+    cache.store("q", v, "answer", 1.0, "v1")
+
+    assert not cache.entries_path.exists()
+    assert cache.stats()["dirty"]
+
+    cache.flush()
+    assert cache.entries_path.exists() and cache.vectors_path.exists()
+    assert cache.stats()["flushes"] == 1
+
+    # Rien n'a changé : pas de nouvelle écriture
+    cache.flush()
+    assert cache.stats()["flushes"] == 1
+
+    reloaded = _cache(tmp_path)
+    assert reloaded.lookup(v, "v1") == "answer"
+
+
+def test_background_flush(tmp_path):
+    cache = _cache(tmp_path, flush_seconds=0.01)
+    cache.store("q", _vector(2), "answer", 1.0, "v1")
+
+    cache._timer.join(timeout=5)
+    assert cache.entries_path.exists()
+    assert cache.stats()["flushes"] == 1
+
+
+def test_scope_separates_sections_codes_and_years():
+    def scope(question):
+        return answer_scope(question, detect_intent(question))
+
+    base = scope("ما هو معدل القبول في الطب لشعبة علوم تجريبية سنة 2024")
+    assert base == scope("ما هو معدل القبول في الطب لشعبة علوم تجريبية سنة 2024")
+    assert base != scope("ما هو معدل القبول في الطب لشعبة رياضيات سنة 2024")
+    assert base != scope("ما هو معدل القبول في الطب لشعبة علوم تجريبية سنة 2023")
+    assert scope("ما هو معدل الرمز 10101") != scope("ما هو معدل الرمز 10102")
+
+
+def test_scope_separates_specialities():
+    def scope(question):
+        return answer_scope(question, detect_intent(question))
+
+    medicine = scope("معدل القبول في الطب لشعبة رياضيات")
+    assert medicine != scope("معدل القبول في الصيدلة لشعبة رياضيات")
+    # Reformulation : même spécialité, même portée
+    assert medicine == scope("كم معدل الطب شعبة رياضيات")
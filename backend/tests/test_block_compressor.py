@@ -0,0 +1,88 @@
+from app.services.pipelines.rag.block_compressor import (
+    COMMON_HEADER,
+    BlockCompressor,
+    parse_block,
+)
+from app.services.pipelines.rag.intent import Intent
+from app.services.pipelines.rag.rag_block import build_rag_block
+
+
+def _block(section, min_score, speciality="الإعلامية", university="جامعة صفاقس"):
+    return build_rag_block({
+        "diploma": "الإجازة",
+        "speciality": speciality,
+        "university": "كلية العلوم",
+        "parent_university": university,
+        "bac_section": section,
+        "duration": "3 سنوات",
+        "min_score": min_score,
+        "formula": "FG+(M+Info)/2",
+        "requirements": None,
+    }).split("###", 1)[1].strip()
+
+
+def _intent(topic):
+    return Intent(topic, False, [], set(), set(), [])
+
+
+RULE = "قواعد التوجيه : يتم احتساب مجموع النقاط"
+
+
+def test_parse_block():
+    fields = parse_block(_block("رياضيات", 150.2))
+    assert fields["شعبة الباكالوريا"] == "رياضيات"
+    assert fields["شروط إضافية"] == "لا يوجد"
+    assert parse_block(RULE) is None
+
+
+def test_groups_sections_and_factors_common_values():
+    chunks = [
+        (_block("رياضيات", 150.2), 0.9),
+        (_block("علوم تجريبية", 140.1), 0.8),
+        (RULE, 0.5),
+    ]
+    compressed = BlockCompressor().compress(chunks, _intent("score"))
+
+    header, group, rule = compressed
+    assert header[0].startswith(COMMON_HEADER)
+    assert "الاختصاص: الإعلامية" in header[0]
+    # Une ligne par شعبة, dans l'ordre des scores
+    assert group[0].splitlines() == [
+        "- شعبة الباكالوريا: رياضيات | معدل القبول الأدنى: 150.2",
+        "- شعبة الباكالوريا: علوم تجريبية | معدل القبول الأدنى: 140.1",
+    ]
+    assert group[1] == 0.9
+    assert rule == (RULE, 0.5)
+
+
+def test_keeps_only_topic_fields_and_drops_empty_values():
+    (text, _), = BlockCompressor().compress([(_block("رياضيات", 150.2), 1.0)], _intent("duration"))
+    assert "المدة: 3 سنوات" in text
+    assert "معدل القبول" not in text
+    assert "صيغة الاحتساب" not in text
+
+    (text, _), = BlockCompressor().compress([(_block("رياضيات", 150.2), 1.0)], _intent("general"))
+    assert "صيغة الاحتساب" in text
+    assert "شروط إضافية" not in text  # "لا يوجد"
+
+
+def test_distinct_programs_stay_separate():
+    chunks = [
+        (_block("رياضيات", 150.2), 0.9),
+        (_block("رياضيات", 120.0, speciality="الرياضيات", university="جامعة تونس"), 0.7),
+    ]
+    compressed = BlockCompressor().compress(chunks, _intent("score"))
+    texts = [text for text, _ in compressed]
+    assert texts[0].startswith(COMMON_HEADER)
+    assert "الاختصاص: الإعلامية" in texts[1] and "الاختصاص: الرياضيات" in texts[2]
+
+
+def test_free_blocks_only_pass_through_and_stats():
+    compressor = BlockCompressor()
+    assert compressor.compress([(RULE, 0.3)], _intent("score")) == [(RULE, 0.3)]
+
+    compressor.compress([(_block("رياضيات", 150.2), 1.0)] * 3, _intent("score"))
+    stats = compressor.stats()
+    assert stats["calls"] == 2
+    assert stats["blocks_in"] == 4
+    assert stats["chars_out"] < stats["chars_in"]
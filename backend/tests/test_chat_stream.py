@@ -0,0 +1,220 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes import chat
+from app.dependencies.database import database
+from app.services.pipelines.rag import llm_providers, pipeline_rag
+from app.services.pipelines.rag.llm_providers import LocalProvider
+from app.services.user_service import get_current_user
+
+
+class FakeCollection:
+    """Sous-ensemble de pymongo utilisé par ConversationService"""
+
+    def __init__(self):
+        self.docs = []
+
+    def insert_one(self, doc):
+        doc = {"_id": ObjectId(), **doc}
+        self.docs.append(doc)
+        return type("InsertOneResult", (), {"inserted_id": doc["_id"]})()
+
+    def find_one(self, query):
+        return next(
+            (d for d in self.docs if all(d.get(k) == v for k, v in query.items())),
+            None
+        )
+
+    def update_one(self, query, update):
+        doc = self.find_one(query)
+        if doc is not None:
+            doc.update(update["$set"])
+
+
+class FakeDb:
+    def __init__(self):
+        self.conversations = FakeCollection()
+        self.messages = FakeCollection()
+
+
+class CountingProvider(LocalProvider):
+    """LocalProvider aux tokens prévisibles : "tok0 ", "tok1 "..."""
+
+    def _tokens(self, prompt):
+        return [f"tok{i} " for i in range(self.output_tokens)]
+
+
+class StubTurn:
+    """Tour sans index : contexte fixe, la réponse va au LLM"""
+
+    def __init__(self, question, memory=None):
+        self.question = question
+        self.context = "السياق"
+        self.history = ""
+        self.answer = None
+
+    def store(self, answer, llm_seconds):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeDb()
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    app.dependency_overrides[database] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+
+    monkeypatch.setattr(pipeline_rag, "_Turn", StubTurn)
+    monkeypatch.setattr(llm_providers, "_provider", None)
+
+    with TestClient(app) as client:
+        client.db = db
+        yield client
+
+
+def _events(lines):
+    """(événement, données) de chaque message SSE"""
+    event = None
+    for line in lines:
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+
+def _assistant_messages(db):
+    return [m["content"] for m in db.messages.docs if m["role"] == "assistant"]
+
+
+def test_stream_frames_tokens_and_done(client):
+    llm_providers.set_provider(CountingProvider(0, 0, output_tokens=5))
+
+    response = client.post("/api/chat/ask/stream", data={"question": "ما هي شروط القبول"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    # Chaque message : "event: ...\ndata: ...\n\n"
+    assert response.text.endswith("event: done\ndata: {}\n\n")
+
+    events = list(_events(response.text.splitlines()))
+    assert events[0][0] == "meta"
+    conversation_id = events[0][1]["conversation_id"]
+    assert events[0][1]["conversation_title"]
+    assert [data["text"] for name, data in events if name == "token"] == [
+        f"tok{i} " for i in range(5)
+    ]
+    assert events[-1] == ("done", {})
+
+    assert _assistant_messages(client.db) == ["tok0 tok1 tok2 tok3 tok4"]
+    assert client.db.messages.docs[-1]["conversation_id"] == conversation_id
+
+
+def _post_form(path: str, form: dict) -> tuple[dict, bytes]:
+    body = urlencode(form).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "headers": [
+            (b"content-type", b"application/x-www-form-urlencoded"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    return scope, body
+
+
+def test_disconnect_saves_partial_answer(client):
+    """
+    Le client se déconnecte après 3 tokens : la réponse partielle est
+    enregistrée. (TestClient attend la fin de la réponse avant de rendre
+    la main : on pilote l'application ASGI directement.)
+    """
+    llm_providers.set_provider(CountingProvider(0, 0.05, output_tokens=200))
+    scope, body = _post_form("/api/chat/ask/stream", {"question": "ما هي شروط القبول"})
+
+    async def run():
+        disconnected = asyncio.Event()
+        request_sent = False
+        tokens = []
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                tokens.extend(
+                    data["text"]
+                    for name, data in _events(message["body"].decode().splitlines())
+                    if name == "token"
+                )
+                if len(tokens) >= 3:
+                    disconnected.set()
+
+        await asyncio.wait_for(client.app(scope, receive, send), timeout=10)
+        return tokens
+
+    assert asyncio.run(run()) == ["tok0 ", "tok1 ", "tok2 "]
+    assert _assistant_messages(client.db) == ["tok0 tok1 tok2"]
+
+
+def test_first_token_arrives_before_answer_is_complete(client):
+    """
+    20 tokens espacés de 50 ms (~1 s de génération) : le premier
+    événement token doit partir dès le premier token, pas à la fin
+    """
+    llm_providers.set_provider(CountingProvider(0, 0.05, output_tokens=20))
+    scope, body = _post_form("/api/chat/ask/stream", {"question": "ما هي شروط القبول"})
+
+    async def run():
+        request_sent = False
+        arrivals = []
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                now = time.perf_counter()
+                arrivals.extend(
+                    (now, data["text"])
+                    for name, data in _events(message["body"].decode().splitlines())
+                    if name == "token"
+                )
+
+        start = time.perf_counter()
+        await asyncio.wait_for(client.app(scope, receive, send), timeout=10)
+        return start, time.perf_counter(), arrivals
+
+    start, end, arrivals = asyncio.run(run())
+
+    assert [text for _, text in arrivals] == [f"tok{i} " for i in range(20)]
+    first_token = arrivals[0][0] - start
+    assert end - start >= 0.9
+    assert first_token < 0.3
+    assert first_token < (end - start) / 4
+    assert _assistant_messages(client.db) == ["".join(f"tok{i} " for i in range(20)).strip()]
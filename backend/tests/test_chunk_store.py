@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from app.services.pipelines.rag.chunk_store import ChunkStore
+
+CHUNKS = ["الرمز: 10101", "", "formation 2 — إجازة", "x" * 1000]
+
+
+def _open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_roundtrip(tmp_path):
+    ChunkStore.write(tmp_path / "chunks", CHUNKS)
+
+    with ChunkStore(tmp_path / "chunks") as store:
+        assert len(store) == len(CHUNKS)
+        assert list(store) == CHUNKS
+        assert store[-1] == CHUNKS[-1]
+        assert store.nbytes() == sum(len(c.encode("utf-8")) for c in CHUNKS)
+
+
+def test_empty_store(tmp_path):
+    ChunkStore.write(tmp_path / "chunks", [])
+    with ChunkStore(tmp_path / "chunks") as store:
+        assert len(store) == 0
+
+
+def test_reader_keeps_its_version_across_rewrite(tmp_path):
+    ChunkStore.write(tmp_path / "chunks", CHUNKS)
+    old = ChunkStore(tmp_path / "chunks")
+
+    ChunkStore.write(tmp_path / "chunks", ["nouveau"] * 10)
+
+    assert list(old) == CHUNKS
+    with ChunkStore(tmp_path / "chunks") as new:
+        assert list(new) == ["nouveau"] * 10
+    old.close()
+
+
+def test_close_releases_file(tmp_path):
+    ChunkStore.write(tmp_path / "chunks", CHUNKS)
+    before = _open_fds()
+
+    store = ChunkStore(tmp_path / "chunks")
+    assert _open_fds() > before
+    store.close()
+    store.close()
+    assert _open_fds() == before
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    ChunkStore.write(tmp_path / "chunks", CHUNKS)
+    (path,) = ChunkStore.paths(tmp_path / "chunks")
+    path.write_bytes(path.read_bytes()[:-10])
+
+    before = _open_fds()
+    with pytest.raises(ValueError):
+        ChunkStore(tmp_path / "chunks")
+    assert _open_fds() == before
@@ -0,0 +1,62 @@
+from app.services.pipelines.rag.context_packer import ContextPacker
+
+
+def _packer(budget=100, min_truncate_tokens=10) -> ContextPacker:
+    # 1 caractère = 1 token : les coûts se lisent directement
+    return ContextPacker(budget, chars_per_token=1, min_truncate_tokens=min_truncate_tokens)
+
+
+def _block(name: str, lines: int = 2, width: int = 9) -> str:
+    return "\n".join(f"{name}{i}".ljust(width, ".") for i in range(lines))
+
+
+def test_orders_by_score():
+    packed = _packer().pack([(_block("a"), 0.1), (_block("b"), 0.9), (_block("c"), 0.5)])
+    assert packed.text.split("\n\n") == [_block("b"), _block("c"), _block("a")]
+    assert packed.blocks == 3 and packed.dropped == 0
+
+
+def test_drops_duplicates_and_contained_blocks():
+    full = _block("a", lines=3)
+    part = _block("a", lines=2)
+    packed = _packer().pack([(full, 0.9), (full, 0.8), (part, 0.7), (_block("b"), 0.6)])
+    assert packed.duplicates == 2
+    assert packed.text == full + "\n\n" + _block("b")
+
+
+def test_duplicate_lines_compare_normalized():
+    packed = _packer().pack([("الإجازة في الإعلامية\nالمدة: 3", 0.9), ("الإجازة في  الإعلامية", 0.5)])
+    assert packed.duplicates == 1
+
+
+def test_truncates_first_overflowing_block_then_stops():
+    # 19 tokens par bloc de 2 lignes, 39 pour 4 lignes, séparateur 2
+    packed = _packer(budget=50).pack([
+        (_block("a"), 0.9),
+        (_block("b", lines=4), 0.8),
+        (_block("c"), 0.7),
+    ])
+    assert packed.truncated
+    assert packed.blocks == 2 and packed.dropped == 1
+    assert packed.text == _block("a") + "\n\n" + _block("b", lines=2)
+    assert packed.tokens <= 50
+    assert packed.raw_tokens == 19 + 39 + 19 + 2 * 2
+
+
+def test_no_truncation_below_minimum():
+    packed = _packer(budget=30, min_truncate_tokens=20).pack([
+        (_block("a"), 0.9),
+        (_block("b", lines=4), 0.8),
+    ])
+    assert not packed.truncated
+    assert packed.text == _block("a")
+    assert packed.dropped == 1
+
+
+def test_stats_accumulate():
+    packer = _packer(budget=20)
+    packer.pack([(_block("a"), 0.9), (_block("a"), 0.5), (_block("b"), 0.1)])
+    stats = packer.stats()
+    assert stats["requests"] == 1
+    assert stats["duplicates"] == 1
+    assert stats["dropped"] == 1
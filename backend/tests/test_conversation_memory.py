@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.pipelines.rag.conversation_memory import ConversationMemory, is_followup
+
+LONG = "الجامعات التي تقدم هذا التكوين في الشمال التونسي حسب آخر دليل للتوجيه الجامعي"
+
+
+@pytest.mark.parametrize("question", [
+    "وماذا عن جامعة صفاقس",
+    "و في جامعة صفاقس",
+    "وفي جامعة صفاقس؟",
+    "ماذا عن شعبة آداب",
+    "نفس السؤال لشعبة رياضيات",
+    "وهذه الشعبة",
+])
+def test_followups(question):
+    assert is_followup(question)
+
+
+@pytest.mark.parametrize("question", [
+    "وزارة التعليم العالي ما هي مهامها",
+    "ولاية سوسة ما هي الجامعات الموجودة فيها",
+    "وصف الإجازة في الإعلامية",
+    "ماذا أدرس بمعدل 12",
+    "",
+])
+def test_not_followups(question):
+    assert not is_followup(question)
+
+
+def test_standalone_query():
+    memory = ConversationMemory(turns=[{"question": "معدل الطب", "answer": "..."}])
+
+    # Relance courte ou marquée : complétée par la question précédente
+    assert memory.standalone_query("وفي صفاقس؟", 4) == "معدل الطب وفي صفاقس؟"
+    assert memory.standalone_query(f"و في {LONG}", 4) == f"معدل الطب و في {LONG}"
+    # Question longue et autonome
+    assert memory.standalone_query(f"وزارة {LONG}", 4) == f"وزارة {LONG}"
+    assert ConversationMemory().standalone_query("وفي صفاقس؟", 4) == "وفي صفاقس؟"
+
+
+@pytest.mark.parametrize("question", [
+    "ما هي مدة الصيدلة",
+    "معدل القبول للرمز 20202",
+    "الإعلامية في جامعة قابس",
+    "شعبة آداب",
+])
+def test_short_complete_question_stands_alone(question):
+    memory = ConversationMemory(turns=[{"question": "معدل الطب لشعبة رياضيات", "answer": "..."}])
+    assert memory.standalone_query(question, 4) == question
+
+
+def test_short_question_without_own_subject_is_joined():
+    memory = ConversationMemory(turns=[{"question": "معدل الطب", "answer": "..."}])
+    assert memory.standalone_query("في صفاقس؟", 4) == "معدل الطب في صفاقس؟"
+    assert memory.standalone_query("والصيدلة؟", 4) == "معدل الطب والصيدلة؟"
@@ -0,0 +1,208 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes import orientation
+from app.services import orientation_service
+from app.services.pipelines.score.eligibility import EligibilityEngine, duration_years
+
+
+def _row(code, section, min_score, formula="FG+M", parent="جامعة صفاقس",
+         duration="3 سنوات", institution="كلية العلوم"):
+    return {
+        "code": code,
+        "diploma": "الإجازة",
+        "speciality": f"تكوين {code}",
+        "university": institution,
+        "parent_university": parent,
+        "bac_section": section,
+        "duration": duration,
+        "min_score": min_score,
+        "formula": formula,
+    }
+
+
+ROWS = [
+    _row("10001", "رياضيات", 120.0),
+    _row("10002", "رياضيات", 150.0, parent="جامعة تونس"),
+    _row("10003", "رياضيات", 140.0, duration="5 سنوات"),
+    _row("10004", "رياضيات", 160.0),
+    _row("10005", "رياضيات", 100.0, formula="FG+(A+Ang)/2"),
+    _row("10006", "رياضيات", 90.0, formula="FG+%"),
+    _row("20001", "آداب", 95.0, formula="FG+A"),
+    # Nom de جامعة coupé par l'extraction : "جامعة تونس" + "المنار ..."
+    _row("20002", "آداب", 110.0, formula="FG+A", parent="جامعة تونس",
+         institution="المنار كلية العلوم الإنسانية"),
+    _row("20003", "آداب", 105.0, formula="FG+A", parent="جامعة تونس",
+         institution="تونس المنار المعهد العالي للعلوم الإنسانية"),
+    # Ignorées au chargement : شعبة inconnue, pas de score
+    _row("30001", "شعبة غير موجودة", 100.0),
+    _row("30002", "رياضيات", None),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "processed_scores.json"
+    path.write_text(json.dumps(ROWS, ensure_ascii=False), encoding="utf-8")
+    return EligibilityEngine(path).load()
+
+
+def _codes(page):
+    return [row["code"] for row in page]
+
+
+def test_load_skips_rows_without_section_or_score(engine):
+    stats = engine.stats()
+    assert stats["rows"] == 9
+    assert stats["skipped"] == 2
+    assert stats["sections"] == {"رياضيات": 6, "آداب": 3}
+    assert stats["formula_failures"] == {"FG+%": 1}
+    assert engine.variables == {"FG", "M", "A", "Ang"}
+
+
+def test_eligible_orders_by_margin(engine):
+    total, page = engine.eligible("رياضيات", 150.0)
+
+    # min_score == score est accessible ; 160 ne l'est pas
+    assert total == 5
+    assert _codes(page) == ["10002", "10003", "10001", "10005", "10006"]
+    assert [row["margin"] for row in page] == [0.0, 10.0, 30.0, 50.0, 60.0]
+
+
+def test_eligible_below_every_min_score(engine):
+    assert engine.eligible("رياضيات", 80.0) == (0, [])
+
+
+def test_eligible_unknown_section(engine):
+    assert engine.eligible("علوم الإعلامية", 200.0) == (0, [])
+
+
+def test_eligible_filters(engine):
+    total, page = engine.eligible("رياضيات", 200.0, parent_university="جامعة تونس")
+    assert (total, _codes(page)) == (1, ["10002"])
+
+    total, page = engine.eligible("رياضيات", 200.0, duration=5)
+    assert (total, _codes(page)) == (1, ["10003"])
+
+    total, page = engine.eligible("رياضيات", 200.0, parent_university="جامعة صفاقس", duration=3)
+    assert _codes(page) == ["10004", "10001", "10005", "10006"]
+
+    # Université absente de la table : aucun résultat (pas de filtre ignoré)
+    assert engine.eligible("رياضيات", 200.0, parent_university="جامعة قابس") == (0, [])
+
+
+def test_eligible_split_university_name(engine):
+    total, page = engine.eligible("آداب", 200.0, parent_university="جامعة تونس المنار")
+    assert (total, _codes(page)) == (2, ["20002", "20003"])
+    assert {row["parent_university"] for row in page} == {"جامعة تونس المنار"}
+    assert engine.eligible("آداب", 200.0, parent_university="جامعة تونس") == (0, [])
+
+
+def test_eligible_pagination(engine):
+    total, first = engine.eligible("رياضيات", 200.0, offset=0, limit=2)
+    _, second = engine.eligible("رياضيات", 200.0, offset=2, limit=2)
+    _, last = engine.eligible("رياضيات", 200.0, offset=4, limit=2)
+
+    assert total == 6
+    assert _codes(first) == ["10004", "10002"]
+    assert _codes(second) == ["10003", "10001"]
+    assert _codes(last) == ["10005", "10006"]
+
+
+def test_simulate(engine):
+    grades = {"FG": 130.0, "M": 15.0, "A": 12.0, "Ang": 14.0}
+    admitted, unscored, page = engine.simulate("رياضيات", grades)
+
+    # FG+M = 145 : admis en 10003 (140) et 10001 (120), pas en 10002/10004
+    # FG+(A+Ang)/2 = 143 : admis en 10005 (100) ; FG+% illisible
+    assert (admitted, unscored) == (3, 1)
+    assert _codes(page) == ["10003", "10001", "10005"]
+    assert [(row["score"], row["margin"]) for row in page] == [
+        (145.0, 5.0), (145.0, 25.0), (143.0, 43.0),
+    ]
+
+
+def test_simulate_missing_grade_is_not_computable(engine):
+    admitted, unscored, page = engine.simulate("رياضيات", {"FG": 130.0, "M": 15.0})
+
+    # 10005 demande A et Ang, 10006 a une formule illisible
+    assert (admitted, unscored) == (2, 2)
+    assert _codes(page) == ["10003", "10001"]
+
+
+def test_simulate_filters_and_pagination(engine):
+    grades = {"FG": 200.0, "M": 0.0, "A": 0.0, "Ang": 0.0}
+    admitted, _, page = engine.simulate("رياضيات", grades, duration=3, offset=1, limit=2)
+    assert admitted == 4
+    assert _codes(page) == ["10002", "10001"]
+
+
+def test_duration_years():
+    assert duration_years("5 سنوات") == 5
+    assert duration_years(None) == 0
+
+
+# ---------------------------------------------------------------------
+# Routes /orientation
+# ---------------------------------------------------------------------
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(orientation_service, "eligibility_engine", engine)
+    app = FastAPI()
+    app.include_router(orientation.router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
+
+
+def test_eligible_route(client):
+    response = client.get("/api/orientation/eligible", params={
+        "bac_section": "رياضيات",
+        "score": 150,
+        "parent_university": "صفاقس",
+        "page_size": 2,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["page"], body["page_size"]) == (4, 1, 2)
+    assert _codes(body["items"]) == ["10003", "10001"]
+
+
+def test_eligible_route_split_university_name(client):
+    response = client.get("/api/orientation/eligible", params={
+        "bac_section": "آداب",
+        "score": 150,
+        "parent_university": "جامعة تونس المنار",
+    })
+    assert response.status_code == 200
+    assert _codes(response.json()["items"]) == ["20002", "20003"]
+
+
+def test_eligible_route_rejects_unknown_section(client):
+    response = client.get("/api/orientation/eligible", params={
+        "bac_section": "شعبة غير موجودة",
+        "score": 150,
+    })
+    assert response.status_code == 400
+
+
+def test_simulate_route(client):
+    response = client.post("/api/orientation/simulate", json={
+        "bac_section": "رياضيات",
+        "grades": {"FG": 130, "M": 15},
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["unscored"]) == (2, 2)
+    assert body["items"][0]["score"] == 145.0
+
+
+def test_simulate_route_rejects_unknown_subject(client):
+    response = client.post("/api/orientation/simulate", json={
+        "bac_section": "رياضيات",
+        "grades": {"FG": 130, "Phy": 15},
+    })
+    assert response.status_code == 400
+    assert "Phy" in response.json()["detail"]
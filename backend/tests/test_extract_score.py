@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from app.services.pipelines.score.bench_extract import diff_rows, run_backend
+from app.services.pipelines.score.extract_score import (
+    BACKENDS,
+    PageCache,
+    clean_and_reverse,
+    extract,
+    parse_table,
+    parse_tables,
+)
+
+pymupdf = pytest.importorskip("pymupdf")
+
+# Colonnes du guide : score, صيغة, شعبة, الرمز, التخصص, المؤسسة, الشهادة
+HEADER = ["score", "formula", "bac", "code", "speciality", "institution", "diploma"]
+ROWS = [
+    ["150,250", "FG+M", "Math", "10001", "Informatique", "ISI Tunis", "Licence"],
+    ["142,125", "FG+(M+SP)/2", "Math", "10002", "Physique", "FST", ""],
+    ["", "", "Sciences", "10003", "Biologie", "", ""],
+    ["-", "FG+SVT", "Sciences", "10004", "Chimie", "FSS", "Licence"],
+    ["120,5", "FG+SVT", "Sciences", "1234", "Geologie", "FSS", ""],
+]
+
+
+def test_clean_and_reverse():
+    assert clean_and_reverse("  FG+M ") == "FG+M"
+    assert clean_and_reverse("بادآ") == "آداب"
+    assert clean_and_reverse(None) == ""
+
+
+def test_parse_table_fills_merged_cells_and_skips_invalid_rows():
+    rows = parse_table([HEADER] + [list(row) for row in ROWS], page_num=41)
+
+    # 10004 n'a pas de score, 1234 n'est pas un code à 5 chiffres
+    assert [row["code"] for row in rows] == ["10001", "10002", "10003"]
+    assert [row["score"] for row in rows] == [150.25, 142.125, 142.125]
+    assert rows[2]["formula"] == "FG+(M+SP)/2"
+    assert rows[2]["university"] == "FST"
+    assert rows[2]["diploma"] == "Licence"
+    assert {row["page"] for row in rows} == {42}
+
+
+def test_parse_table_arabic_headers_and_period():
+    table = [
+        ["مجموع نقاط", "صيغة احتساب", "الشعبة", "الرمز", "", "", "الشهادة"],
+        ["101,5", "FG+A", "بادآ", "40001", "ةيبرعلا", "بادلآا ةيلك",
+         "ةيبرعلا ةغللا يف ةزاجلإا\nتاونس 3"],
+        None,
+    ]
+    (row,) = parse_table(table, page_num=0)
+    assert row["bac"] == "آداب"
+    assert row["speciality"] == "العربية"
+    assert row["periode"] == "3 سنوات"
+
+
+def test_parse_tables_ignores_small_tables():
+    tables = [[HEADER, ROWS[0]], [HEADER] + [list(row) for row in ROWS[:2]]]
+    assert [row["code"] for row in parse_tables(tables, 0)] == ["10001", "10002"]
+    assert parse_tables(None, 0) == []
+
+
+# ---------------------------------------------------------------------
+# Moteurs sur un PDF généré (tableau à bordures, comme le guide)
+# ---------------------------------------------------------------------
+def _draw_table(page, rows, x=(40, 110, 210, 270, 330, 420, 500, 580), top=40, height=30):
+    shape = page.new_shape()
+    for r in range(len(rows) + 1):
+        shape.draw_line((x[0], top + r * height), (x[-1], top + r * height))
+    for col in x:
+        shape.draw_line((col, top), (col, top + len(rows) * height))
+    shape.finish(color=(0, 0, 0), width=0.8)
+    shape.commit()
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if value:
+                page.insert_text((x[c] + 3, top + r * height + 18), value, fontsize=8)
+
+
+@pytest.fixture(scope="module")
+def pdf_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("pdf") / "guide.pdf"
+    doc = pymupdf.open()
+    doc.new_page(width=620, height=400).insert_text((40, 40), "intro")
+    _draw_table(doc.new_page(width=620, height=400), [HEADER] + ROWS)
+    _draw_table(doc.new_page(width=620, height=400), [HEADER] + [
+        ["99,000", "FG+A", "Lettres", "20001", "Anglais", "FLSH", "Licence"],
+        ["98,500", "FG+A", "Lettres", "20002", "Histoire", "FLSH", "Licence"],
+    ])
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_backend_tables(pdf_path, backend):
+    pdf = BACKENDS[backend](pdf_path)
+    try:
+        assert len(pdf) == 3
+        assert parse_tables(pdf.tables(0), 0) == []
+        rows = parse_tables(pdf.tables(1), 1)
+        # Clé stable pour une page inchangée
+        assert pdf.page_key(1) == pdf.page_key(1) != pdf.page_key(2)
+    finally:
+        pdf.close()
+
+    assert [(row["code"], row["score"], row["bac"], row["formula"]) for row in rows] == [
+        ("10001", 150.25, "Math", "FG+M"),
+        ("10002", 142.125, "Math", "FG+(M+SP)/2"),
+        ("10003", 142.125, "Sciences", "FG+(M+SP)/2"),
+    ]
+
+
+def test_backends_parity(pdf_path):
+    left, right = (run_backend(name, pdf_path, 1, None)[0] for name in BACKENDS)
+    assert len(left) == 5
+    assert diff_rows(left, right) == ([], [], [])
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_extract_uses_page_cache(pdf_path, tmp_path, backend):
+    output = tmp_path / "scores.json"
+    cache = PageCache(tmp_path / "cache")
+
+    rows = extract(pdf_path, output, first_page=2, workers=1, cache=cache, backend=backend)
+    assert [row["code"] for row in rows] == ["10001", "10002", "10003", "20001", "20002"]
+    assert json.loads(output.read_text(encoding="utf-8")) == rows
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    cache = PageCache(tmp_path / "cache")
+    assert extract(pdf_path, output, first_page=2, workers=1, cache=cache, backend=backend) == rows
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_extract_rejects_unknown_backend(pdf_path, tmp_path):
+    with pytest.raises(ValueError, match="Unknown backend"):
+        extract(pdf_path, tmp_path / "scores.json", backend="camelot")
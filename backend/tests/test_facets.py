@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.pipelines.rag.facets import detect_facets
+from app.services.pipelines.rag.intent import detect_intent
+
+
+@pytest.mark.parametrize("question", [
+    "ما هي الكليات التي تدرس هندسة إعلامية",
+    "تكوينات في التصرف",
+    "تقنية المعلومات والاتصال",
+])
+def test_generic_words_are_not_sections(question):
+    assert "bac_section" not in detect_facets(question)
+    assert not detect_intent(question).sections
+
+
+@pytest.mark.parametrize("question, section", [
+    ("هندسة إعلامية لشعبة علوم إعلامية", "علوم إعلامية"),
+    ("معدل الطب لشعبة علوم تجريبية؟", "علوم تجريبية"),
+    ("ماذا أدرس بباكالوريا تقنية", "علوم تقنية"),
+    ("ماذا يمكن لتلميذ اقتصاد وتصرف", "اقتصاد وتصرف"),
+])
+def test_section_with_context_or_full_name(question, section):
+    assert detect_facets(question)["bac_section"] == {section}
+    assert detect_intent(question).sections == {section}
+
+
+def test_university_and_duration():
+    facets = detect_facets("إجازة في 3 سنوات في جامعة تونس المنار")
+    assert facets["parent_university"] == {"جامعة تونس المنار"}
+    assert facets["duration"] == {"3 سنوات"}
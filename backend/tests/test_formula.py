@@ -0,0 +1,79 @@
+import re
+
+import numpy as np
+import pytest
+
+from app.services.pipelines.score.formula import FormulaCompiler, FormulaError, compile_formula
+
+GRADES = {"FG": 120.0, "M": 14.0, "SP": 12.0, "A": 10.0, "Ang": 16.0, "F": 13.0}
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("FG+(M+SP)/2", 133.0),
+    ("FG+M*2-SP", 136.0),
+    ("FG-M-SP", 94.0),
+    ("(FG+M)/2", 67.0),
+    ("-M+SP", -2.0),
+    ("FG+(A+Ang+2F)/4", 133.0),
+    ("FG+2(M+SP)", 172.0),
+    ("FG+0,5M", 127.0),
+    ("FG+Max((Ang-15),0)+Max((M-15),0)", 121.0),
+    ("FG+min(M,SP,A)", 130.0),
+])
+def test_evaluate(source, expected):
+    assert compile_formula(source).evaluate(GRADES) == pytest.approx(expected)
+
+
+def test_variables():
+    formula = compile_formula("FG+Max((Ang-15),0)+(A+2F)/3")
+    assert formula.variables == {"FG", "Ang", "A", "F"}
+
+
+def test_newlines_from_pdf_extraction():
+    formula = compile_formula("FG+(A+Ang+2F)/\n4")
+    assert formula.evaluate(GRADES) == pytest.approx(133.0)
+
+
+def test_missing_grade_gives_nan():
+    assert np.isnan(compile_formula("FG+(M+SP)/2").evaluate({"FG": 120.0, "M": 14.0}))
+
+
+def test_array_batch():
+    grades = {"FG": np.array([100.0, 150.0, 90.0]), "M": np.array([10.0, 20.0, 12.0])}
+    scores = compile_formula("FG+Max((M-12),0)").evaluate(grades)
+    np.testing.assert_allclose(scores, [100.0, 158.0, 90.0])
+
+
+def test_division_by_zero_does_not_raise():
+    assert np.isinf(compile_formula("FG/M").evaluate({"FG": np.float64(1.0), "M": np.float64(0.0)}))
+
+
+@pytest.mark.parametrize("source, message", [
+    ("", "empty formula"),
+    ("  \n ", "empty formula"),
+    ("FG+%", "unexpected character"),
+    ("FG+Sqrt(M)", "unknown function"),
+    ("FG+Max(M)", "at least 2 arguments"),
+    ("FG+(M+SP", "unexpected end"),
+    ("FG+M)", "unexpected ')'"),
+    ("FG+*M", "unexpected '*'"),
+])
+def test_errors(source, message):
+    with pytest.raises(FormulaError, match=re.escape(message)):
+        compile_formula(source)
+
+
+def test_compiler_caches_formulas_and_failures():
+    compiler = FormulaCompiler()
+
+    first = compiler.compile("FG+M")
+    assert compiler.compile("FG+M") is first
+
+    for _ in range(2):
+        with pytest.raises(FormulaError, match="unexpected character"):
+            compiler.compile("FG+%")
+
+    stats = compiler.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["compiled"] == 1
+    assert compiler.failures() == {"FG+%": "unexpected character '%' at 3"}
@@ -0,0 +1,132 @@
+import json
+
+import faiss
+import numpy as np
+import pytest
+
+from app.services.pipelines.rag import rag_index
+from app.services.pipelines.rag.index_manager import IndexManager
+from app.services.pipelines.rag.lexical_index import (
+    LexicalIndex,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from app.services.pipelines.rag.rag_block import build_rag_block
+
+
+def _entry(code, speciality, section="رياضيات", university="جامعة تونس"):
+    return {
+        "code": code,
+        "diploma": "الإجازة",
+        "speciality": speciality,
+        "university": "كلية العلوم",
+        "parent_university": university,
+        "bac_section": section,
+        "duration": "3 سنوات",
+        "min_score": 120.5,
+        "formula": "FG+(M+SP)/2",
+        "requirements": None,
+    }
+
+
+ENTRIES = [
+    _entry("10101", "الهندسة المدنية"),
+    _entry("10102", "الفيزياء"),
+    _entry("10103", "الإعلامية", section="علوم إعلامية"),
+    _entry("10104", "الكيمياء", university="جامعة صفاقس"),
+]
+RULES = ["قواعد التوجيه الجامعي : يتم احتساب مجموع النقاط حسب الصيغة"]
+CORPUS = [build_rag_block(e).split("###", 1)[1].strip() for e in ENTRIES] + RULES
+
+
+@pytest.fixture
+def scores_path(tmp_path):
+    path = tmp_path / "processed_scores.json"
+    path.write_text(json.dumps(ENTRIES, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def _lexical(scores_path=None):
+    return LexicalIndex.from_corpus(CORPUS, scores_path, k1=1.5, b=0.75)
+
+
+def test_tokenize_strips_article_and_stop_words():
+    assert tokenize("ما هي الإعلامية في جامعة") == ["اعلاميه", "جامعه"]
+
+
+def test_bm25_ranks_matching_chunk_first():
+    results = _lexical().search("الكيمياء", top_k=3)
+    assert results[0][0] == 3
+    assert all(score > 0 for _, score in results)
+
+
+def test_bm25_respects_candidate_mask():
+    mask = np.zeros(len(CORPUS), dtype=bool)
+    mask[[0, 1]] = True
+    results = _lexical().search("الكيمياء الفيزياء", top_k=5, candidates=mask)
+    assert [i for i, _ in results] == [1]
+
+
+def test_codes_map_to_chunks(scores_path):
+    lexical = _lexical(scores_path)
+    assert lexical.lookup_codes(["10103"]) == [2]
+    assert lexical.lookup_codes(["99999"]) == []
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+    assert [i for i, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+@pytest.fixture
+def manager(monkeypatch, hashing_model, scores_path):
+    vectors = hashing_model.encode(CORPUS, normalize_embeddings=True)
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+
+    manager = IndexManager(lambda: (index, list(CORPUS)), [scores_path])
+    manager.register(
+        "lexical",
+        lambda index, corpus: LexicalIndex.from_corpus(corpus, scores_path, k1=1.5, b=0.75)
+    )
+    manager.register("facets", rag_index.FacetIndex.from_corpus)
+    monkeypatch.setattr(rag_index, "index_manager", manager)
+    monkeypatch.setattr(rag_index, "QUERY_BATCHING", False)
+    monkeypatch.setattr(rag_index, "retrieval_stats", dict.fromkeys(rag_index.retrieval_stats, 0))
+    rag_index.query_cache.clear()
+    hashing_model.encoded = 0
+    return manager
+
+
+def test_exact_code_skips_embedding(manager, hashing_model):
+    results = rag_index.retrieve("ما هو معدل القبول للرمز 10102", top_k=3)
+    assert results == [(1, 1.0)]
+    assert hashing_model.encoded == 0
+    assert rag_index.retrieval_stats["code_lookups"] == 1
+
+
+def test_hybrid_fuses_dense_and_sparse(manager):
+    results = rag_index.retrieve(CORPUS[3], top_k=2, use_facets=False)
+    assert results[0][0] == 3
+    assert rag_index.retrieval_stats["hybrid"] == 1
+
+
+def test_vector_only_without_lexical_match(manager):
+    results = rag_index.retrieve("xyz", top_k=2, use_facets=False)
+    assert len(results) == 2
+    assert rag_index.retrieval_stats["vector_only"] == 1
+
+
+def test_query_vector_does_not_depend_on_request_order(monkeypatch, hashing_model):
+    monkeypatch.setattr(rag_index, "QUERY_BATCHING", False)
+    variants = ["ما هو معدل الطب؟", "  ما هو  مَعدل الطب؟ ", "ما هو معدل الطـب؟"]
+
+    vectors = []
+    for order in (variants, variants[::-1]):
+        rag_index.query_cache.clear()
+        vectors.append([rag_index.encode_query(q) for q in order])
+
+    expected = hashing_model.encode([rag_index.normalize_question(variants[0])], normalize_embeddings=True)
+    for vector in vectors[0] + vectors[1]:
+        np.testing.assert_array_equal(vector, expected)
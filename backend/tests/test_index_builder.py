@@ -0,0 +1,187 @@
+import os
+import shutil
+
+import faiss
+import numpy as np
+import pytest
+
+from app.services.pipelines.rag import rag_index
+from app.services.pipelines.rag.index_builder import update_index
+from app.services.pipelines.rag.index_factory import index_type_of
+
+
+def _write_corpus(path, chunks):
+    path.write_text("\n###\n".join(chunks), encoding="utf-8")
+
+
+def _update(tmp_path, **kwargs):
+    return update_index(
+        [tmp_path / "corpus.txt"],
+        tmp_path / "faiss.index",
+        tmp_path / "chunks",
+        tmp_path / "chunk_cache.npz",
+        **kwargs
+    )
+
+
+def test_index_type_change_forces_rebuild(tmp_path, hashing_model):
+    chunks = [f"formation {i}" for i in range(50)]
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+
+    index, _ = _update(tmp_path, index_type="hnsw")
+    assert index_type_of(index) == "hnsw"
+
+    index, store = _update(tmp_path, index_type="flat")
+    assert index_type_of(index) == "flat"
+    assert index.ntotal == len(chunks)
+    # Reconstruction à partir du cache : aucun chunk ré-encodé
+    assert hashing_model.encoded == len(chunks)
+
+    query = hashing_model.encode([chunks[7]], normalize_embeddings=True)
+    _, ids = index.search(query, 1)
+    assert store[int(ids[0][0])] == chunks[7]
+
+
+def test_update_reencodes_only_changed_chunk(tmp_path, hashing_model):
+    chunks = [f"formation {i}" for i in range(20)]
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+
+    index, store = _update(tmp_path)
+    assert index.ntotal == 20
+    assert hashing_model.encoded == 20
+    ids_before = {store[i]: i for i in range(len(store)) if store[i]}
+
+    chunks[3] = "formation 3 modifiée"
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+    hashing_model.encoded = 0
+
+    index, store = _update(tmp_path)
+    assert hashing_model.encoded == 1
+    assert index.ntotal == 20
+
+    ids_after = {store[i]: i for i in range(len(store)) if store[i]}
+    # Les chunks inchangés gardent leur ID, le chunk modifié en reçoit un nouveau
+    for chunk in chunks:
+        if chunk != chunks[3]:
+            assert ids_after[chunk] == ids_before[chunk]
+    assert ids_after[chunks[3]] not in ids_before.values()
+    assert "formation 3" not in ids_after
+
+    # Chaque chunk se retrouve lui-même en premier
+    queries = hashing_model.encode(chunks, normalize_embeddings=True)
+    _, found = index.search(queries, 1)
+    assert [int(i) for i in found[:, 0]] == [ids_after[c] for c in chunks]
+
+
+def test_unchanged_corpus_encodes_nothing(tmp_path, hashing_model):
+    chunks = [f"formation {i}" for i in range(10)]
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+    _update(tmp_path)
+    hashing_model.encoded = 0
+
+    index, _ = _update(tmp_path)
+    assert hashing_model.encoded == 0
+    assert index.ntotal == 10
+
+
+def test_removed_chunks_leave_empty_slots(tmp_path, hashing_model):
+    chunks = [f"formation {i}" for i in range(10)]
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+    _update(tmp_path)
+
+    _write_corpus(tmp_path / "corpus.txt", chunks[:8])
+    index, store = _update(tmp_path)
+
+    assert index.ntotal == 8
+    assert sorted(c for c in (store[i] for i in range(len(store))) if c) == sorted(chunks[:8])
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Chemins de rag_index redirigés vers tmp_path"""
+    monkeypatch.setattr(rag_index, "INDEX_PATH", tmp_path / "faiss.index")
+    monkeypatch.setattr(rag_index, "STORE_PATH", tmp_path / "chunks")
+    monkeypatch.setattr(rag_index, "CHUNK_CACHE_PATH", tmp_path / "chunk_cache.npz")
+    monkeypatch.setattr(rag_index, "META_PATH", tmp_path / "faiss_meta.pkl")
+    monkeypatch.setattr(rag_index, "CORPUS_PATHS", [tmp_path / "corpus.txt"])
+    return tmp_path
+
+
+def test_startup_load_rebuilds_on_index_type_change(data_dir, hashing_model, monkeypatch):
+    chunks = [f"formation {i}" for i in range(50)]
+    _write_corpus(data_dir / "corpus.txt", chunks)
+
+    monkeypatch.setattr(rag_index, "INDEX_TYPE", "hnsw")
+    index, store = rag_index.get_faiss_index()
+    store.close()
+    assert index_type_of(index) == "hnsw"
+
+    # Index existant du bon type : chargé tel quel
+    index, store = rag_index.get_faiss_index()
+    store.close()
+    assert index_type_of(index) == "hnsw"
+
+    monkeypatch.setattr(rag_index, "INDEX_TYPE", "flat")
+    index, store = rag_index.get_faiss_index()
+    store.close()
+    assert index_type_of(index) == "flat"
+    assert hashing_model.encoded == len(chunks)
+
+    index, store = rag_index.get_faiss_index()
+    assert index_type_of(index) == "flat"
+    assert index.ntotal == len(chunks)
+    store.close()
+
+
+def test_interrupted_publish_rebuilds_instead_of_duplicating_ids(tmp_path, hashing_model):
+    chunks = [f"formation {i}" for i in range(20)]
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+    _update(tmp_path)
+    shutil.copy(tmp_path / "chunk_cache.npz", tmp_path / "old_cache.npz")
+
+    chunks[3] = "formation 3 modifiée"
+    _write_corpus(tmp_path / "corpus.txt", chunks)
+    _update(tmp_path)
+
+    # Arrêt avant la publication du cache : nouvel index, ancien cache
+    shutil.copy(tmp_path / "old_cache.npz", tmp_path / "chunk_cache.npz")
+    index, store = _update(tmp_path)
+
+    ids = faiss.vector_to_array(faiss.downcast_index(index).id_map)
+    assert index.ntotal == len(set(ids.tolist())) == 20
+    assert sorted(c for c in store if c) == sorted(chunks)
+
+
+def test_startup_load_updates_stale_corpus(data_dir, hashing_model):
+    chunks = [f"formation {i}" for i in range(10)]
+    _write_corpus(data_dir / "corpus.txt", chunks)
+    _, store = rag_index.get_faiss_index()
+    store.close()
+    hashing_model.encoded = 0
+
+    # Index à jour : chargé sans encoder
+    _, store = rag_index.get_faiss_index()
+    store.close()
+    assert hashing_model.encoded == 0
+
+    # Fichiers publiés avant la modification du corpus
+    earlier = (data_dir / "chunk_cache.npz").stat().st_mtime_ns - 10**10
+    for name in ("faiss.index", "chunks.chunks", "chunk_cache.npz"):
+        os.utime(data_dir / name, ns=(earlier, earlier))
+    _write_corpus(data_dir / "corpus.txt", chunks + ["formation ajoutée"])
+
+    index, store = rag_index.get_faiss_index()
+    assert hashing_model.encoded == 1
+    assert index.ntotal == 11
+    assert "formation ajoutée" in list(store)
+    store.close()
+
+    # Index publié sans son cache (arrêt entre les deux) : pas à jour
+    assert rag_index.index_is_current(
+        rag_index.CORPUS_PATHS, rag_index.INDEX_PATH, rag_index.STORE_PATH, rag_index.CHUNK_CACHE_PATH
+    )
+    later = (data_dir / "chunk_cache.npz").stat().st_mtime_ns + 10**9
+    os.utime(data_dir / "faiss.index", ns=(later, later))
+    assert not rag_index.index_is_current(
+        rag_index.CORPUS_PATHS, rag_index.INDEX_PATH, rag_index.STORE_PATH, rag_index.CHUNK_CACHE_PATH
+    )
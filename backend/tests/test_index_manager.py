@@ -0,0 +1,90 @@
+import threading
+
+from app.services.pipelines.rag.index_manager import IndexManager
+
+
+class FakeIndex:
+    def __init__(self, ntotal):
+        self.ntotal = ntotal
+
+
+def make_manager(tmp_path, corpus=("a", "b", "c")):
+    path = tmp_path / "faiss.index"
+    path.write_bytes(b"v1")
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return FakeIndex(len(corpus)), list(corpus)
+
+    return IndexManager(loader, [path]), calls, path
+
+
+def test_loads_once_and_serves_from_memory(tmp_path):
+    manager, calls, _ = make_manager(tmp_path)
+
+    first = manager.get()
+    for _ in range(5):
+        assert manager.get() is not None
+    assert manager.get()[0] is first[0]
+    assert len(calls) == 1
+    assert manager.info()["chunks"] == 3
+
+
+def test_concurrent_first_calls_load_once(tmp_path):
+    manager, calls, _ = make_manager(tmp_path)
+
+    threads = [threading.Thread(target=manager.load) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+
+
+def test_reload_rebuilds_derived_and_changes_version(tmp_path):
+    manager, calls, path = make_manager(tmp_path)
+    built = []
+    manager.register("size", lambda index, corpus: built.append(1) or len(corpus))
+
+    assert manager.derived("size") == 3
+    version = manager.fingerprint
+
+    path.write_bytes(b"v2")
+    manager.reload()
+
+    assert len(calls) == 2
+    assert len(built) == 2
+    assert manager.fingerprint != version
+
+
+def test_info_before_load(tmp_path):
+    manager, calls, _ = make_manager(tmp_path)
+    assert manager.info() == {"loaded": False}
+    assert not manager.is_loaded
+    assert calls == []
+
+
+def test_reload_closes_previous_generation(tmp_path):
+    closed = []
+
+    class Corpus(list):
+        def close(self):
+            closed.append(self[0])
+
+    generation = iter(["v1", "v2", "v3"])
+    path = tmp_path / "faiss.index"
+    path.write_bytes(b"v1")
+    manager = IndexManager(lambda: (FakeIndex(1), Corpus([next(generation)])), [path])
+
+    manager.load()
+    manager.reload()
+    # Le corpus v1 peut encore servir une requête en cours
+    assert closed == []
+    manager.reload()
+    assert closed == ["v1"]
+
+    manager.close()
+    assert closed == ["v1", "v2", "v3"]
+    assert not manager.is_loaded
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.pipelines.rag.llm_client import LLMClient
+from app.services.pipelines.rag.llm_providers import GeminiProvider
+
+
+class Transient(Exception):
+    pass
+
+
+def _client(**kwargs) -> LLMClient:
+    options = {"max_concurrency": 1, "timeout": 1.0, "max_retries": 2, "base_delay": 0.001}
+    options.update(kwargs)
+    return LLMClient(**options)
+
+
+async def _collect(stream) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+def test_stream_holds_slot_until_the_end():
+    client = _client(max_concurrency=1)
+    events = []
+
+    def chunks(name):
+        for i in range(3):
+            time.sleep(0.01)
+            events.append(name)
+            yield f"{name}{i}"
+
+    async def run():
+        return await asyncio.gather(
+            _collect(client.stream(chunks, "a")),
+            _collect(client.stream(chunks, "b")),
+        )
+
+    a, b = asyncio.run(run())
+    assert a == ["a0", "a1", "a2"] and b == ["b0", "b1", "b2"]
+    # Une seule place : le second flux attend la fin du premier
+    assert events == ["a", "a", "a", "b", "b", "b"]
+    assert client.stats()["in_flight"] == 0
+
+
+def test_stream_retries_connect_with_backoff():
+    client = _client()
+    attempts = []
+
+    def chunks():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Transient("503")
+        yield "ok"
+
+    assert asyncio.run(_collect(client.stream(chunks, retry_on=(Transient,)))) == ["ok"]
+    assert len(attempts) == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_first_token_deadline():
+    client = _client(timeout=0.05, max_retries=1)
+    attempts = []
+
+    def chunks():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.2)  # premier essai trop lent
+        yield "tok0"
+        time.sleep(0.1)  # au-delà du délai, mais après le premier morceau
+        yield "tok1"
+
+    assert asyncio.run(_collect(client.stream(chunks))) == ["tok0", "tok1"]
+    stats = client.stats()
+    assert stats["timeouts"] == 1 and stats["retries"] == 1
+
+
+def test_error_after_first_token_is_not_retried():
+    client = _client()
+    attempts = []
+
+    def chunks():
+        attempts.append(1)
+        yield "tok0"
+        raise Transient("coupure")
+
+    with pytest.raises(Transient):
+        asyncio.run(_collect(client.stream(chunks, retry_on=(Transient,))))
+    assert len(attempts) == 1
+    assert client.stats()["in_flight"] == 0
+
+
+def test_closing_stream_releases_slot():
+    client = _client()
+
+    def chunks():
+        for i in range(100):
+            yield f"tok{i}"
+
+    async def run():
+        stream = client.stream(chunks)
+        assert await stream.__anext__() == "tok0"
+        await stream.aclose()
+        return await _collect(client.stream(chunks))
+
+    assert len(asyncio.run(run())) == 100
+    assert client.stats()["cancelled"] == 1
+
+
+def test_gemini_async_call_has_timeout():
+    calls = []
+
+    class Model:
+        async def generate_content_async(self, prompt, **kwargs):
+            calls.append(kwargs)
+            return type("Response", (), {"text": " réponse "})()
+
+    provider = GeminiProvider.__new__(GeminiProvider)
+    provider.model = Model()
+    provider.generation_config = {}
+    provider.request_options = {"timeout": 7}
+
+    assert asyncio.run(provider.generate_async("question")) == "réponse"
+    assert calls[0]["request_options"] == {"timeout": 7}
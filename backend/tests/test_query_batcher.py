@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import TimeoutError
+
+import numpy as np
+import pytest
+
+from app.services.pipelines.rag.query_batcher import QueryBatcher
+
+
+def _encode(texts):
+    return np.array([[float(len(t))] for t in texts], dtype="float32")
+
+
+def test_concurrent_queries_share_a_batch():
+    calls = []
+
+    def encode(texts):
+        calls.append(len(texts))
+        return _encode(texts)
+
+    batcher = QueryBatcher(encode, max_batch_size=8, window_ms=50, timeout_s=5)
+    futures = [batcher.submit("x" * i) for i in range(1, 6)]
+    assert [float(f.result(timeout=5)[0]) for f in futures] == [1, 2, 3, 4, 5]
+    assert sum(calls) == 5 and len(calls) < 5
+
+
+def test_short_result_fails_every_caller_and_keeps_serving():
+    broken = threading.Event()
+    broken.set()
+
+    def encode(texts):
+        vectors = _encode(texts)
+        return vectors[:-1] if broken.is_set() else vectors
+
+    batcher = QueryBatcher(encode, max_batch_size=8, window_ms=20, timeout_s=5)
+    futures = [batcher.submit("a"), batcher.submit("bb")]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="returned 1 vectors for 2 texts"):
+            future.result(timeout=5)
+
+    broken.clear()
+    assert float(batcher.encode("ccc")[0]) == 3.0
+    assert batcher.stats()["failed_batches"] == 1
+
+
+def test_error_outside_encode_resolves_futures(monkeypatch):
+    batcher = QueryBatcher(_encode, max_batch_size=8, window_ms=1, timeout_s=5)
+
+    def observe(value):
+        raise ValueError("histogram")
+
+    monkeypatch.setattr(batcher.batch_sizes, "observe", observe)
+    with pytest.raises(ValueError, match="histogram"):
+        batcher.encode("a")
+
+    monkeypatch.undo()
+    assert float(batcher.encode("abcd")[0]) == 4.0
+
+
+def test_dead_worker_is_restarted():
+    batcher = QueryBatcher(_encode, max_batch_size=8, window_ms=1, timeout_s=5)
+    batcher._worker = threading.Thread(target=lambda: None)
+    batcher._worker.start()
+    batcher._worker.join()
+
+    assert float(batcher.encode("ab")[0]) == 2.0
+
+
+def test_encode_times_out():
+    release = threading.Event()
+
+    def encode(texts):
+        release.wait(5)
+        return _encode(texts)
+
+    batcher = QueryBatcher(encode, max_batch_size=8, window_ms=1, timeout_s=0.05)
+    with pytest.raises(TimeoutError):
+        batcher.encode("a")
+    release.set()
@@ -0,0 +1,21 @@
+from app.services.pipelines.rag.conversation_memory import ConversationMemory
+from app.services.rag_service import _flight_key
+
+
+def _memory(previous, answer="..."):
+    return ConversationMemory(turns=[{"question": previous, "answer": answer}])
+
+
+def test_flight_key_without_history():
+    assert _flight_key("ما هو معدل الطب؟", None) == _flight_key("  ما هو  معدل الطب؟", None)
+    assert _flight_key("ما هو معدل الطب؟", ConversationMemory()) == _flight_key("ما هو معدل الطب؟", None)
+
+
+def test_flight_key_shared_only_with_same_history():
+    first = _memory("معدل الطب")
+    assert _flight_key("وفي صفاقس؟", first) == _flight_key("وفي صفاقس؟", _memory("معدل الطب"))
+
+    # Même question autonome, historique différent : pas de réponse partagée
+    other = _memory("معدل الطب", answer="جواب آخر")
+    assert _flight_key("وفي صفاقس؟", first) != _flight_key("وفي صفاقس؟", other)
+    assert _flight_key("وفي صفاقس؟", first) != _flight_key("معدل الطب وفي صفاقس؟", None)
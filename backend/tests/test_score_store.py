@@ -0,0 +1,98 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes import orientation
+from app.services import orientation_service
+from app.services.pipelines.score.paths import YEAR, processed_scores_path
+from app.services.pipelines.score.score_store import ScoreStore, code_key, write_partition
+
+
+def _entry(code, min_score, section="رياضيات", formula="FG+M"):
+    return {
+        "code": code,
+        "diploma": "الإجازة",
+        "university": "كلية العلوم",
+        "parent_university": "جامعة صفاقس",
+        "speciality": f"تكوين {code}",
+        "bac_section": section,
+        "formula": formula,
+        "min_score": min_score,
+        "duration": "3 سنوات",
+        "requirements": None,
+        "source_page": 41,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    write_partition([_entry("10002", 140.0), _entry("10001", 120.0)], 2023, tmp_path)
+    write_partition(
+        [_entry("10001", 125.5), _entry("10001", 98.0, section="آداب", formula="FG+A")],
+        2024, tmp_path
+    )
+    # Lots d'écriture plus petits que la partition
+    write_partition(
+        (_entry(f"{code:05d}", 100.0 + code % 7) for code in range(10000, 10030)),
+        2025, tmp_path, presorted=True
+    )
+    # Dossier hors schéma year=AAAA : ignoré
+    (tmp_path / "year=old").mkdir()
+    return ScoreStore(tmp_path, columns=["bac_section", "min_score", "formula", "university"])
+
+
+def test_years_and_columns(store):
+    assert store.years() == [2023, 2024, 2025]
+    assert store.table(2025).column_names == ["code", "bac_section", "min_score", "formula", "university"]
+    assert store.stats()["years"] == {2023: 2, 2024: 2, 2025: 30}
+    with pytest.raises(KeyError):
+        store.table(2022)
+
+
+def test_min_score_history_across_years(store):
+    history = store.min_score_history("10001")
+
+    assert [(row["year"], row["bac_section"], row["min_score"]) for row in history] == [
+        (2023, "رياضيات", 120.0),
+        (2024, "رياضيات", 125.5),
+        (2024, "آداب", 98.0),
+        (2025, "رياضيات", 100.0 + 10001 % 7),
+    ]
+    assert [row["year"] for row in store.min_score_history("10002")] == [2023, 2025]
+
+
+def test_lookup_unknown_or_invalid_code(store):
+    assert store.min_score_history("99999") == []
+    assert store.min_score_history("abc") == []
+    assert code_key(None) == -1
+
+
+def test_default_paths_follow_year():
+    assert processed_scores_path().name == f"processed_scores_{YEAR}.json"
+    assert processed_scores_path(2024).name == "processed_scores_2024.json"
+
+
+# ---------------------------------------------------------------------
+# GET /orientation/history/{code}
+# ---------------------------------------------------------------------
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(orientation_service, "score_store", store)
+    app = FastAPI()
+    app.include_router(orientation.router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
+
+
+def test_history_route(client):
+    response = client.get("/api/orientation/history/10001")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["code"] == "10001"
+    assert body["years"] == [2023, 2024, 2025]
+    assert [item["min_score"] for item in body["items"][:3]] == [120.0, 125.5, 98.0]
+
+
+def test_history_route_unknown_code(client):
+    assert client.get("/api/orientation/history/99999").status_code == 404
+    assert client.get("/api/orientation/history/123").status_code == 422
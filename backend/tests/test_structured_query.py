@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.services.pipelines.rag.intent import detect_intent
+from app.services.pipelines.rag.structured_query import StructuredQueryEngine
+
+
+def _row(code, speciality, section, min_score, university="كلية الآداب بصفاقس",
+         parent="جامعة صفاقس", diploma="الإجازة", duration="3 سنوات"):
+    return {
+        "code": code,
+        "diploma": diploma,
+        "university": university,
+        "parent_university": parent,
+        "speciality": speciality,
+        "bac_section": section,
+        "formula": "FG+A",
+        "min_score": min_score,
+        "duration": duration,
+        "requirements": None,
+    }
+
+
+ROWS = (
+    [_row(f"4{i:04d}", f"العربية {i}", "آداب", 90 + i * 2) for i in range(30)]
+    + [
+        _row(f"5{i:04d}", "الهندسة المدنية", "رياضيات", 150 + i,
+             university="المدرسة الوطنية للمهندسين", diploma="مهندس", duration="5 سنوات")
+        for i in range(25)
+    ]
+    + [
+        # Nom de جامعة coupé par l'extraction, tatweel dans la spécialité
+        _row("10700", "الـطــب", "علوم تجريبية", 190.5, diploma="الطب",
+             university="المنار كلية الطب بتونس", parent="جامعة تونس", duration="9 سنوات"),
+        _row("40700", "الـطــب", "علوم تجريبية", 185.25, diploma="الطب",
+             university="كلية الطب بصفاقس", duration="9 سنوات"),
+    ]
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "processed_scores.json"
+    path.write_text(json.dumps(ROWS, ensure_ascii=False), encoding="utf-8")
+    return StructuredQueryEngine(path, max_rows=20)
+
+
+def _answer(engine, question):
+    return engine.answer(question, detect_intent(question))
+
+
+def test_student_score_filters_min_score(engine):
+    # Aucune formation de آداب accessible avec 12 : la question va au RAG
+    assert _answer(engine, "ماذا أدرس بمعدل 12 في شعبة آداب") is None
+
+    answer = _answer(engine, "ماذا أدرس بمعدل 100 في شعبة آداب")
+    assert answer.startswith("يوجد 6 تكوينًا")
+    assert "معدل القبول الأدنى 100" in answer
+    assert "معدل القبول الأدنى 102" not in answer
+
+
+def test_value_question_over_many_programs_goes_to_rag(engine):
+    assert _answer(engine, "ما هي مدة دراسة الهندسة") is None
+    assert "المدة 5 سنوات" in _answer(engine, "ما هي مدة الدراسة للرمز 50003")
+
+
+def test_lookup_with_university_and_section(engine):
+    answer = _answer(
+        engine,
+        "ما هو معدل القبول للطب في جامعة تونس المنار لشعبة علوم تجريبية"
+    )
+    assert "الرمز 10700" in answer
+    assert "190.5" in answer
+    assert "40700" not in answer
+
+
+def test_unknown_word_goes_to_rag(engine):
+    assert _answer(engine, "ما هو معدل القبول في الفلسفة لشعبة آداب") is None
+
+
+def test_generic_question_words_do_not_make_a_lookup():
+    assert detect_intent("ما هي شروط الحصول على المنحة").topic == "general"
+    assert detect_intent("أين يقع المبيت الجامعي").topic == "general"
+    assert not detect_intent("أين يقع المبيت الجامعي").is_lookup
+
+
+def test_intent_numbers():
+    intent = detect_intent("ماذا أدرس بمعدل 12,5 سنة 2025 للرمز 10700")
+    assert intent.scores == [12.5]
+    assert intent.codes == ["10700"]
+    assert intent.remainder == []
+    assert detect_intent("تكوينات مدتها 3 سنوات").scores == []
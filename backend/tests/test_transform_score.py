@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from app.services.pipelines.score import transform_score
+from app.services.pipelines.score.score_store import ScoreStore, write_partition
+from app.services.pipelines.score.transform_score import (
+    ProcessedTableWriter,
+    _JsonArrayWriter,
+    read_entries,
+    transform_entry,
+)
+
+
+def _raw(code, score, bac="رياضيات"):
+    return {
+        "diploma": "الإجازة في الإعلامية",
+        "university": "المعهد العالي للإعلامية بتونس جامعة تونس المنار",
+        "speciality": "علوم الحاسوب",
+        "code": code,
+        "bac": bac,
+        "formula": "FG+M",
+        "score": score,
+        "page": 41,
+        "periode": "3 سنوات",
+        "exigence": None,
+    }
+
+
+ENTRIES = [transform_entry(_raw(f"{code:05d}", 100 + code % 50)) for code in (30002, 10001, 20003, 10000, 40004)]
+
+
+@pytest.mark.parametrize("items", [
+    [],
+    ENTRIES[:1],
+    ENTRIES,
+    [{"nested": {"a": [1, 2]}, "text": "\"غير\" محدد\n"}, [1.5, None, True], "x"],
+])
+def test_json_array_writer_matches_json_dump(tmp_path, items):
+    path = tmp_path / "out.json"
+    writer = _JsonArrayWriter(path)
+    for item in items:
+        writer.write(item)
+    assert not path.exists()
+    writer.close()
+
+    assert path.read_text(encoding="utf-8") == json.dumps(items, ensure_ascii=False, indent=2)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_json_array_writer_discard_keeps_previous_file(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text("[]", encoding="utf-8")
+
+    writer = _JsonArrayWriter(path)
+    writer.write(ENTRIES[0])
+    writer.close(publish=False)
+
+    assert path.read_text(encoding="utf-8") == "[]"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "scores"
+    monkeypatch.setattr(
+        transform_score, "write_partition",
+        lambda entries, year, presorted=False: write_partition(entries, year, directory, presorted)
+    )
+    return directory
+
+
+def test_processed_table_writer_sorts_across_runs(tmp_path, store_dir):
+    output = tmp_path / "processed.json"
+    table = ProcessedTableWriter(output, 2025, buffer_rows=2)
+    for entry in ENTRIES:
+        table.write(entry)
+    table.close()
+
+    expected = sorted(ENTRIES, key=lambda e: e["code"])
+    assert table.count == 5
+    assert output.read_text(encoding="utf-8") == json.dumps(expected, ensure_ascii=False, indent=2)
+
+    store = ScoreStore(store_dir)
+    assert store.years() == [2025]
+    assert store.table(2025, ["code"]).column("code").to_pylist() == [e["code"] for e in expected]
+
+
+def test_processed_table_writer_failure_keeps_previous_json(tmp_path, monkeypatch):
+    output = tmp_path / "processed.json"
+    output.write_text("[]", encoding="utf-8")
+
+    def failing_partition(entries, year, presorted=False):
+        next(iter(entries))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(transform_score, "write_partition", failing_partition)
+    table = ProcessedTableWriter(output, 2025)
+    table.write(ENTRIES[0])
+    with pytest.raises(OSError):
+        table.close()
+
+    assert output.read_text(encoding="utf-8") == "[]"
+    assert list(tmp_path.iterdir()) == [output]
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_read_entries_streams_json_and_jsonl(tmp_path, monkeypatch, suffix):
+    raw = [_raw(f"{i:05d}", 100.5 + i) for i in range(20)]
+    path = tmp_path / f"structured{suffix}"
+    if suffix == ".jsonl":
+        path.write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in raw), encoding="utf-8")
+    else:
+        path.write_text(json.dumps(raw, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    # Lectures plus petites qu'une entrée : le décodage reprend à la suite
+    monkeypatch.setattr(transform_score, "READ_CHUNK_CHARS", 64)
+    assert list(read_entries(path)) == raw
+
+
+@pytest.fixture
+def outputs(tmp_path, store_dir, monkeypatch):
+    """Table et corpus de main() redirigés vers tmp_path (anciennes versions en place)"""
+    table, corpus = tmp_path / "processed.json", tmp_path / "rag_corpus.txt"
+    table.write_text("[]", encoding="utf-8")
+    corpus.write_text("ancien corpus", encoding="utf-8")
+    monkeypatch.setattr(transform_score, "processed_scores_path", lambda year: table)
+    monkeypatch.setattr(transform_score, "corpus_path", lambda year: corpus)
+    return table, corpus
+
+
+def test_main_publishes_table_and_corpus(tmp_path, outputs):
+    table, corpus = outputs
+    raw = [_raw("20001", 120.0), _raw("10001", 110.0), _raw("10001", 999.0)]
+    source = tmp_path / "structured.json"
+    source.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+
+    assert transform_score.main(2025, source) == 2
+    assert [e["code"] for e in json.loads(table.read_text(encoding="utf-8"))] == ["10001", "20001"]
+    assert corpus.read_text(encoding="utf-8").count("###") == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_main_failure_keeps_served_corpus(tmp_path, outputs):
+    table, corpus = outputs
+    source = tmp_path / "structured.jsonl"
+    source.write_text(json.dumps(_raw("10001", 110.0)) + "\n{tronqué\n", encoding="utf-8")
+
+    with pytest.raises(json.JSONDecodeError):
+        transform_score.main(2025, source)
+
+    assert table.read_text(encoding="utf-8") == "[]"
+    assert corpus.read_text(encoding="utf-8") == "ancien corpus"
+    assert not list(tmp_path.glob("*.tmp"))